@@ -0,0 +1,54 @@
+"""Benchmarks for AASX payload encryption and reconstruction."""
+
+from __future__ import annotations
+
+import os
+from typing import List
+
+from harness import Case
+
+from aas_holo_shard.core import shamir
+
+KB = 1024
+MB = 1024 * KB
+GB = 1024 * MB
+
+PAYLOAD_SIZES = {"quick": [KB, MB, 16 * MB], "full": [KB, MB, 16 * MB, 128 * MB, GB]}
+
+
+def _label(size: int) -> str:
+    for unit, scale in (("GB", GB), ("MB", MB), ("KB", KB)):
+        if size >= scale:
+            return f"{size // scale}{unit}"
+    return f"{size}B"
+
+
+def _encrypt(size: int, backend: str):
+    def setup(stack):
+        payload = os.urandom(size)
+        return lambda: shamir.encrypt_and_split(payload, threshold=3, total=5, backend=backend)
+
+    return setup
+
+
+def _decrypt(size: int, backend: str):
+    def setup(stack):
+        encrypted, shares = shamir.encrypt_and_split(
+            os.urandom(size), threshold=3, total=5, backend=backend
+        )
+        return lambda: shamir.reconstruct_and_decrypt(encrypted, shares[:3], backend=backend)
+
+    return setup
+
+
+def cases(profile: str) -> List[Case]:
+    out: List[Case] = []
+    for size in PAYLOAD_SIZES[profile]:
+        label = _label(size)
+        for backend in shamir.BACKENDS:
+            suffix = f"[{label},{backend}]"
+            out.append(Case(f"crypto.encrypt_and_split{suffix}", _encrypt(size, backend), size))
+            out.append(
+                Case(f"crypto.reconstruct_and_decrypt{suffix}", _decrypt(size, backend), size)
+            )
+    return out
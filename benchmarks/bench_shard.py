@@ -0,0 +1,101 @@
+"""Benchmarks for the pure-Python sharding module and the AAS JSON CLI paths."""
+
+from __future__ import annotations
+
+import json
+import tempfile
+from pathlib import Path
+from typing import List
+
+from harness import Case
+
+from aas_holo_shard.aas import shard
+
+THRESHOLDS = {
+    "quick": [(2, 3), (3, 5), (16, 32), (128, 255), (255, 255)],
+    "full": [(2, 3), (3, 5), (8, 16), (16, 32), (64, 128), (128, 255), (255, 255)],
+}
+DOCUMENT_SIZES = {"quick": [10, 1_000, 10_000], "full": [10, 1_000, 10_000, 100_000]}
+SECRET = shard.str_to_int("SuperSecretCocaColaRecipe_2024")
+
+
+def _make_shards(n: int, k: int):
+    return lambda stack: lambda: shard.make_shards(SECRET, n, k)
+
+
+def _recover_secret(n: int, k: int):
+    def setup(stack):
+        shards = shard.make_shards(SECRET, n, k)[:k]
+
+        def run():
+            # Measure reconstruction itself, not the coefficient cache.
+            shard._lagrange_at_zero.cache_clear()
+            return shard.recover_secret(shards)
+
+        return run
+
+    return setup
+
+
+def _document(elements: int) -> dict:
+    return {
+        "assetAdministrationShells": [{"id": "urn:uuid:bench", "idShort": "Bench"}],
+        "submodels": [
+            {
+                "idShort": "Params",
+                "submodelElements": [
+                    {
+                        "idShort": f"Property_{index}",
+                        "modelType": "Property",
+                        "valueType": "xs:string",
+                        "value": f"value-{index}",
+                    }
+                    for index in range(elements)
+                ]
+                + [
+                    {
+                        "idShort": "MasterKey",
+                        "modelType": "Property",
+                        "valueType": "xs:string",
+                        "value": "SuperSecretCocaColaRecipe_2024",
+                    }
+                ],
+            }
+        ],
+    }
+
+
+def _workspace(stack, elements: int) -> Path:
+    root = Path(stack.enter_context(tempfile.TemporaryDirectory()))
+    source = root / "doc.json"
+    source.write_text(json.dumps(_document(elements), indent=2), encoding="utf-8")
+    return source
+
+
+def _split_aas(elements: int):
+    def setup(stack):
+        source = _workspace(stack, elements)
+        return lambda: shard.split_aas(source, "MasterKey", 5, 3)
+
+    return setup
+
+
+def _combine_aas(elements: int):
+    def setup(stack):
+        source = _workspace(stack, elements)
+        files = shard.split_aas(source, "MasterKey", 5, 3)[:3]
+        output = source.with_name("restored.json")
+        return lambda: shard.combine_aas(files, "MasterKey", output)
+
+    return setup
+
+
+def cases(profile: str) -> List[Case]:
+    out: List[Case] = []
+    for k, n in THRESHOLDS[profile]:
+        out.append(Case(f"shard.make_shards[k={k},n={n}]", _make_shards(n, k)))
+        out.append(Case(f"shard.recover_secret[k={k},n={n}]", _recover_secret(n, k)))
+    for elements in DOCUMENT_SIZES[profile]:
+        out.append(Case(f"shard.split_aas[elements={elements}]", _split_aas(elements)))
+        out.append(Case(f"shard.combine_aas[elements={elements}]", _combine_aas(elements)))
+    return out
@@ -0,0 +1,76 @@
+"""Benchmarks for share storage against the in-process fake IPFS daemon."""
+
+from __future__ import annotations
+
+import asyncio
+import sys
+from pathlib import Path
+from typing import List
+
+from harness import Case
+
+from aas_holo_shard.storage import async_ipfs, ipfs
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "tests"))
+
+from fake_ipfs import FakeIPFS
+
+SHARE_COUNTS = {"quick": [5, 64], "full": [5, 64, 255]}
+
+
+def _shares(count: int):
+    return [(index, bytes([index % 256]) * 32) for index in range(1, count + 1)]
+
+
+def _serialize(wire_format: str):
+    def setup(stack):
+        share = (7, bytes(range(32)))
+
+        def run():
+            return ipfs.deserialize_share(ipfs.serialize_share(share, wire_format=wire_format))
+
+        return run
+
+    return setup
+
+
+def _store(count: int):
+    def setup(stack):
+        fake = stack.enter_context(FakeIPFS())
+        shares = _shares(count)
+        return lambda: asyncio.run(async_ipfs.store_shares_async(shares, base_url=fake.url))
+
+    return setup
+
+
+def _fetch(count: int):
+    def setup(stack):
+        fake = stack.enter_context(FakeIPFS())
+        cids = [fake.add(ipfs.serialize_share(share)) for share in _shares(count)]
+        return lambda: asyncio.run(async_ipfs.fetch_shares_async(cids, base_url=fake.url))
+
+    return setup
+
+
+def _quorum(count: int):
+    def setup(stack):
+        fake = stack.enter_context(FakeIPFS())
+        cids = [fake.add(ipfs.serialize_share(share)) for share in _shares(count)]
+        threshold = max(1, count // 2)
+        return lambda: asyncio.run(
+            async_ipfs.fetch_quorum_async(cids, threshold, base_url=fake.url)
+        )
+
+    return setup
+
+
+def cases(profile: str) -> List[Case]:
+    out = [
+        Case("storage.share_roundtrip[json]", _serialize("json")),
+        Case("storage.share_roundtrip[binary]", _serialize("binary")),
+    ]
+    for count in SHARE_COUNTS[profile]:
+        out.append(Case(f"storage.store_shares_async[shares={count}]", _store(count)))
+        out.append(Case(f"storage.fetch_shares_async[shares={count}]", _fetch(count)))
+        out.append(Case(f"storage.fetch_quorum_async[shares={count}]", _quorum(count)))
+    return out
@@ -0,0 +1,64 @@
+"""Compare a benchmark run against the checked-in baseline.
+
+Exits with status 1 when any benchmark is slower than the baseline by more
+than ``--tolerance`` (default 25%). Timings only compare meaningfully on the
+machine that produced the baseline; regenerate it with ``make bench-baseline``
+after intentional changes or on new hardware.
+"""
+
+from __future__ import annotations
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+HERE = Path(__file__).resolve().parent
+
+
+def compare(baseline: dict, current: dict, tolerance: float) -> int:
+    base_results = baseline["results"]
+    regressions = 0
+    print(f"{'benchmark':<48} {'baseline':>12} {'current':>12} {'ratio':>7}")
+    for name, result in sorted(current["results"].items()):
+        if name not in base_results:
+            print(f"{name:<48} {'-':>12} {result['min'] * 1e3:>10.3f}ms    new")
+            continue
+        before = base_results[name]["min"]
+        ratio = result["min"] / before
+        flag = ""
+        if ratio > 1 + tolerance:
+            flag = "  SLOWER"
+            regressions += 1
+        elif ratio < 1 / (1 + tolerance):
+            flag = "  faster"
+        print(
+            f"{name:<48} {before * 1e3:>10.3f}ms {result['min'] * 1e3:>10.3f}ms "
+            f"{ratio:>6.2f}x{flag}"
+        )
+
+    missing = sorted(set(base_results) - set(current["results"]))
+    for name in missing:
+        print(f"{name:<48} not run")
+    if regressions:
+        print(f"\n{regressions} benchmark(s) regressed by more than {tolerance:.0%}")
+        return 1
+    return 0
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="Flag benchmark regressions")
+    parser.add_argument("current", type=Path, help="results JSON from run.py")
+    parser.add_argument("--baseline", type=Path, default=HERE / "baseline.json")
+    parser.add_argument("--tolerance", type=float, default=0.25)
+    args = parser.parse_args(argv)
+
+    baseline = json.loads(args.baseline.read_text())
+    current = json.loads(args.current.read_text())
+    if baseline.get("profile") != current.get("profile"):
+        print("baseline and current run use different profiles", file=sys.stderr)
+    return compare(baseline, current, args.tolerance)
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,83 @@
+"""Minimal timing harness shared by the benchmark modules.
+
+A benchmark is a :class:`Case` whose ``setup`` receives an
+:class:`contextlib.ExitStack` for cleanup and returns the zero-argument
+callable to time. Each case is calibrated so one sample lasts at least
+``min_time / repeat`` seconds, and the fastest and median per-call times are
+reported.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import platform
+import statistics
+import sys
+import time
+from dataclasses import dataclass
+from typing import Callable, Dict, Iterable, List, Optional
+
+Thunk = Callable[[], object]
+
+
+@dataclass(frozen=True)
+class Case:
+    name: str
+    setup: Callable[[contextlib.ExitStack], Thunk]
+    size: Optional[int] = None
+
+
+def measure(thunk: Thunk, *, min_time: float = 0.5, repeat: int = 5) -> Dict[str, float]:
+    started = time.perf_counter()
+    thunk()
+    first = time.perf_counter() - started
+
+    per_sample = min_time / repeat
+    loops = max(1, int(per_sample / first)) if first > 0 else 1000
+    if first > 1.0:
+        repeat = min(repeat, 3)
+
+    samples: List[float] = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        for _ in range(loops):
+            thunk()
+        samples.append((time.perf_counter() - started) / loops)
+    return {"min": min(samples), "median": statistics.median(samples), "loops": loops}
+
+
+def run_cases(
+    cases: Iterable[Case],
+    *,
+    min_time: float = 0.5,
+    repeat: int = 5,
+    log: Callable[[str], None] = print,
+) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for case in cases:
+        with contextlib.ExitStack() as stack:
+            thunk = case.setup(stack)
+            result = measure(thunk, min_time=min_time, repeat=repeat)
+        if case.size:
+            result["bytes"] = case.size
+            result["mb_per_s"] = case.size / result["min"] / 1e6
+        results[case.name] = result
+        log(format_result(case.name, result))
+    return results
+
+
+def format_result(name: str, result: Dict[str, float]) -> str:
+    line = f"{name:<48} {result['min'] * 1e3:>12.3f} ms"
+    if "mb_per_s" in result:
+        line += f" {result['mb_per_s']:>10.1f} MB/s"
+    return line
+
+
+def machine_info() -> Dict[str, str]:
+    return {
+        "python": sys.version.split()[0],
+        "implementation": platform.python_implementation(),
+        "machine": platform.machine(),
+        "system": platform.system(),
+        "processor": platform.processor(),
+    }
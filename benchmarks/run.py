@@ -0,0 +1,54 @@
+"""Run the benchmark suite and write the timings as JSON.
+
+Usage::
+
+    python benchmarks/run.py                       # quick profile, prints a table
+    python benchmarks/run.py --profile full        # k/n up to 255, payloads up to 1 GB
+    python benchmarks/run.py -k crypto -o out.json
+"""
+
+from __future__ import annotations
+
+import argparse
+import fnmatch
+import json
+import sys
+from pathlib import Path
+
+import bench_crypto
+import bench_shard
+import bench_storage
+from harness import machine_info, run_cases
+
+MODULES = (bench_shard, bench_crypto, bench_storage)
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="AAS-Holo-Shard benchmarks")
+    parser.add_argument("--profile", choices=("quick", "full"), default="quick")
+    parser.add_argument("-k", "--filter", default="*", help="glob over benchmark names")
+    parser.add_argument("-o", "--output", type=Path, help="write results JSON here")
+    parser.add_argument("--min-time", type=float, default=0.5, help="seconds per benchmark")
+    parser.add_argument("--repeat", type=int, default=5)
+    args = parser.parse_args(argv)
+
+    pattern = args.filter if any(c in args.filter for c in "*?[") else f"*{args.filter}*"
+    selected = [
+        case
+        for module in MODULES
+        for case in module.cases(args.profile)
+        if fnmatch.fnmatchcase(case.name, pattern)
+    ]
+    if not selected:
+        print(f"no benchmarks match {args.filter!r}", file=sys.stderr)
+        return 1
+
+    results = run_cases(selected, min_time=args.min_time, repeat=args.repeat)
+    report = {"profile": args.profile, "machine": machine_info(), "results": results}
+    if args.output:
+        args.output.write_text(json.dumps(report, indent=2, sort_keys=True) + "\n")
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -1,12 +1,29 @@
 """AAS-Holo-Shard package."""
 
-from aas_holo_shard.core.shamir import (
-    CryptoError,
-    Share,
-    encrypt_and_split,
-    reconstruct_and_decrypt,
+from typing import TYPE_CHECKING
+
+from aas_holo_shard._lazy import attach
+
+__getattr__, __dir__ = attach(
+    __name__,
+    {
+        "aas_holo_shard.core.shamir": [
+            "CryptoError",
+            "Share",
+            "encrypt_and_split",
+            "reconstruct_and_decrypt",
+        ],
+    },
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.core.shamir import (
+        CryptoError,
+        Share,
+        encrypt_and_split,
+        reconstruct_and_decrypt,
+    )
+
 __all__ = [
     "CryptoError",
     "Share",
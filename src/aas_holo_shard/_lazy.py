@@ -0,0 +1,35 @@
+"""PEP 562 lazy attribute loading for the package ``__init__`` modules.
+
+Re-exported names are resolved on first access, so ``import aas_holo_shard``
+does not pull in pycryptodome, asyncio or the HTTP stack until a function that
+needs them is used.
+"""
+
+from __future__ import annotations
+
+import importlib
+import sys
+from typing import Any, Callable, Dict, List, Sequence, Tuple
+
+
+def attach(
+    package: str, exports: Dict[str, Sequence[str]]
+) -> Tuple[Callable[[str], Any], Callable[[], List[str]]]:
+    """Return ``(__getattr__, __dir__)`` for ``package``.
+
+    ``exports`` maps a module name to the attributes re-exported from it.
+    """
+    lookup = {name: module for module, names in exports.items() for name in names}
+
+    def __getattr__(name: str) -> Any:
+        module = lookup.get(name)
+        if module is None:
+            raise AttributeError(f"module {package!r} has no attribute {name!r}")
+        value = getattr(importlib.import_module(module), name)
+        setattr(sys.modules[package], name, value)
+        return value
+
+    def __dir__() -> List[str]:
+        return sorted(set(vars(sys.modules[package])) | set(lookup))
+
+    return __getattr__, __dir__
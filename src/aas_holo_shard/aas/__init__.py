@@ -1,12 +1,124 @@
 """AAS-specific helpers."""
 
-from aas_holo_shard.aas.parser import encrypt_aasx_path, load_aasx_basyx, read_aasx_bytes
-from aas_holo_shard.aas.shard import combine_aas, split_aas
+from typing import TYPE_CHECKING
+
+from aas_holo_shard._lazy import attach
+
+__getattr__, __dir__ = attach(
+    __name__,
+    {
+        "aas_holo_shard.aas.batch": [
+            "BatchRecord",
+            "BatchResult",
+            "CombineTask",
+            "SplitTask",
+            "discover_combine_tasks",
+            "discover_split_tasks",
+            "load_combine_manifest",
+            "load_split_manifest",
+            "run_combine_batch",
+            "run_split_batch",
+            "write_report",
+        ],
+        "aas_holo_shard.aas.index": [
+            "DuplicateElementError",
+            "ElementIndex",
+        ],
+        "aas_holo_shard.aas.parser": [
+            "decrypt_aasx_file",
+            "encrypt_aasx_file",
+            "encrypt_aasx_path",
+            "load_aasx_basyx",
+            "read_aasx_bytes",
+        ],
+        "aas_holo_shard.aas.selective": [
+            "decrypt_aasx_part",
+            "decrypt_aasx_parts",
+            "encrypt_aasx_parts",
+            "read_parts_manifest",
+        ],
+        "aas_holo_shard.aas.shard": [
+            "combine_aas",
+            "combine_aas_many",
+            "combine_aas_robust",
+            "split_aas",
+        ],
+        "aas_holo_shard.aas.stream": [
+            "combine_aas_stream",
+            "split_aas_stream",
+        ],
+    },
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.aas.batch import (
+        BatchRecord,
+        BatchResult,
+        CombineTask,
+        SplitTask,
+        discover_combine_tasks,
+        discover_split_tasks,
+        load_combine_manifest,
+        load_split_manifest,
+        run_combine_batch,
+        run_split_batch,
+        write_report,
+    )
+    from aas_holo_shard.aas.index import (
+        DuplicateElementError,
+        ElementIndex,
+    )
+    from aas_holo_shard.aas.parser import (
+        decrypt_aasx_file,
+        encrypt_aasx_file,
+        encrypt_aasx_path,
+        load_aasx_basyx,
+        read_aasx_bytes,
+    )
+    from aas_holo_shard.aas.selective import (
+        decrypt_aasx_part,
+        decrypt_aasx_parts,
+        encrypt_aasx_parts,
+        read_parts_manifest,
+    )
+    from aas_holo_shard.aas.shard import (
+        combine_aas,
+        combine_aas_many,
+        combine_aas_robust,
+        split_aas,
+    )
+    from aas_holo_shard.aas.stream import (
+        combine_aas_stream,
+        split_aas_stream,
+    )
 
 __all__ = [
+    "BatchRecord",
+    "BatchResult",
+    "CombineTask",
+    "DuplicateElementError",
+    "ElementIndex",
+    "SplitTask",
     "combine_aas",
+    "combine_aas_many",
+    "combine_aas_robust",
+    "combine_aas_stream",
+    "decrypt_aasx_file",
+    "decrypt_aasx_part",
+    "decrypt_aasx_parts",
+    "discover_combine_tasks",
+    "discover_split_tasks",
+    "encrypt_aasx_file",
+    "encrypt_aasx_parts",
     "encrypt_aasx_path",
     "load_aasx_basyx",
+    "load_combine_manifest",
+    "load_split_manifest",
     "read_aasx_bytes",
+    "read_parts_manifest",
+    "run_combine_batch",
+    "run_split_batch",
     "split_aas",
+    "split_aas_stream",
+    "write_report",
 ]
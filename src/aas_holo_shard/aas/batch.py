@@ -0,0 +1,600 @@
+"""Parallel batch sharding and recovery for directories of AAS JSON files.
+
+:func:`run_split_batch` and :func:`run_combine_batch` spread independent files
+over a :class:`~concurrent.futures.ProcessPoolExecutor`. A failing file is
+recorded and the batch continues. Every finished task is appended to a journal
+(JSON lines, flushed per record). A re-run with the same journal skips tasks
+that already succeeded, as long as their inputs, options and outputs are
+unchanged, so an interrupted batch resumes where it stopped.
+
+Tasks come from directories (:func:`discover_split_tasks`,
+:func:`discover_combine_tasks`) or from JSON/CSV manifests
+(:func:`load_split_manifest`, :func:`load_combine_manifest`), and results are
+written as a JSON or CSV report with :func:`write_report`. Recovered secrets
+never appear in journals or reports.
+"""
+
+from __future__ import annotations
+
+import csv
+import hashlib
+import json
+import os
+import re
+import time
+from dataclasses import asdict, dataclass, field, replace
+from pathlib import Path
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from aas_holo_shard.aas.shard import (
+    BACKEND_PRIME,
+    _split_ids,
+    combine_aas_many,
+    split_aas,
+)
+
+STATUS_OK = "ok"
+STATUS_FAILED = "failed"
+STATUS_SKIPPED = "skipped"
+
+SHARD_FILE = re.compile(r"^(?P<stem>.+)_shard_(?P<index>\d+)\.json$")
+SPLIT_JOURNAL = ".split-batch.journal"
+COMBINE_JOURNAL = ".combine-batch.journal"
+
+PathLike = Union[str, Path]
+
+
+@dataclass(frozen=True)
+class SplitTask:
+    """Shard ``source`` into ``output_dir``."""
+
+    source: str
+    output_dir: str
+    target_id: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class CombineTask:
+    """Recover the shard files ``files`` into ``output``."""
+
+    files: Tuple[str, ...]
+    output: str
+    target_id: Tuple[str, ...]
+
+
+@dataclass(frozen=True)
+class BatchRecord:
+    """Outcome of one task; ``task`` is the source (split) or output (combine) path."""
+
+    task: str
+    status: str
+    inputs: Tuple[str, ...] = ()
+    outputs: Tuple[str, ...] = ()
+    error: Optional[str] = None
+    seconds: float = 0.0
+    key: str = ""
+
+    def to_dict(self) -> Dict[str, Any]:
+        data = asdict(self)
+        data["inputs"] = list(self.inputs)
+        data["outputs"] = list(self.outputs)
+        return data
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "BatchRecord":
+        return cls(
+            task=data["task"],
+            status=data["status"],
+            inputs=tuple(data.get("inputs", ())),
+            outputs=tuple(data.get("outputs", ())),
+            error=data.get("error"),
+            seconds=float(data.get("seconds", 0.0)),
+            key=data.get("key", ""),
+        )
+
+
+@dataclass
+class BatchResult:
+    """All records of a batch run, in task order."""
+
+    records: List[BatchRecord] = field(default_factory=list)
+
+    def _count(self, status: str) -> int:
+        return sum(1 for record in self.records if record.status == status)
+
+    @property
+    def ok(self) -> int:
+        return self._count(STATUS_OK)
+
+    @property
+    def failed(self) -> int:
+        return self._count(STATUS_FAILED)
+
+    @property
+    def skipped(self) -> int:
+        return self._count(STATUS_SKIPPED)
+
+    def summary(self) -> Dict[str, int]:
+        return {
+            "total": len(self.records),
+            "ok": self.ok,
+            "failed": self.failed,
+            "skipped": self.skipped,
+        }
+
+
+Progress = Callable[[BatchRecord, int, int], None]
+
+
+def _selectors(raw: Union[str, Sequence[str]], regex: bool) -> Tuple[str, ...]:
+    if isinstance(raw, str):
+        return tuple(_split_ids(raw, regex))
+    return tuple(raw)
+
+
+def _is_shard_file(path: Path) -> bool:
+    return SHARD_FILE.match(path.name) is not None
+
+
+def _read_manifest(path: PathLike) -> List[Dict[str, Any]]:
+    """Read a CSV manifest (with a header row) or a JSON list of paths or objects."""
+    path = Path(path)
+    if path.suffix.lower() == ".csv":
+        with path.open(newline="") as handle:
+            return [dict(row) for row in csv.DictReader(handle)]
+    rows = json.loads(path.read_text())
+    if not isinstance(rows, list):
+        raise ValueError(f"manifest {path} must contain a JSON list")
+    return [row if isinstance(row, dict) else {"file": row} for row in rows]
+
+
+def _resolve(base: Path, value: str) -> Path:
+    candidate = Path(value)
+    return candidate if candidate.is_absolute() else base / candidate
+
+
+def _check_unique(tasks: Sequence[Any], key: Callable[[Any], str], what: str) -> None:
+    seen: Dict[str, Any] = {}
+    for task in tasks:
+        name = key(task)
+        if name in seen:
+            raise ValueError(f"two tasks would write {what} {name}: {seen[name]} and {task}")
+        seen[name] = task
+
+
+def _split_key(task: SplitTask) -> str:
+    return str(Path(task.output_dir) / Path(task.source).stem)
+
+
+def discover_split_tasks(
+    inputs: Iterable[PathLike],
+    output_dir: PathLike,
+    target_id: Union[str, Sequence[str]],
+    *,
+    pattern: str = "*.json",
+    regex: bool = False,
+) -> List[SplitTask]:
+    """Plan one task per AAS file under ``inputs`` (files or directories).
+
+    Directories are searched recursively for ``pattern``; existing shard files
+    (``*_shard_<i>.json``) are ignored. The directory layout is mirrored under
+    ``output_dir``; files given directly are sharded into ``output_dir`` itself.
+    """
+    output_root = Path(output_dir)
+    selectors = _selectors(target_id, regex)
+    tasks: List[SplitTask] = []
+    for entry in inputs:
+        root = Path(entry)
+        if root.is_dir():
+            for source in sorted(root.rglob(pattern)):
+                if source.is_file() and not _is_shard_file(source):
+                    relative = source.parent.relative_to(root)
+                    tasks.append(SplitTask(str(source), str(output_root / relative), selectors))
+        else:
+            tasks.append(SplitTask(str(root), str(output_root), selectors))
+    _check_unique(tasks, _split_key, "shard files for")
+    return tasks
+
+
+def load_split_manifest(
+    manifest: PathLike,
+    output_dir: PathLike,
+    target_id: Union[str, Sequence[str], None] = None,
+    *,
+    regex: bool = False,
+) -> List[SplitTask]:
+    """Plan split tasks from a manifest.
+
+    Each row names a ``file`` and may override the selectors with ``id`` and
+    the destination with ``output_dir``. Relative file paths are resolved
+    against the manifest's directory, relative output directories against
+    ``output_dir``.
+    """
+    base = Path(manifest).parent
+    output_root = Path(output_dir)
+    tasks: List[SplitTask] = []
+    for row in _read_manifest(manifest):
+        if not row.get("file"):
+            raise ValueError(f"manifest row without 'file': {row}")
+        raw_ids = row.get("id") or target_id
+        if not raw_ids:
+            raise ValueError(f"no idShort given for {row['file']}")
+        destination = _resolve(output_root, row.get("output_dir") or ".")
+        tasks.append(
+            SplitTask(
+                str(_resolve(base, row["file"])), str(destination), _selectors(raw_ids, regex)
+            )
+        )
+    _check_unique(tasks, _split_key, "shard files for")
+    return tasks
+
+
+def discover_combine_tasks(
+    inputs: Iterable[PathLike],
+    output_dir: PathLike,
+    target_id: Union[str, Sequence[str]],
+    *,
+    regex: bool = False,
+) -> List[CombineTask]:
+    """Plan one task per document whose shard files are found under ``inputs``.
+
+    Shard files are grouped by their relative directory and stem, so several
+    directories with the same layout (one per custodian, say) merge into one
+    task. Each group is restored to ``output_dir/<relative dir>/<stem>.json``.
+    """
+    output_root = Path(output_dir)
+    selectors = _selectors(target_id, regex)
+    groups: Dict[Tuple[Path, str], List[str]] = {}
+    for entry in inputs:
+        root = Path(entry)
+        candidates = sorted(root.rglob("*_shard_*.json")) if root.is_dir() else [root]
+        for path in candidates:
+            match = SHARD_FILE.match(path.name)
+            if match is None:
+                continue
+            relative = path.parent.relative_to(root) if root.is_dir() else Path()
+            groups.setdefault((relative, match.group("stem")), []).append(str(path))
+    return [
+        CombineTask(tuple(files), str(output_root / relative / f"{stem}.json"), selectors)
+        for (relative, stem), files in groups.items()
+    ]
+
+
+def load_combine_manifest(
+    manifest: PathLike,
+    output_dir: PathLike,
+    target_id: Union[str, Sequence[str], None] = None,
+    *,
+    regex: bool = False,
+) -> List[CombineTask]:
+    """Plan combine tasks from a manifest.
+
+    JSON rows carry ``output`` and a ``files`` list. CSV rows carry ``output``
+    and one ``file`` each, and rows with the same output form one task. Both
+    may set ``id``. Relative outputs are resolved against ``output_dir``,
+    relative files against the manifest's directory.
+    """
+    base = Path(manifest).parent
+    output_root = Path(output_dir)
+    grouped: Dict[str, Tuple[List[str], Any]] = {}
+    for row in _read_manifest(manifest):
+        output = row.get("output")
+        files = row.get("files") or ([row["file"]] if row.get("file") else [])
+        if not output or not files:
+            raise ValueError(f"manifest row needs 'output' and 'files': {row}")
+        entry = grouped.setdefault(output, ([], row.get("id") or target_id))
+        entry[0].extend(str(_resolve(base, name)) for name in files)
+    tasks: List[CombineTask] = []
+    for output, (files, raw_ids) in grouped.items():
+        if not raw_ids:
+            raise ValueError(f"no idShort given for {output}")
+        tasks.append(
+            CombineTask(
+                tuple(files), str(_resolve(output_root, output)), _selectors(raw_ids, regex)
+            )
+        )
+    return tasks
+
+
+def _fingerprint(paths: Iterable[str]) -> List[Any]:
+    stats: List[Any] = []
+    for name in paths:
+        try:
+            stat = os.stat(name)
+        except OSError:
+            stats.append([name, None])
+        else:
+            stats.append([name, stat.st_size, stat.st_mtime_ns])
+    return stats
+
+
+def _task_inputs(task: Union[SplitTask, CombineTask]) -> Tuple[str, ...]:
+    return (task.source,) if isinstance(task, SplitTask) else task.files
+
+
+def _task_key(task: Union[SplitTask, CombineTask], options: Dict[str, Any]) -> str:
+    payload = {
+        "task": asdict(task),
+        "options": options,
+        "inputs": _fingerprint(_task_inputs(task)),
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode()).hexdigest()
+
+
+def _failure(name: str, inputs: Tuple[str, ...], exc: Exception, started: float) -> BatchRecord:
+    error = f"{type(exc).__name__}: {exc}"
+    return BatchRecord(name, STATUS_FAILED, inputs, (), error, time.perf_counter() - started)
+
+
+def _split_one(task: SplitTask, options: Dict[str, Any]) -> BatchRecord:
+    started = time.perf_counter()
+    inputs = (task.source,)
+    try:
+        Path(task.output_dir).mkdir(parents=True, exist_ok=True)
+        outputs = split_aas(
+            task.source,
+            list(task.target_id),
+            options["n"],
+            options["k"],
+            regex=options["regex"],
+            backend=options["backend"],
+            streaming=options["streaming"],
+            output_dir=task.output_dir,
+        )
+    except Exception as exc:
+        return _failure(task.source, inputs, exc, started)
+    elapsed = time.perf_counter() - started
+    return BatchRecord(task.source, STATUS_OK, inputs, tuple(map(str, outputs)), None, elapsed)
+
+
+def _combine_one(task: CombineTask, options: Dict[str, Any]) -> BatchRecord:
+    started = time.perf_counter()
+    try:
+        Path(task.output).parent.mkdir(parents=True, exist_ok=True)
+        combine_aas_many(
+            task.files,
+            list(task.target_id),
+            task.output,
+            regex=options["regex"],
+            streaming=options["streaming"],
+        )
+    except Exception as exc:
+        return _failure(task.output, task.files, exc, started)
+    elapsed = time.perf_counter() - started
+    return BatchRecord(task.output, STATUS_OK, task.files, (task.output,), None, elapsed)
+
+
+class _Journal:
+    """Append-only JSON-lines log of finished tasks."""
+
+    def __init__(self, path: PathLike, *, resume: bool = True) -> None:
+        self.path = Path(path)
+        self.completed: Dict[str, BatchRecord] = {}
+        if resume and self.path.exists():
+            for line in self.path.read_text().splitlines():
+                try:
+                    record = BatchRecord.from_dict(json.loads(line))
+                except (ValueError, KeyError, TypeError):
+                    continue  # a line cut short by an interruption
+                if record.status == STATUS_OK:
+                    self.completed[record.key] = record
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._handle = self.path.open("a" if resume else "w")
+
+    def append(self, record: BatchRecord) -> None:
+        self._handle.write(json.dumps(record.to_dict()) + "\n")
+        self._handle.flush()
+
+    def close(self) -> None:
+        self._handle.close()
+
+
+def _execute(
+    worker: Callable[[Any, Dict[str, Any]], BatchRecord],
+    jobs: List[Tuple[int, Any]],
+    options: Dict[str, Any],
+    workers: int,
+) -> Iterator[Tuple[int, BatchRecord]]:
+    if workers <= 1 or len(jobs) <= 1:
+        for pos, task in jobs:
+            yield pos, worker(task, options)
+        return
+
+    from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+    # Keep a bounded number of tasks in flight so huge batches do not queue
+    # tens of thousands of futures, and an interruption cancels little work.
+    queue = iter(jobs)
+    executor = ProcessPoolExecutor(max_workers=workers)
+    try:
+        running = {}
+        for pos, task in queue:
+            running[executor.submit(worker, task, options)] = pos
+            if len(running) >= workers * 4:
+                break
+        while running:
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                yield running.pop(future), future.result()
+                for pos, task in queue:
+                    running[executor.submit(worker, task, options)] = pos
+                    break
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+
+
+def _run(
+    worker: Callable[[Any, Dict[str, Any]], BatchRecord],
+    tasks: Sequence[Union[SplitTask, CombineTask]],
+    options: Dict[str, Any],
+    workers: Optional[int],
+    journal: Optional[PathLike],
+    resume: bool,
+    progress: Optional[Progress],
+) -> BatchResult:
+    total = len(tasks)
+    keys = [_task_key(task, options) for task in tasks]
+    log = _Journal(journal, resume=resume) if journal is not None else None
+    records: List[Optional[BatchRecord]] = [None] * total
+    done = 0
+    try:
+        jobs: List[Tuple[int, Any]] = []
+        for pos, (task, key) in enumerate(zip(tasks, keys)):
+            previous = log.completed.get(key) if log is not None else None
+            if previous is not None and all(Path(name).exists() for name in previous.outputs):
+                records[pos] = replace(previous, status=STATUS_SKIPPED, seconds=0.0)
+                done += 1
+                if progress is not None:
+                    progress(records[pos], done, total)  # type: ignore[arg-type]
+            else:
+                jobs.append((pos, task))
+
+        for pos, record in _execute(worker, jobs, options, workers or os.cpu_count() or 1):
+            record = replace(record, key=keys[pos])
+            records[pos] = record
+            if log is not None:
+                log.append(record)
+            done += 1
+            if progress is not None:
+                progress(record, done, total)
+    finally:
+        if log is not None:
+            log.close()
+    return BatchResult([record for record in records if record is not None])
+
+
+def run_split_batch(
+    tasks: Sequence[SplitTask],
+    n: int,
+    k: int,
+    *,
+    regex: bool = False,
+    backend: str = BACKEND_PRIME,
+    streaming: bool = False,
+    workers: Optional[int] = None,
+    journal: Optional[PathLike] = None,
+    resume: bool = True,
+    progress: Optional[Progress] = None,
+) -> BatchResult:
+    """Shard every task with :func:`~aas_holo_shard.aas.shard.split_aas`.
+
+    ``workers`` defaults to the CPU count; ``workers=1`` runs in-process. With
+    a ``journal``, tasks already completed with the same inputs and options
+    are skipped (``resume=False`` starts the journal afresh).
+    """
+    if n < 1 or k < 1 or k > n:
+        raise ValueError("n and k must be >= 1 and k cannot be greater than n")
+    options = {"n": n, "k": k, "regex": regex, "backend": backend, "streaming": streaming}
+    return _run(_split_one, tasks, options, workers, journal, resume, progress)
+
+
+def run_combine_batch(
+    tasks: Sequence[CombineTask],
+    *,
+    regex: bool = False,
+    streaming: bool = False,
+    workers: Optional[int] = None,
+    journal: Optional[PathLike] = None,
+    resume: bool = True,
+    progress: Optional[Progress] = None,
+) -> BatchResult:
+    """Recover every task with :func:`~aas_holo_shard.aas.shard.combine_aas_many`.
+
+    Worker, journal and resume handling match :func:`run_split_batch`.
+    """
+    options = {"regex": regex, "streaming": streaming}
+    return _run(_combine_one, tasks, options, workers, journal, resume, progress)
+
+
+_REPORT_FIELDS = ("task", "status", "inputs", "outputs", "error", "seconds")
+
+
+def write_report(result: BatchResult, path: PathLike) -> Path:
+    """Write ``result`` as CSV (``.csv``) or JSON (anything else)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    if path.suffix.lower() == ".csv":
+        with path.open("w", newline="") as handle:
+            writer = csv.DictWriter(handle, fieldnames=_REPORT_FIELDS)
+            writer.writeheader()
+            for record in result.records:
+                row = {name: getattr(record, name) for name in _REPORT_FIELDS}
+                row["inputs"] = ";".join(record.inputs)
+                row["outputs"] = ";".join(record.outputs)
+                row["seconds"] = f"{record.seconds:.6f}"
+                writer.writerow(row)
+    else:
+        payload = {
+            "summary": result.summary(),
+            "records": [record.to_dict() for record in result.records],
+        }
+        path.write_text(json.dumps(payload, indent=2))
+    return path
+
+
+def _print_progress(record: BatchRecord, done: int, total: int) -> None:
+    import sys
+
+    width = len(str(total))
+    line = f"[{done:>{width}}/{total}] {record.status:<7} {record.task}"
+    if record.error:
+        line += f": {record.error}"
+    print(line, file=sys.stderr, flush=True)
+
+
+def run_cli(args: Any) -> int:
+    """Handle the ``split-batch`` and ``combine-batch`` CLI subcommands."""
+    splitting = args.command == "split-batch"
+    tasks: List[Any] = []
+    if args.manifest:
+        load = load_split_manifest if splitting else load_combine_manifest
+        tasks.extend(load(args.manifest, args.output_dir, args.id, regex=args.regex))
+    if args.inputs:
+        if splitting:
+            tasks.extend(
+                discover_split_tasks(
+                    args.inputs, args.output_dir, args.id, pattern=args.pattern, regex=args.regex
+                )
+            )
+        else:
+            tasks.extend(
+                discover_combine_tasks(args.inputs, args.output_dir, args.id, regex=args.regex)
+            )
+    if not tasks:
+        raise ValueError("nothing to do: give input files, directories or --manifest")
+
+    journal = args.journal or Path(args.output_dir) / (
+        SPLIT_JOURNAL if splitting else COMBINE_JOURNAL
+    )
+    common: Dict[str, Any] = {
+        "regex": args.regex,
+        "streaming": args.stream,
+        "workers": args.workers,
+        "journal": journal,
+        "resume": not args.no_resume,
+        "progress": None if args.quiet else _print_progress,
+    }
+    if splitting:
+        result = run_split_batch(tasks, args.n, args.k, backend=args.backend, **common)
+    else:
+        result = run_combine_batch(tasks, **common)
+
+    if args.report:
+        write_report(result, args.report)
+    summary = result.summary()
+    print(
+        f"{summary['total']} tasks: {summary['ok']} ok, {summary['failed']} failed, "
+        f"{summary['skipped']} skipped"
+    )
+    return 1 if result.failed else 0
@@ -0,0 +1,96 @@
+"""Single-pass idShort index for AAS JSON documents."""
+
+from __future__ import annotations
+
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+PATH_SEPARATOR = "/"
+
+
+class DuplicateElementError(ValueError):
+    """Raised when an idShort lookup matches more than one element."""
+
+
+class ElementIndex:
+    """Map idShorts and idShort paths to the elements of a parsed AAS tree.
+
+    The tree is traversed once. Only elements carrying both ``idShort`` and
+    ``value`` are indexed (the same elements :func:`find_element` matches),
+    while every ancestor with an ``idShort`` contributes to the element path,
+    e.g. ``ProductionParams/Collection/MasterKey``. Indexed values are
+    references into the tree, so mutating them mutates the document.
+    """
+
+    def __init__(self, aas_json: Any) -> None:
+        self._by_id: Dict[str, List[dict]] = {}
+        self._by_path: Dict[str, List[dict]] = {}
+        self._entries: List[Tuple[str, str, dict]] = []
+
+        stack: List[Tuple[Any, Tuple[str, ...]]] = [(aas_json, ())]
+        while stack:
+            node, parents = stack.pop()
+            if isinstance(node, dict):
+                id_short = node.get("idShort")
+                if isinstance(id_short, str):
+                    parents = parents + (id_short,)
+                    if "value" in node:
+                        self._add(id_short, PATH_SEPARATOR.join(parents), node)
+                children = node.values()
+            elif isinstance(node, list):
+                children = node
+            else:
+                continue
+            stack.extend((child, parents) for child in reversed(list(children)))
+
+    @classmethod
+    def from_entries(cls, entries: Iterable[Tuple[str, str, Any]]) -> "ElementIndex":
+        """Build an index from ``(idShort, path, element)`` triples in document order.
+
+        Used by scanners that locate elements without a parsed tree; the
+        elements can then be any object.
+        """
+        index = cls([])
+        for id_short, path, element in entries:
+            index._add(id_short, path, element)
+        return index
+
+    def _add(self, id_short: str, path: str, element: Any) -> None:
+        self._by_id.setdefault(id_short, []).append(element)
+        self._by_path.setdefault(path, []).append(element)
+        self._entries.append((id_short, path, element))
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._table(key)
+
+    def _table(self, key: str) -> Dict[str, List[dict]]:
+        return self._by_path if PATH_SEPARATOR in key else self._by_id
+
+    def get(self, key: str) -> Optional[dict]:
+        """Return the element for an idShort or idShort path, or ``None``.
+
+        Raises :class:`DuplicateElementError` if ``key`` is ambiguous; use the
+        full path (see :meth:`paths`) to select one of the candidates.
+        """
+        matches = self._table(key).get(key)
+        if not matches:
+            return None
+        if len(matches) > 1:
+            raise DuplicateElementError(
+                f"idShort '{key}' is ambiguous; use one of: {self.paths(key)}"
+            )
+        return matches[0]
+
+    def paths(self, id_short: str) -> List[str]:
+        """Return the full paths of every element with ``id_short``."""
+        return [path for name, path, _ in self._entries if name == id_short]
+
+    def duplicates(self) -> Dict[str, List[str]]:
+        """Return idShorts that occur more than once, mapped to their paths."""
+        return {name: self.paths(name) for name, elems in self._by_id.items() if len(elems) > 1}
+
+    def entries(self) -> Iterator[Tuple[str, str, dict]]:
+        """Yield ``(idShort, path, element)`` in document order."""
+        return iter(self._entries)
@@ -3,9 +3,12 @@
 from __future__ import annotations
 
 from pathlib import Path
-from typing import Any, Tuple, Union
+from typing import TYPE_CHECKING, Any, Optional, Tuple, Union
 
-from aas_holo_shard.core import shamir
+from aas_holo_shard import instrumentation
+
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.core.shamir import Share
 
 
 def read_aasx_bytes(path: Union[str, Path]) -> bytes:
@@ -23,12 +26,58 @@ def encrypt_aasx_path(
     *,
     threshold: int,
     total: int,
-) -> tuple[bytes, list[shamir.Share]]:
+) -> tuple[bytes, list[Share]]:
     """Encrypt an AASX file and split the key into shares."""
+    from aas_holo_shard.core import shamir
+
     aas_bytes = read_aasx_bytes(input_path)
     return shamir.encrypt_and_split(aas_bytes, threshold=threshold, total=total)
 
 
+def encrypt_aasx_file(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    *,
+    threshold: int,
+    total: int,
+    chunk_size: Optional[int] = None,
+) -> list[Share]:
+    """Encrypt an AASX file to ``output_path`` without loading it into memory."""
+    from aas_holo_shard.core import stream
+
+    return stream.encrypt_file_and_split(
+        input_path,
+        output_path,
+        threshold=threshold,
+        total=total,
+        chunk_size=chunk_size or stream.DEFAULT_CHUNK_SIZE,
+    )
+
+
+def decrypt_aasx_file(
+    encrypted_path: Union[str, Path],
+    output_path: Union[str, Path],
+    shares: list[Share],
+    *,
+    chunk_size: Optional[int] = None,
+    threshold: Optional[int] = None,
+) -> None:
+    """Decrypt an encrypted AASX file; the output only appears once verified.
+
+    With ``threshold``, faulty shares among the extra ones are corrected
+    before the single tag check.
+    """
+    from aas_holo_shard.core import stream
+
+    stream.reconstruct_and_decrypt_file(
+        encrypted_path,
+        output_path,
+        shares,
+        chunk_size=chunk_size or stream.DEFAULT_CHUNK_SIZE,
+        threshold=threshold,
+    )
+
+
 def _require_basyx() -> Tuple[Any, Any, Any, Any]:
     try:
         from basyx.aas.adapter.aasx import AASXReader, AASXWriter
@@ -54,7 +103,8 @@ def load_aasx_basyx(path: Union[str, Path]):
     object_store = DictObjectStore()
     file_store = DictSupplementaryFileContainer()
 
-    with AASXReader(str(path)) as reader:
-        reader.read_into(object_store, file_store)
+    with instrumentation.span("aasx.load_basyx", file=str(path)):
+        with AASXReader(str(path)) as reader:
+            reader.read_into(object_store, file_store)
 
     return object_store, file_store
@@ -0,0 +1,275 @@
+"""Selective per-part encryption of AASX packages.
+
+Only the zip entries matched by a policy are encrypted. Each match is stored as
+``<name>.ahs``, an AHS1 blob encrypted with one package key that is split into
+Shamir shares. The entry name is authenticated as associated data, so swapping
+ciphertexts between parts fails verification.
+
+Every other entry is copied byte for byte, still compressed, without being
+inflated (falling back to recompressing it if this Python's :mod:`zipfile`
+lacks the internals the raw copy relies on). A plaintext manifest at
+:data:`MANIFEST_NAME` lists the encrypted parts, so a reader can decrypt just
+the one part it needs.
+"""
+
+from __future__ import annotations
+
+import copy
+import io
+import json
+import shutil
+import struct
+import tempfile
+import zipfile
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import IO, Callable, Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from aas_holo_shard.core import shamir, stream
+
+MANIFEST_NAME = "aas-holo-shard/encrypted-parts.json"
+ENCRYPTED_SUFFIX = ".ahs"
+MANIFEST_VERSION = 1
+
+PartPolicy = Union[str, Sequence[str], Callable[[str], bool]]
+
+# Local file header (APPNOTE 4.3.7); the last two fields are the lengths of
+# the file name and extra field that precede the entry data.
+_LOCAL_HEADER = struct.Struct("<4s2B4HL2L2H")
+_LOCAL_SIGNATURE = b"PK\x03\x04"
+
+# Raw copies go through undocumented zipfile internals: _strip_extra,
+# ZipInfo.FileHeader and ZipFile._didModify. They have been stable since
+# Python 3.6, but are checked for (see _copy_entry) rather than assumed.
+_RAW_COPY = hasattr(zipfile, "_strip_extra") and hasattr(zipfile.ZipInfo, "FileHeader")
+
+
+def _policy_matcher(policy: PartPolicy) -> Callable[[str], bool]:
+    if callable(policy):
+        return policy
+    patterns = [policy] if isinstance(policy, str) else list(policy)
+    return lambda name: any(fnmatchcase(name, pattern) for pattern in patterns)
+
+
+def _copy_entry(
+    raw: IO[bytes], source: zipfile.ZipFile, info: zipfile.ZipInfo, target: zipfile.ZipFile
+) -> None:
+    """Copy ``info`` unchanged, raw if possible, else by recompressing it."""
+    if _RAW_COPY and hasattr(target, "_didModify"):
+        _copy_raw(raw, info, target)
+    else:
+        _copy_recompressed(source, info, target)
+
+
+def _copy_recompressed(
+    source: zipfile.ZipFile, info: zipfile.ZipInfo, target: zipfile.ZipFile
+) -> None:
+    clone = zipfile.ZipInfo(info.filename, date_time=info.date_time)
+    clone.compress_type = info.compress_type
+    clone.external_attr = info.external_attr
+    clone.comment = info.comment
+    if info.is_dir():
+        target.writestr(clone, b"")
+        return
+    force_zip64 = info.file_size > zipfile.ZIP64_LIMIT
+    with source.open(info) as src, target.open(clone, "w", force_zip64=force_zip64) as dst:
+        shutil.copyfileobj(src, dst, stream.DEFAULT_CHUNK_SIZE)
+
+
+def _copy_raw(source: IO[bytes], info: zipfile.ZipInfo, target: zipfile.ZipFile) -> None:
+    """Append ``info`` from ``source`` to ``target`` without recompressing it."""
+    source.seek(info.header_offset)
+    header = _LOCAL_HEADER.unpack(source.read(_LOCAL_HEADER.size))
+    if header[0] != _LOCAL_SIGNATURE:
+        raise zipfile.BadZipFile(f"bad local file header for {info.filename!r}")
+    source.seek(header[-2] + header[-1], 1)
+
+    clone = copy.copy(info)
+    # Sizes and CRC are known up front, so no trailing data descriptor is needed.
+    clone.flag_bits &= ~0x08
+    clone.extra = zipfile._strip_extra(info.extra, (1,))
+    clone.header_offset = target.fp.tell()
+    zip64 = max(clone.file_size, clone.compress_size) > zipfile.ZIP64_LIMIT
+    target.fp.write(clone.FileHeader(zip64))
+
+    remaining = info.compress_size
+    while remaining:
+        block = source.read(min(remaining, stream.DEFAULT_CHUNK_SIZE))
+        if not block:
+            raise zipfile.BadZipFile(f"truncated entry {info.filename!r}")
+        target.fp.write(block)
+        remaining -= len(block)
+
+    target.filelist.append(clone)
+    target.NameToInfo[clone.filename] = clone
+    target.start_dir = target.fp.tell()
+    target._didModify = True
+
+
+def _encrypt_part(key: bytes, name: str, src: IO[bytes], dst: IO[bytes]) -> int:
+    nonce = shamir.get_random_bytes(shamir.NONCE_SIZE)
+    cipher = shamir.AES.new(key, shamir.AES.MODE_GCM, nonce=nonce)
+    cipher.update(name.encode("utf-8"))
+    dst.write(shamir.MAGIC + nonce + bytes(shamir.TAG_SIZE))
+    size = stream._pump(cipher.encrypt, src, dst, stream.DEFAULT_CHUNK_SIZE)
+    dst.seek(len(shamir.MAGIC) + shamir.NONCE_SIZE)
+    dst.write(cipher.digest())
+    dst.seek(0)
+    return size
+
+
+def _decrypt_part(key: bytes, name: str, src: IO[bytes], dst: IO[bytes]) -> int:
+    header = src.read(stream.HEADER_SIZE)
+    if len(header) < stream.HEADER_SIZE or not header.startswith(shamir.MAGIC):
+        raise shamir.CryptoError(f"encrypted part {name!r} has no AHS1 header")
+    nonce = header[len(shamir.MAGIC) : len(shamir.MAGIC) + shamir.NONCE_SIZE]
+    tag = header[len(shamir.MAGIC) + shamir.NONCE_SIZE :]
+    cipher = shamir.AES.new(key, shamir.AES.MODE_GCM, nonce=nonce)
+    cipher.update(name.encode("utf-8"))
+    size = stream._pump(cipher.decrypt, src, dst, stream.DEFAULT_CHUNK_SIZE)
+    try:
+        cipher.verify(tag)
+    except ValueError as exc:
+        raise shamir.CryptoError(f"MAC check failed for part {name!r}") from exc
+    return size
+
+
+def encrypt_aasx_parts(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    policy: PartPolicy,
+    *,
+    threshold: int,
+    total: int,
+    backend: str = shamir.BACKEND_PYCRYPTODOME,
+) -> List[shamir.Share]:
+    """Encrypt the entries of an AASX matched by ``policy`` and split the key.
+
+    ``policy`` is a glob, a list of globs or a predicate over entry names
+    (for example ``"aasx/*/submodel*.json"``). Entry order is preserved.
+    """
+    shamir._validate_thresholds(threshold, total)
+    shamir._validate_backend(backend)
+    matches = _policy_matcher(policy)
+    key = shamir.get_random_bytes(shamir.KEY_SIZE)
+
+    with open(input_path, "rb") as raw, zipfile.ZipFile(raw) as source:
+        with stream._atomic_output(Path(output_path)) as handle:
+            with zipfile.ZipFile(handle, "w") as target:
+                _seal_parts(raw, source, target, matches, key, backend)
+    return shamir._split_key(key, threshold, total, backend)
+
+
+def _seal_parts(
+    raw: IO[bytes],
+    source: zipfile.ZipFile,
+    target: zipfile.ZipFile,
+    matches: Callable[[str], bool],
+    key: bytes,
+    backend: str,
+) -> None:
+    parts: List[Dict[str, object]] = []
+    for info in source.infolist():
+        if info.filename == MANIFEST_NAME:
+            raise shamir.CryptoError("package already contains encrypted parts")
+        if info.is_dir() or not matches(info.filename):
+            _copy_entry(raw, source, info, target)
+            continue
+
+        entry = info.filename + ENCRYPTED_SUFFIX
+        spool = tempfile.SpooledTemporaryFile(max_size=stream.DEFAULT_CHUNK_SIZE)
+        with spool as sealed, source.open(info) as plain:
+            _encrypt_part(key, info.filename, plain, sealed)
+            sealed_info = zipfile.ZipInfo(entry, date_time=info.date_time)
+            sealed_info.external_attr = info.external_attr
+            with target.open(sealed_info, "w", force_zip64=True) as out:
+                shutil.copyfileobj(sealed, out, stream.DEFAULT_CHUNK_SIZE)
+        parts.append(
+            {
+                "name": info.filename,
+                "entry": entry,
+                "size": info.file_size,
+                "compress_type": info.compress_type,
+            }
+        )
+
+    manifest = {"version": MANIFEST_VERSION, "backend": backend, "parts": parts}
+    target.writestr(MANIFEST_NAME, json.dumps(manifest, indent=2))
+
+
+def read_parts_manifest(package_path: Union[str, Path]) -> Dict[str, Dict[str, object]]:
+    """Return the encrypted-part manifest keyed by original entry name."""
+    with zipfile.ZipFile(package_path) as archive:
+        return _load_manifest(archive)[1]
+
+
+def _load_manifest(archive: zipfile.ZipFile) -> Tuple[str, Dict[str, Dict[str, object]]]:
+    try:
+        manifest = json.loads(archive.read(MANIFEST_NAME))
+    except KeyError:
+        raise shamir.CryptoError("package has no encrypted-part manifest") from None
+    if manifest.get("version") != MANIFEST_VERSION:
+        raise shamir.CryptoError("unsupported encrypted-part manifest version")
+    backend = str(manifest.get("backend", shamir.BACKEND_PYCRYPTODOME))
+    return backend, {part["name"]: part for part in manifest["parts"]}
+
+
+def decrypt_aasx_part(
+    package_path: Union[str, Path],
+    name: str,
+    shares: Iterable[shamir.Share],
+    *,
+    backend: Optional[str] = None,
+) -> bytes:
+    """Decrypt a single encrypted part without touching any other entry."""
+    with zipfile.ZipFile(package_path) as archive:
+        sealed_with, manifest = _load_manifest(archive)
+        if name not in manifest:
+            raise KeyError(f"{name!r} is not an encrypted part of this package")
+        key = shamir._combine_key(shares, backend or sealed_with)
+        output = io.BytesIO()
+        with archive.open(str(manifest[name]["entry"])) as sealed:
+            _decrypt_part(key, name, sealed, output)
+        return output.getvalue()
+
+
+def decrypt_aasx_parts(
+    package_path: Union[str, Path],
+    output_path: Union[str, Path],
+    shares: Iterable[shamir.Share],
+    *,
+    backend: Optional[str] = None,
+) -> None:
+    """Restore the original AASX; ``output_path`` only appears once every part verifies."""
+    with open(package_path, "rb") as raw, zipfile.ZipFile(raw) as source:
+        sealed_with, manifest = _load_manifest(source)
+        key = shamir._combine_key(shares, backend or sealed_with)
+        by_entry = {str(part["entry"]): part for part in manifest.values()}
+
+        with stream._atomic_output(Path(output_path)) as handle:
+            with zipfile.ZipFile(handle, "w") as target:
+                _unseal_parts(raw, source, target, by_entry, key)
+
+
+def _unseal_parts(
+    raw: IO[bytes],
+    source: zipfile.ZipFile,
+    target: zipfile.ZipFile,
+    by_entry: Dict[str, Dict[str, object]],
+    key: bytes,
+) -> None:
+    for info in source.infolist():
+        if info.filename == MANIFEST_NAME:
+            continue
+        part = by_entry.get(info.filename)
+        if part is None:
+            _copy_entry(raw, source, info, target)
+            continue
+
+        name = str(part["name"])
+        restored = zipfile.ZipInfo(name, date_time=info.date_time)
+        restored.external_attr = info.external_attr
+        restored.compress_type = int(part["compress_type"])
+        restored.file_size = int(part["size"])
+        with source.open(info) as sealed, target.open(restored, "w") as out:
+            _decrypt_part(key, name, sealed, out)
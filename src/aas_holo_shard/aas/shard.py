@@ -3,16 +3,53 @@
 from __future__ import annotations
 
 import argparse
+import fnmatch
+import functools
 import json
+import operator
+import re
 import secrets
 import sys
 from pathlib import Path
-from typing import Any, Iterable, List, Optional, Sequence, Tuple, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+
+from aas_holo_shard import instrumentation
+from aas_holo_shard.aas.index import ElementIndex
 
 PRIME = 2**521 - 1
+LAGRANGE_CACHE_SIZE = 256
+_FIELD_BYTES = (PRIME.bit_length() + 7) // 8
 SHARD_PREFIX = "SHARD_V1"
+SHARD_GF_PREFIX = "SHARD_GF1"
+SHARD_DESCRIPTION = "ENCRYPTED HOLOGRAPHIC SHARD - UNREADABLE ALONE"
+
+BACKEND_PRIME = "prime"
+BACKEND_GF256 = "gf256"
+BACKENDS = (BACKEND_PRIME, BACKEND_GF256)
 
 Shard = Tuple[int, int]
+# GF(2^8) shards are ``(index, bytes)``; see :mod:`aas_holo_shard.core.gf256`.
+AnyShard = Union[Shard, Tuple[int, bytes]]
+TargetSpec = Union[str, Sequence[str]]
+
+
+class ShardMeta(NamedTuple):
+    """Threshold, shard count and random id shared by all shards of one value."""
+
+    k: int
+    n: int
+    sharing_id: str
 
 
 def _eval_poly(poly: Sequence[int], x: int) -> int:
@@ -54,26 +91,151 @@ def make_shards(secret_int: int, n: int, k: int) -> List[Shard]:
     return shards
 
 
+def _batch_inverse(values: Sequence[int]) -> List[int]:
+    """Invert every value modulo PRIME with one modular inversion (Montgomery's trick)."""
+    prefixes: List[int] = []
+    acc = 1
+    for value in values:
+        if value % PRIME == 0:
+            raise ValueError("modular inverse does not exist")
+        prefixes.append(acc)
+        acc = (acc * value) % PRIME
+
+    inverse = _mod_inverse(acc)
+    result = [0] * len(values)
+    for i in range(len(values) - 1, -1, -1):
+        result[i] = (inverse * prefixes[i]) % PRIME
+        inverse = (inverse * values[i]) % PRIME
+    return result
+
+
+@functools.lru_cache(maxsize=LAGRANGE_CACHE_SIZE)
+def _lagrange_at_zero(x_s: Tuple[int, ...]) -> Tuple[int, ...]:
+    # Numerators prod_{m != j} (-x_m) come from prefix/suffix products; the
+    # denominators prod_{m != j} (x_j - x_m) share a single batched inversion.
+    count = len(x_s)
+    prefix = [1] * (count + 1)
+    for j, xj in enumerate(x_s):
+        prefix[j + 1] = (prefix[j] * -xj) % PRIME
+    suffix = [1] * (count + 1)
+    for j in range(count - 1, -1, -1):
+        suffix[j] = (suffix[j + 1] * -x_s[j]) % PRIME
+
+    denominators: List[int] = []
+    for j, xj in enumerate(x_s):
+        denominator = 1
+        for m, xm in enumerate(x_s):
+            if m != j:
+                denominator = (denominator * (xj - xm)) % PRIME
+        denominators.append(denominator)
+
+    inverses = _batch_inverse(denominators)
+    return tuple((prefix[j] * suffix[j + 1] * inverses[j]) % PRIME for j in range(count))
+
+
+def lagrange_coefficients(x_coords: Sequence[int]) -> List[int]:
+    """Return the Lagrange basis coefficients at ``x = 0`` for ``x_coords``.
+
+    Results are cached per set of x-coordinates (bounded LRU), so repeated
+    reconstructions with the same shard holders skip the interpolation setup.
+    """
+    key = tuple(sorted(x_coords))
+    if len(set(key)) != len(key):
+        raise ValueError("shard x-coordinates must be unique")
+    by_x = dict(zip(key, _lagrange_at_zero(key)))
+    return [by_x[x] for x in x_coords]
+
+
+def _random_field_elements(count: int) -> List[int]:
+    """Draw ``count`` uniform elements of the field from one ``token_bytes`` call."""
+    raw = secrets.token_bytes(count * _FIELD_BYTES)
+    values: List[int] = []
+    for offset in range(0, len(raw), _FIELD_BYTES):
+        # PRIME is 2**521 - 1, so masking yields [0, PRIME]; only PRIME itself
+        # is out of range and gets redrawn.
+        value = int.from_bytes(raw[offset : offset + _FIELD_BYTES], "big") & PRIME
+        while value == PRIME:  # pragma: no cover - probability 2**-521
+            value = secrets.randbelow(PRIME)
+        values.append(value)
+    return values
+
+
+def make_shards_batch(secret_ints: Sequence[int], n: int, k: int) -> List[Tuple[int, List[int]]]:
+    """Shard many secrets with a shared ``(n, k)`` in one batch.
+
+    Returns one ``(x, ys)`` column per holder, where ``ys[i]`` is the shard of
+    ``secret_ints[i]``; this is the layout :func:`recover_secrets` accepts.
+    Randomness for every polynomial is drawn in bulk and the powers of each
+    ``x`` are computed once for the whole batch.
+    """
+    if k < 1 or n < 1:
+        raise ValueError("n and k must be >= 1")
+    if k > n:
+        raise ValueError("k cannot be greater than n")
+    if any(secret >= PRIME for secret in secret_ints):
+        raise ValueError("secret is too large for the chosen prime field")
+
+    count = len(secret_ints)
+    degree = k - 1
+    randomness = _random_field_elements(count * degree)
+    polys = [randomness[i * degree : (i + 1) * degree] for i in range(count)]
+
+    columns: List[Tuple[int, List[int]]] = []
+    for x in range(1, n + 1):
+        powers = [pow(x, j, PRIME) for j in range(1, k)]
+        ys = [
+            (secret + sum(map(operator.mul, poly, powers))) % PRIME
+            for secret, poly in zip(secret_ints, polys)
+        ]
+        columns.append((x, ys))
+    return columns
+
+
 def recover_secret(shards: Iterable[Shard]) -> int:
     shard_list = list(shards)
     if not shard_list:
         raise ValueError("at least one shard is required")
 
-    x_s, y_s = zip(*shard_list)
-    secret = 0
+    with instrumentation.span("shard.recover_secret", shares=len(shard_list)):
+        x_s, y_s = zip(*shard_list)
+        coefficients = lagrange_coefficients(x_s)
+        secret = sum(y * c for y, c in zip(y_s, coefficients)) % PRIME
+    instrumentation.count("shares.processed", len(shard_list))
+    return secret
 
-    for j, (xj, yj) in enumerate(zip(x_s, y_s)):
-        numerator = 1
-        denominator = 1
-        for m, xm in enumerate(x_s):
-            if m == j:
-                continue
-            numerator = (numerator * (-xm)) % PRIME
-            denominator = (denominator * (xj - xm)) % PRIME
-        lagrange = (numerator * _mod_inverse(denominator)) % PRIME
-        secret = (secret + yj * lagrange) % PRIME
 
-    return secret
+def recover_secret_robust(shards: Iterable[Shard], k: int) -> Tuple[int, List[int]]:
+    """Recover the secret from more than ``k`` shards, correcting faulty ones.
+
+    Up to ``(len(shards) - k) // 2`` wrong shards are corrected by
+    Berlekamp–Welch decoding (:mod:`aas_holo_shard.core.robust`); returns the
+    secret and the x-coordinates of the faulty shards.
+    """
+    from aas_holo_shard.core import robust
+
+    shard_list = list(shards)
+    with instrumentation.span("shard.recover_secret", shares=len(shard_list), robust=True):
+        poly, faulty = robust.decode(robust.PrimeField(PRIME), shard_list, k)
+    instrumentation.count("shares.processed", len(shard_list))
+    return poly[0], faulty
+
+
+def recover_secrets(columns: Sequence[Tuple[int, Sequence[int]]]) -> List[int]:
+    """Recover many secrets whose shards come from the same holders.
+
+    ``columns`` holds one ``(x, ys)`` pair per holder, where ``ys[i]`` is that
+    holder's shard of secret ``i``. The Lagrange coefficients are computed
+    once for the whole batch.
+    """
+    if not columns:
+        raise ValueError("at least one shard is required")
+    x_s = [x for x, _ in columns]
+    y_columns = [ys for _, ys in columns]
+    if len({len(ys) for ys in y_columns}) != 1:
+        raise ValueError("every holder must supply one shard per secret")
+
+    coefficients = lagrange_coefficients(x_s)
+    return [sum(y * c for y, c in zip(row, coefficients)) % PRIME for row in zip(*y_columns)]
 
 
 def str_to_int(value: str) -> int:
@@ -88,74 +250,518 @@ def int_to_str(value: int) -> str:
 
 
 def find_element(aas_json: Any, id_short: str) -> Optional[dict]:
-    if isinstance(aas_json, dict):
-        if aas_json.get("idShort") == id_short and "value" in aas_json:
-            return aas_json
-        for item in aas_json.values():
-            found = find_element(item, id_short)
-            if found is not None:
-                return found
-    elif isinstance(aas_json, list):
-        for item in aas_json:
-            found = find_element(item, id_short)
-            if found is not None:
-                return found
-    return None
-
-
-def _parse_shard_value(raw_value: str) -> Optional[Shard]:
-    if not raw_value.startswith(f"{SHARD_PREFIX}:"):
-        return None
+    """Look up an element by idShort or idShort path.
+
+    Builds a throwaway :class:`ElementIndex`; callers doing several lookups on
+    the same tree should build the index once and query it directly.
+    """
+    return ElementIndex(aas_json).get(id_short)
+
+
+def _is_pattern(selector: str) -> bool:
+    return any(char in selector for char in "*?[")
+
+
+def _as_selectors(targets: TargetSpec) -> List[str]:
+    if isinstance(targets, str):
+        return [targets]
+    return list(targets)
+
+
+def resolve_targets(
+    aas_json: Union[ElementIndex, Any],
+    targets: TargetSpec,
+    *,
+    regex: bool = False,
+    predicate: Optional[Callable[[dict], bool]] = None,
+) -> List[str]:
+    """Expand idShort selectors into a de-duplicated, ordered list of idShorts.
+
+    Plain idShorts and idShort paths are returned as-is. Glob selectors (``*``,
+    ``?``, ``[``) or, with ``regex=True``, regular expressions are matched
+    against the idShorts (or, for selectors containing ``/``, the idShort
+    paths) of the elements that satisfy ``predicate``.
+    """
+    resolved: List[str] = []
+    candidates: Optional[List[Tuple[str, str]]] = None
+
+    for selector in _as_selectors(targets):
+        if not regex and not _is_pattern(selector):
+            matches = [selector]
+        else:
+            if candidates is None:
+                index = aas_json if isinstance(aas_json, ElementIndex) else ElementIndex(aas_json)
+                candidates = [
+                    (name, path)
+                    for name, path, elem in index.entries()
+                    if predicate is None or predicate(elem)
+                ]
+            use_path = "/" in selector
+            names = [path if use_path else name for name, path in candidates]
+            if regex:
+                compiled = re.compile(selector)
+                matches = [name for name in names if compiled.fullmatch(name)]
+            else:
+                matches = [name for name in names if fnmatch.fnmatchcase(name, selector)]
+
+        for name in matches:
+            if name not in resolved:
+                resolved.append(name)
+
+    return resolved
+
+
+def _new_sharing_id() -> str:
+    return secrets.token_hex(8)
+
+
+def _format_shard_value(shard: AnyShard, meta: Optional[ShardMeta] = None) -> str:
+    x, y = shard
+    if isinstance(y, bytes):
+        value = f"{SHARD_GF_PREFIX}:{x}:{y.hex()}"
+    else:
+        value = f"{SHARD_PREFIX}:{x}:{y}"
+    if meta is not None:
+        value += f":{meta.k}:{meta.n}:{meta.sharing_id}"
+    return value
+
+
+def _parse_shard(raw_value: str) -> Optional[Tuple[AnyShard, Optional[ShardMeta]]]:
+    """Parse ``PREFIX:x:y`` or ``PREFIX:x:y:k:n:sharing_id`` into shard and metadata."""
     parts = raw_value.split(":")
-    if len(parts) != 3:
+    if parts[0] not in (SHARD_PREFIX, SHARD_GF_PREFIX) or len(parts) not in (3, 6):
         return None
-    return int(parts[1]), int(parts[2])
+    try:
+        x = int(parts[1])
+        y: Union[int, bytes] = (
+            int(parts[2]) if parts[0] == SHARD_PREFIX else bytes.fromhex(parts[2])
+        )
+        meta = ShardMeta(int(parts[3]), int(parts[4]), parts[5]) if len(parts) == 6 else None
+    except ValueError:
+        return None
+    return (x, y), meta
 
 
-def _inject_shard_value(element: dict, shard: Shard) -> None:
-    x, y = shard
-    element["value"] = f"{SHARD_PREFIX}:{x}:{y}"
-    element["description"] = [
+def _parse_shard_value(raw_value: str) -> Optional[AnyShard]:
+    parsed = _parse_shard(raw_value)
+    return parsed[0] if parsed else None
+
+
+def _make_value_shards(value: str, n: int, k: int, backend: str) -> List[AnyShard]:
+    if backend == BACKEND_GF256:
+        from aas_holo_shard.core import gf256
+
+        return list(gf256.split_secret(value.encode("utf-8"), k, n))
+    if backend != BACKEND_PRIME:
+        raise ValueError(f"unknown backend '{backend}'; choose from {BACKENDS}")
+    secret_int = str_to_int(value)
+    if secret_int >= PRIME:
+        raise ValueError("secret is too long for the current prime field; use the gf256 backend")
+    return list(make_shards(secret_int, n, k))
+
+
+def _recover_value_robust(shards: Sequence[AnyShard], k: int) -> Tuple[str, List[int]]:
+    if all(isinstance(y, bytes) for _, y in shards):
+        from aas_holo_shard.core import robust
+
+        secret, faulty = robust.combine_gf256(shards, k)  # type: ignore[arg-type]
+        return secret.decode("utf-8"), faulty
+    if any(isinstance(y, bytes) for _, y in shards):
+        raise ValueError("cannot combine shards produced by different backends")
+    secret_int, faulty = recover_secret_robust(shards, k)  # type: ignore[arg-type]
+    return int_to_str(secret_int), faulty
+
+
+def _recover_value(shards: Sequence[AnyShard]) -> str:
+    if all(isinstance(y, bytes) for _, y in shards):
+        from aas_holo_shard.core import gf256
+
+        secret = gf256.combine_shares(shards)  # type: ignore[arg-type]
+        return secret.decode("utf-8")
+    if any(isinstance(y, bytes) for _, y in shards):
+        raise ValueError("cannot combine shards produced by different backends")
+    return int_to_str(recover_secret(shards))  # type: ignore[arg-type]
+
+
+class _ShardCollector:
+    """Shards found so far for each target, grouped by the split they came from.
+
+    Shards with metadata are grouped by :class:`ShardMeta`, so shards of an
+    older split of the same element are never mixed in. A target is complete
+    once one group holds ``k`` distinct shards, or all ``n`` in ``robust``
+    mode, which decodes every shard it has and records the files of the
+    faulty ones in ``faulty``. Legacy ``PREFIX:x:y`` shards form a single
+    group and never complete early.
+    """
+
+    def __init__(self, robust: bool = False) -> None:
+        self.robust = robust
+        self.faulty: Dict[str, List[str]] = {}
+        self._groups: Dict[str, Dict[Optional[ShardMeta], Dict[int, Tuple[AnyShard, str]]]] = {}
+
+    def add(self, name: str, raw_value: str, source: str = "") -> None:
+        parsed = _parse_shard(raw_value)
+        if parsed is None:
+            return
+        shard, meta = parsed
+        group = self._groups.setdefault(name, {}).setdefault(meta, {})
+        group.setdefault(shard[0], (shard, source))
+
+    def _largest(self, name: str) -> Optional[Tuple[ShardMeta, Dict[int, Tuple[AnyShard, str]]]]:
+        groups = [(meta, group) for meta, group in self._groups.get(name, {}).items() if meta]
+        return max(groups, key=lambda item: len(item[1]), default=None)  # type: ignore[arg-type]
+
+    def complete(self, targets: Sequence[str]) -> bool:
+        for name in targets:
+            largest = self._largest(name)
+            if largest is None:
+                return False
+            meta, group = largest
+            if len(group) < (meta.n if self.robust else meta.k):
+                return False
+        return bool(targets)
+
+    def recover(self, name: str) -> str:
+        groups = self._groups.get(name)
+        if not groups:
+            raise ValueError(f"no valid shards found for '{name}'")
+        largest = self._largest(name)
+        if largest is not None and len(largest[1]) >= largest[0].k:
+            meta, group = largest
+            entries = list(group.values())
+            if not self.robust:
+                return _recover_value([shard for shard, _ in entries[: meta.k]])
+            value, faulty = _recover_value_robust([shard for shard, _ in entries], meta.k)
+            if faulty:
+                self.faulty[name] = [group[x][1] for x in faulty]
+            return value
+        if None in groups:
+            if self.robust:
+                raise ValueError(f"robust recovery of '{name}' needs shards that record k")
+            return _recover_value([shard for shard, _ in groups[None].values()])
+        assert largest is not None
+        meta, group = largest
+        raise ValueError(f"'{name}' needs {meta.k} shards from the same split, found {len(group)}")
+
+
+def _recover_targets(targets: Sequence[str], collector: _ShardCollector) -> Dict[str, str]:
+    if not targets:
+        raise ValueError("no valid shards found")
+
+    recovered: Dict[str, str] = {}
+    with instrumentation.span("aas.recover", targets=len(targets)):
+        for name in targets:
+            try:
+                recovered[name] = collector.recover(name)
+            except UnicodeDecodeError as exc:
+                raise ValueError(f"reconstructed secret of '{name}' is not valid UTF-8") from exc
+    return recovered
+
+
+def _shard_description() -> List[dict]:
+    return [
         {
             "language": "en",
-            "text": "ENCRYPTED HOLOGRAPHIC SHARD - UNREADABLE ALONE",
+            "text": SHARD_DESCRIPTION,
         }
     ]
 
 
+def _inject_shard_value(element: dict, shard: AnyShard, meta: Optional[ShardMeta] = None) -> None:
+    element["value"] = _format_shard_value(shard, meta)
+    element["description"] = _shard_description()
+
+
+def _build_shard_template(
+    aas_json: Any, elements: Sequence[dict]
+) -> Optional[Tuple[List[str], List[int]]]:
+    """Serialize ``aas_json`` once with placeholders for the sharded values.
+
+    Returns literal text segments interleaved with value slots, plus the index
+    into ``elements`` that fills each slot. Joining the segments with the
+    JSON-encoded shard values yields exactly ``json.dumps(doc, indent=2)`` of a
+    document built by :func:`_inject_shard_value`. Descriptions are identical
+    in every shard, so they are expanded into the segments up front. Returns
+    ``None`` if a placeholder cannot be located unambiguously.
+    """
+    token = secrets.token_hex(16)
+    markers: Dict[str, Tuple[int, bool]] = {}
+    for pos, elem in enumerate(elements):
+        elem["value"] = f"{token}:{pos}:value"
+        elem["description"] = f"{token}:{pos}:description"
+        markers[json.dumps(elem["value"])] = (pos, False)
+        markers[json.dumps(elem["description"])] = (pos, True)
+
+    text = json.dumps(aas_json, indent=2)
+    located: List[Tuple[int, str]] = []
+    for quoted in markers:
+        at = text.find(quoted)
+        if at < 0 or text.find(quoted, at + 1) >= 0:
+            return None
+        located.append((at, quoted))
+    located.sort()
+
+    description = json.dumps(_shard_description(), indent=2)
+    segments: List[str] = []
+    order: List[int] = []
+    pending = ""
+    cursor = 0
+    for at, quoted in located:
+        pos, is_description = markers[quoted]
+        pending += text[cursor:at]
+        cursor = at + len(quoted)
+        if is_description:
+            line = pending[pending.rfind("\n") + 1 :]
+            indent = line[: len(line) - len(line.lstrip(" "))]
+            pending += description.replace("\n", "\n" + indent)
+        else:
+            segments.append(pending)
+            order.append(pos)
+            pending = ""
+    segments.append(pending + text[cursor:])
+    return segments, order
+
+
+def _has_scalar_value(element: dict) -> bool:
+    return not isinstance(element.get("value"), (list, dict))
+
+
+def _scalar_value(name: str, value: Any) -> str:
+    """Return ``value`` as the string to shard; collections cannot be sharded."""
+    if isinstance(value, (list, dict)):
+        raise ValueError(
+            f"cannot shard '{name}': its value is a collection; select its Properties instead"
+        )
+    return str(value)
+
+
+def _is_shard_element(element: dict) -> bool:
+    return _parse_shard_value(str(element.get("value", ""))) is not None
+
+
 def split_aas(
     file_path: Union[str, Path],
-    target_id: str,
+    target_id: TargetSpec,
     n: int,
     k: int,
+    *,
+    regex: bool = False,
+    template: bool = True,
+    backend: str = BACKEND_PRIME,
+    streaming: bool = False,
+    output_dir: Optional[Union[str, Path]] = None,
 ) -> List[Path]:
+    """Shard one or more Property values into ``n`` AAS files.
+
+    ``target_id`` may be a single idShort, a list of idShorts, or glob/regex
+    selectors (see :func:`resolve_targets`). The source document is parsed
+    once and every shard file is written once, whatever the number of targets.
+    Patterns only match elements with scalar values; selecting a collection
+    explicitly raises :class:`ValueError` (shard its Properties instead).
+
+    With ``template=True`` the document is serialized a single time and each
+    shard file is produced by splicing its shard values into that template;
+    the output is byte-identical to re-serializing the document per shard.
+
+    ``backend="prime"`` writes ``SHARD_V1`` values over the 521-bit prime field
+    (secrets up to about 65 bytes); ``backend="gf256"`` writes byte-wise
+    ``SHARD_GF1`` values of any length. :func:`combine_aas_many` detects both.
+    Each value also records ``k``, ``n`` and a random id of the split.
+
+    ``streaming=True`` scans the document without parsing it and copies the
+    bytes around the targets through unchanged; see :mod:`aas_holo_shard.aas.stream`.
+    ``template`` does not apply in that mode.
+
+    Shard files are named ``<stem>_shard_<i>.json`` and written next to the
+    source unless ``output_dir`` is given.
+    """
+    if streaming:
+        from aas_holo_shard.aas import stream
+
+        return stream.split_aas_stream(
+            file_path, target_id, n, k, regex=regex, backend=backend, output_dir=output_dir
+        )
     source_path = Path(file_path)
-    original_aas = json.loads(source_path.read_text())
+    out_paths = _shard_paths(source_path, n, output_dir)
+    with instrumentation.span("aas.split", file=str(source_path), n=n, k=k, backend=backend):
+        return _split_aas(source_path, target_id, n, k, regex, template, backend, out_paths)
 
-    target_elem = find_element(original_aas, target_id)
-    if not target_elem:
-        raise ValueError(f"element '{target_id}' not found")
 
-    secret_val = str(target_elem["value"])
-    secret_int = str_to_int(secret_val)
-    if secret_int >= PRIME:
-        raise ValueError("secret is too long for the current prime field")
+def _shard_paths(
+    source_path: Path, n: int, output_dir: Optional[Union[str, Path]] = None
+) -> List[Path]:
+    directory = source_path.parent if output_dir is None else Path(output_dir)
+    return [directory / f"{source_path.stem}_shard_{idx + 1}.json" for idx in range(n)]
 
-    shards = make_shards(secret_int, n, k)
-    output_paths: List[Path] = []
 
-    for idx, shard in enumerate(shards, start=1):
-        shard_aas = json.loads(json.dumps(original_aas))
-        elem = find_element(shard_aas, target_id)
-        if elem is None:
-            raise ValueError("target element disappeared during copy")
-        _inject_shard_value(elem, shard)
+def _split_aas(
+    source_path: Path,
+    target_id: TargetSpec,
+    n: int,
+    k: int,
+    regex: bool,
+    template: bool,
+    backend: str,
+    out_paths: List[Path],
+) -> List[Path]:
+    with instrumentation.span("aas.parse", file=str(source_path)) as parse_span:
+        text = source_path.read_text()
+        parse_span.set("bytes", len(text))
+        original_aas = json.loads(text)
+        index = ElementIndex(original_aas)
+
+    with instrumentation.span("aas.search") as search_span:
+        target_ids = resolve_targets(index, target_id, regex=regex, predicate=_has_scalar_value)
+        search_span.set("targets", len(target_ids))
+    if not target_ids:
+        raise ValueError(f"no elements match {_as_selectors(target_id)}")
+
+    elements: List[dict] = []
+    shard_sets: List[List[AnyShard]] = []
+    metas: List[ShardMeta] = []
+    with instrumentation.span("aas.shard", targets=len(target_ids)):
+        for name in target_ids:
+            target_elem = index.get(name)
+            if not target_elem:
+                raise ValueError(f"element '{name}' not found")
+
+            value = _scalar_value(name, target_elem["value"])
+            try:
+                shard_sets.append(_make_value_shards(value, n, k, backend))
+            except ValueError as exc:
+                raise ValueError(f"cannot shard '{name}': {exc}") from exc
+            metas.append(ShardMeta(k, n, _new_sharing_id()))
+            elements.append(target_elem)
+    instrumentation.count("shares.created", n * len(elements))
+
+    with instrumentation.span("aas.write", files=n):
+        shard_template = _build_shard_template(original_aas, elements) if template else None
+
+        for idx, out_name in enumerate(out_paths):
+            if shard_template is not None:
+                segments, order = shard_template
+                with out_name.open("w") as handle:
+                    for segment, pos in zip(segments, order):
+                        handle.write(segment)
+                        shard_value = _format_shard_value(shard_sets[pos][idx], metas[pos])
+                        handle.write(json.dumps(shard_value))
+                    handle.write(segments[-1])
+            else:
+                # Every target is overwritten on each pass, so the parsed tree can
+                # be reused for all shard files instead of deep-copying it.
+                for elem, shards, meta in zip(elements, shard_sets, metas):
+                    _inject_shard_value(elem, shards[idx], meta)
+                out_name.write_text(json.dumps(original_aas, indent=2))
+
+    return out_paths
+
+
+def combine_aas_many(
+    files: Iterable[Union[str, Path]],
+    target_ids: TargetSpec,
+    output: Union[str, Path],
+    *,
+    regex: bool = False,
+    streaming: bool = False,
+) -> Dict[str, str]:
+    """Recover several sharded Property values in one pass over the shard files.
 
-        out_name = source_path.with_name(f"{source_path.stem}_shard_{idx}.json")
-        out_name.write_text(json.dumps(shard_aas, indent=2))
-        output_paths.append(out_name)
+    Files are read in order and reading stops as soon as every target has
+    ``k`` shards from the same split; the remaining files are not opened.
+    The first file doubles as the template for ``output``.
 
-    return output_paths
+    ``streaming=True`` scans the shard files without parsing them and writes the
+    output by copying the first file's bytes around the recovered values.
+    """
+    return _combine(files, target_ids, output, regex, streaming, _ShardCollector())
+
+
+def combine_aas_robust(
+    files: Iterable[Union[str, Path]],
+    target_ids: TargetSpec,
+    output: Union[str, Path],
+    *,
+    regex: bool = False,
+    streaming: bool = False,
+) -> Tuple[Dict[str, str], Dict[str, List[str]]]:
+    """Like :func:`combine_aas_many`, but correct corrupted or forged shards.
+
+    Every shard file is read (until all ``n`` shards of a split are found) and
+    the values are decoded with :func:`recover_secret_robust` or its GF(2^8)
+    counterpart, which corrects up to ``(shards - k) // 2`` bad shards per
+    value. Returns the recovered values and, per value, the files whose shard
+    was faulty.
+    """
+    collector = _ShardCollector(robust=True)
+    recovered = _combine(files, target_ids, output, regex, streaming, collector)
+    return recovered, collector.faulty
+
+
+def _combine(
+    files: Iterable[Union[str, Path]],
+    target_ids: TargetSpec,
+    output: Union[str, Path],
+    regex: bool,
+    streaming: bool,
+    collector: _ShardCollector,
+) -> Dict[str, str]:
+    if streaming:
+        from aas_holo_shard.aas import stream
+
+        return stream._combine_stream(files, target_ids, output, regex, collector)
+    files_list = [Path(path) for path in files]
+    if not files_list:
+        raise ValueError("no valid shards found")
+    with instrumentation.span("aas.combine", files=len(files_list)):
+        return _combine_aas_many(files_list, target_ids, Path(output), regex, collector)
+
+
+def _combine_aas_many(
+    files_list: List[Path],
+    target_ids: TargetSpec,
+    output_path: Path,
+    regex: bool,
+    collector: _ShardCollector,
+) -> Dict[str, str]:
+    targets: List[str] = []
+    restored_index: Optional[ElementIndex] = None
+    restored_aas: Any = None
+
+    for read, path in enumerate(files_list, start=1):
+        with instrumentation.span("aas.parse", file=str(path)) as parse_span:
+            text = path.read_text()
+            parse_span.set("bytes", len(text))
+            data = json.loads(text)
+            index = ElementIndex(data)
+        if restored_index is None:
+            restored_aas, restored_index = data, index
+
+        with instrumentation.span("aas.search", file=str(path)):
+            for name in resolve_targets(
+                index, target_ids, regex=regex, predicate=_is_shard_element
+            ):
+                if name not in targets:
+                    targets.append(name)
+
+            for name in targets:
+                elem = index.get(name)
+                if elem:
+                    collector.add(name, str(elem.get("value", "")), str(path))
+        if collector.complete(targets):
+            break
+    instrumentation.count("aas.files_read", read)
+
+    recovered = _recover_targets(targets, collector)
+    for name, value in recovered.items():
+        elem = restored_index.get(name) if restored_index else None
+        if elem is None:
+            raise ValueError(f"element '{name}' not found in restored file")
+        elem["value"] = value
+        elem.pop("description", None)
+
+    with instrumentation.span("aas.write", file=str(output_path)):
+        output_path.write_text(json.dumps(restored_aas, indent=2))
+    return recovered
 
 
 def combine_aas(
@@ -163,38 +769,17 @@ def combine_aas(
     target_id: str,
     output: Union[str, Path],
 ) -> str:
-    raw_shards: List[Shard] = []
-    files_list = [Path(path) for path in files]
+    recovered = combine_aas_many(files, [target_id], output)
+    return recovered[target_id]
 
-    for path in files_list:
-        data = json.loads(path.read_text())
-        elem = find_element(data, target_id)
-        if not elem:
-            continue
-        value = str(elem.get("value", ""))
-        shard = _parse_shard_value(value)
-        if shard:
-            raw_shards.append(shard)
-
-    if not raw_shards:
-        raise ValueError("no valid shards found")
 
-    recovered_int = recover_secret(raw_shards)
-    try:
-        recovered_str = int_to_str(recovered_int)
-    except UnicodeDecodeError as exc:
-        raise ValueError("reconstructed secret is not valid UTF-8") from exc
+def _split_ids(raw: str, regex: bool = False) -> List[str]:
+    if regex:
+        return [raw]
+    return [part.strip() for part in raw.split(",") if part.strip()]
 
-    restored_aas = json.loads(files_list[0].read_text())
-    elem = find_element(restored_aas, target_id)
-    if elem is None:
-        raise ValueError("target element not found in restored file")
-    elem["value"] = recovered_str
-    elem.pop("description", None)
 
-    output_path = Path(output)
-    output_path.write_text(json.dumps(restored_aas, indent=2))
-    return recovered_str
+_STREAM_HELP = "Scan the JSON instead of parsing it (for very large documents)"
 
 
 def _build_parser() -> argparse.ArgumentParser:
@@ -203,19 +788,72 @@ def _build_parser() -> argparse.ArgumentParser:
 
     split_p = subparsers.add_parser("split", help="Split AAS into N shards")
     split_p.add_argument("file", help="Input AAS JSON file")
-    split_p.add_argument("id", help="idShort of Property to encrypt")
+    split_p.add_argument(
+        "id", help="idShort(s) of Properties to encrypt (comma-separated, globs allowed)"
+    )
     split_p.add_argument("-n", type=int, default=3, help="Total shards")
     split_p.add_argument("-k", type=int, default=2, help="Threshold needed")
+    split_p.add_argument("--regex", action="store_true", help="Treat ids as regular expressions")
+    split_p.add_argument(
+        "--backend",
+        choices=BACKENDS,
+        default=BACKEND_PRIME,
+        help="Secret-sharing field: 521-bit prime (default) or byte-wise GF(256)",
+    )
+    split_p.add_argument("--stream", action="store_true", help=_STREAM_HELP)
 
     join_p = subparsers.add_parser("combine", help="Combine shards")
-    join_p.add_argument("id", help="idShort of Property to recover")
+    join_p.add_argument(
+        "id", help="idShort(s) of Properties to recover (comma-separated, globs allowed)"
+    )
     join_p.add_argument("files", nargs="+", help="List of shard files")
+    join_p.add_argument("--regex", action="store_true", help="Treat ids as regular expressions")
     join_p.add_argument(
         "-o",
         "--output",
         default="restored_aas.json",
         help="Output file for restored AAS",
     )
+    join_p.add_argument("--stream", action="store_true", help=_STREAM_HELP)
+    join_p.add_argument(
+        "--robust",
+        action="store_true",
+        help="Read every shard and correct corrupted ones (needs more than k shards)",
+    )
+
+    for name, help_text in (
+        ("split-batch", "Split many AAS files in parallel"),
+        ("combine-batch", "Combine many shard sets in parallel"),
+    ):
+        batch_p = subparsers.add_parser(name, help=help_text)
+        batch_p.add_argument(
+            "id", help="idShort(s) to process in every file (manifests may override)"
+        )
+        batch_p.add_argument("inputs", nargs="*", help="Files or directories to process")
+        batch_p.add_argument("--manifest", help="JSON or CSV manifest listing the work")
+        batch_p.add_argument("-o", "--output-dir", required=True, help="Directory for the outputs")
+        if name == "split-batch":
+            batch_p.add_argument("-n", type=int, default=3, help="Total shards")
+            batch_p.add_argument("-k", type=int, default=2, help="Threshold needed")
+            batch_p.add_argument("--backend", choices=BACKENDS, default=BACKEND_PRIME)
+            batch_p.add_argument(
+                "--pattern", default="*.json", help="Glob for files inside input directories"
+            )
+        batch_p.add_argument(
+            "--regex", action="store_true", help="Treat ids as regular expressions"
+        )
+        batch_p.add_argument("--stream", action="store_true", help=_STREAM_HELP)
+        batch_p.add_argument(
+            "-j", "--workers", type=int, default=None, help="Worker processes (default: CPUs)"
+        )
+        batch_p.add_argument("--report", help="Write a .json or .csv report of every task")
+        batch_p.add_argument(
+            "--journal", help="Progress journal (default: a hidden file in the output dir)"
+        )
+        batch_p.add_argument(
+            "--no-resume", action="store_true", help="Ignore tasks completed by an earlier run"
+        )
+        batch_p.add_argument("-q", "--quiet", action="store_true", help="Do not print progress")
 
     return parser
 
@@ -225,17 +863,42 @@ def main(argv: Optional[Sequence[str]] = None) -> int:
     args = parser.parse_args(argv)
 
     try:
+        if args.command in ("split-batch", "combine-batch"):
+            from aas_holo_shard.aas import batch
+
+            return batch.run_cli(args)
+
         if args.command == "split":
-            output_paths = split_aas(args.file, args.id, args.n, args.k)
+            output_paths = split_aas(
+                args.file,
+                _split_ids(args.id, args.regex),
+                args.n,
+                args.k,
+                regex=args.regex,
+                backend=args.backend,
+                streaming=args.stream,
+            )
             print(f"Split into {len(output_paths)} shards")
             for path in output_paths:
                 print(f"  {path}")
             return 0
 
         if args.command == "combine":
-            recovered = combine_aas(args.files, args.id, args.output)
+            options = {"regex": args.regex, "streaming": args.stream}
+            ids = _split_ids(args.id, args.regex)
+            faulty: Dict[str, List[str]] = {}
+            if args.robust:
+                recovered, faulty = combine_aas_robust(args.files, ids, args.output, **options)
+            else:
+                recovered = combine_aas_many(args.files, ids, args.output, **options)
             print("Reconstruction successful")
-            print(f"Recovered: {recovered}")
+            for name, paths in faulty.items():
+                print(f"Ignored faulty shards of {name}: {', '.join(paths)}")
+            if len(recovered) == 1:
+                print(f"Recovered: {next(iter(recovered.values()))}")
+            else:
+                for name, value in recovered.items():
+                    print(f"Recovered {name}: {value}")
             print(f"Saved: {args.output}")
             return 0
 
@@ -0,0 +1,445 @@
+"""Streaming split/combine for AAS JSON documents too large to parse.
+
+The document is memory-mapped and scanned by a regex tokenizer that only
+follows nesting, ``idShort`` keys and the byte spans of ``value`` and
+``description`` members. No Python objects are built for the rest of the tree,
+and only elements whose idShort can match the selectors are kept. Shard files
+are written by copying the bytes between those spans through unchanged, in
+bounded chunks, so peak memory follows the size of the target elements rather
+than the document.
+
+Selection follows :class:`~aas_holo_shard.aas.index.ElementIndex`: the same
+idShorts, idShort paths, globs and regular expressions match, and ambiguous
+idShorts raise :class:`~aas_holo_shard.aas.index.DuplicateElementError`. The
+scanner assumes well-formed JSON; it checks bracket balance but does not
+validate. Because the input's formatting is kept, the output is not
+byte-identical to the in-memory path, which re-serializes with ``indent=2``.
+"""
+
+from __future__ import annotations
+
+import contextlib
+import fnmatch
+import functools
+import json
+import mmap
+import os
+import re
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Dict, Iterable, Iterator, List, Optional, Tuple, Union
+
+from aas_holo_shard import instrumentation
+from aas_holo_shard.aas.index import PATH_SEPARATOR, ElementIndex
+from aas_holo_shard.aas.shard import (
+    BACKEND_PRIME,
+    AnyShard,
+    TargetSpec,
+    _as_selectors,
+    ShardMeta,
+    _format_shard_value,
+    _is_pattern,
+    _make_value_shards,
+    _new_sharing_id,
+    _parse_shard_value,
+    _recover_targets,
+    _scalar_value,
+    _ShardCollector,
+    _shard_description,
+    _shard_paths,
+    resolve_targets,
+)
+
+COPY_CHUNK_SIZE = 1024 * 1024
+
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TRACKED_KEY = rb'"(?:idShort|value|description)"[ \t\r\n]*:'
+# Strings, scalars and punctuation that need no attention are absorbed into the
+# preceding token, so Python only sees brackets and the keys the scanner tracks.
+_REST = rb'(?:[^"{}\[\]]+|(?!' + _TRACKED_KEY + rb")" + _STRING + rb")*"
+# A tracked key (group 1) with the offset of its value (group 2) and, if the
+# value is a string, that string (group 3); or a single bracket.
+_TOKEN = re.compile(
+    rb'(?:"(idShort|value|description)"[ \t\r\n]*:[ \t\r\n]*()('
+    + _STRING
+    + rb")?|[{}\[\]])"
+    + _REST
+)
+_WHITESPACE = re.compile(rb"[ \t\r\n]*")
+_SCALAR = re.compile(rb"[^ \t\r\n,}\]]+")
+
+_ATTRIBUTES = {b"idShort": "id_short", b"value": "value", b"description": "description"}
+_OPEN_OBJECT = ord("{")
+
+Span = Tuple[int, int]
+# (start, end, position of the target or None for a description edit)
+_Edit = Tuple[int, int, Optional[int]]
+
+
+class _Element:
+    """A JSON object seen by the scanner; only AAS elements outlive the scan."""
+
+    __slots__ = (
+        "parent",
+        "id_short",
+        "value",
+        "value_key",
+        "description",
+        "description_key",
+        "end",
+    )
+
+    def __init__(self, parent: Optional["_Element"]) -> None:
+        self.parent = parent
+        self.id_short: Union[None, str, Span] = None
+        self.value: Optional[Span] = None
+        self.value_key = 0
+        self.description: Optional[Span] = None
+        self.description_key = 0
+        self.end = 0
+
+    def path(self) -> str:
+        names: List[str] = []
+        node: Optional[_Element] = self
+        while node is not None:
+            if isinstance(node.id_short, str):
+                names.append(node.id_short)
+            node = node.parent
+        return PATH_SEPARATOR.join(reversed(names))
+
+
+@contextlib.contextmanager
+def _mapped(path: Path) -> Iterator[mmap.mmap]:
+    with path.open("rb") as handle:
+        if os.fstat(handle.fileno()).st_size == 0:
+            raise ValueError(f"{path} is empty")
+        buf = mmap.mmap(handle.fileno(), 0, access=mmap.ACCESS_READ)
+    try:
+        yield buf
+    finally:
+        try:
+            buf.close()
+        except BufferError:  # pragma: no cover - a traceback still holds a view; GC closes it
+            pass
+
+
+def _candidate_filter(targets: TargetSpec, regex: bool) -> Callable[[str], bool]:
+    """Return a test for idShorts that could satisfy any of the selectors."""
+    names = set()
+    matchers: List[Callable[[str], Any]] = []
+    for selector in _as_selectors(targets):
+        if not regex and not _is_pattern(selector):
+            names.add(selector.rsplit(PATH_SEPARATOR, 1)[-1])
+        elif PATH_SEPARATOR in selector:
+            # Path patterns may match on any ancestor, so keep every element.
+            return lambda name: True
+        elif regex:
+            matchers.append(re.compile(selector).fullmatch)
+        else:
+            matchers.append(functools.partial(fnmatch.fnmatchcase, pat=selector))
+    return lambda name: name in names or any(match(name) for match in matchers)
+
+
+def _scan(buf: mmap.mmap, keep: Callable[[str], bool]) -> List[_Element]:
+    """Tokenize ``buf`` once and return the kept elements in document order."""
+    elements: List[_Element] = []
+    # One entry per open container: (innermost object, is an object, capture),
+    # where capture records the member whose value the container is.
+    stack: List[Tuple[Optional[_Element], bool, Optional[Tuple[_Element, str, int]]]] = []
+    pending: Optional[Tuple[_Element, str]] = None
+
+    cursor = _WHITESPACE.match(buf).end()
+    for match in _TOKEN.finditer(buf, cursor):
+        start = match.start()
+        if start != cursor:
+            raise ValueError(f"malformed JSON near offset {cursor}")
+        cursor = match.end()
+        if match.lastindex:
+            element = stack[-1][0] if stack else None
+            if element is None:
+                raise ValueError(f"malformed JSON near offset {start}")
+            attr = _ATTRIBUTES[match.group(1)]
+            if attr == "description":
+                element.description_key = start
+            elif attr == "value":
+                element.value_key = start
+            if match.start(3) >= 0:
+                setattr(element, attr, (match.start(3), match.end(3)))
+                continue
+            at = match.start(2)
+            if attr != "id_short" and buf[at] not in b"{[":
+                setattr(element, attr, (at, _SCALAR.match(buf, at).end()))
+            else:
+                pending = (element, attr)
+            continue
+
+        pending_capture, pending = pending, None
+        if buf[start] in b"{[":
+            capture = None
+            if pending_capture is not None and pending_capture[1] != "id_short":
+                capture = (pending_capture[0], pending_capture[1], start)
+            parent = stack[-1][0] if stack else None
+            is_object = buf[start] == _OPEN_OBJECT
+            stack.append((_Element(parent) if is_object else parent, is_object, capture))
+            continue
+
+        if not stack:
+            raise ValueError("malformed JSON: unbalanced brackets")
+        element, is_object, capture = stack.pop()
+        if capture is not None:
+            owner, attr, value_start = capture
+            setattr(owner, attr, (value_start, start + 1))
+        if is_object and element is not None:
+            element.end = start
+            if isinstance(element.id_short, tuple):
+                decoded = json.loads(buf[slice(*element.id_short)])
+                element.id_short = decoded if isinstance(decoded, str) else None
+            if (
+                isinstance(element.id_short, str)
+                and element.value is not None
+                and keep(element.id_short)
+            ):
+                elements.append(element)
+
+    if cursor != len(buf):
+        raise ValueError(f"malformed JSON near offset {cursor}")
+    if stack:
+        raise ValueError("malformed JSON: unbalanced brackets")
+    return elements
+
+
+def _scan_index(buf: mmap.mmap, targets: TargetSpec, regex: bool, path: Path) -> ElementIndex:
+    with instrumentation.span("aas.scan", file=str(path), bytes=len(buf)):
+        elements = _scan(buf, _candidate_filter(targets, regex))
+        return ElementIndex.from_entries(
+            (element.id_short, element.path(), element) for element in elements
+        )
+
+
+def _load(buf: mmap.mmap, span: Span) -> Any:
+    return json.loads(buf[span[0] : span[1]])
+
+
+def _copy(buf: mmap.mmap, start: int, end: int, handles: Iterable[BinaryIO]) -> None:
+    for offset in range(start, end, COPY_CHUNK_SIZE):
+        chunk = buf[offset : min(offset + COPY_CHUNK_SIZE, end)]
+        for handle in handles:
+            handle.write(chunk)
+
+
+def _check_disjoint(edits: List[_Edit]) -> None:
+    edits.sort(key=lambda edit: (edit[0], edit[1]))
+    for previous, current in zip(edits, edits[1:]):
+        if current[0] < previous[1]:
+            raise ValueError("target elements overlap")
+
+
+def _skip_back(buf: mmap.mmap, offset: int) -> int:
+    while buf[offset - 1] in b" \t\r\n":
+        offset -= 1
+    return offset
+
+
+def _description_insert(buf: mmap.mmap, element: _Element, description: str) -> Tuple[int, str]:
+    """Place a new description after the element's last member, indented like ``value``."""
+    indent = buf[_skip_back(buf, element.value_key) : element.value_key].decode()
+    return _skip_back(buf, element.end), f',{indent}"description": {description}'
+
+
+def split_aas_stream(
+    file_path: Union[str, Path],
+    target_id: TargetSpec,
+    n: int,
+    k: int,
+    *,
+    regex: bool = False,
+    backend: str = BACKEND_PRIME,
+    output_dir: Optional[Union[str, Path]] = None,
+) -> List[Path]:
+    """Streaming counterpart of :func:`~aas_holo_shard.aas.shard.split_aas`.
+
+    Writes the same ``<stem>_shard_<i>.json`` files (next to the source or in
+    ``output_dir``), keeping the input's formatting. Each target's ``value``
+    becomes a shard value and its ``description`` is replaced by, or extended
+    with, the shard notice.
+    """
+    source_path = Path(file_path)
+    with instrumentation.span(
+        "aas.split", file=str(source_path), n=n, k=k, backend=backend, streaming=True
+    ):
+        with _mapped(source_path) as buf:
+            output_paths = _shard_paths(source_path, n, output_dir)
+            return _split_mapped(buf, source_path, target_id, n, k, regex, backend, output_paths)
+
+
+def _split_mapped(
+    buf: mmap.mmap,
+    source_path: Path,
+    target_id: TargetSpec,
+    n: int,
+    k: int,
+    regex: bool,
+    backend: str,
+    output_paths: List[Path],
+) -> List[Path]:
+    def has_scalar_value(element: _Element) -> bool:
+        return buf[element.value[0]] not in b"{["
+
+    index = _scan_index(buf, target_id, regex, source_path)
+    target_ids = resolve_targets(index, target_id, regex=regex, predicate=has_scalar_value)
+    if not target_ids:
+        raise ValueError(f"no elements match {_as_selectors(target_id)}")
+
+    description = json.dumps(_shard_description())
+    inserts: Dict[int, str] = {}
+    shard_sets: List[List[AnyShard]] = []
+    metas: List[ShardMeta] = []
+    edits: List[_Edit] = []
+    with instrumentation.span("aas.shard", targets=len(target_ids)):
+        for name in target_ids:
+            element = index.get(name)
+            if element is None:
+                raise ValueError(f"element '{name}' not found")
+            value = _scalar_value(name, _load(buf, element.value))
+            try:
+                shard_sets.append(_make_value_shards(value, n, k, backend))
+            except ValueError as exc:
+                raise ValueError(f"cannot shard '{name}': {exc}") from exc
+            metas.append(ShardMeta(k, n, _new_sharing_id()))
+            edits.append((*element.value, len(shard_sets) - 1))
+            if element.description is not None:
+                edits.append((*element.description, None))
+            else:
+                at, insert = _description_insert(buf, element, description)
+                inserts[at] = insert
+                edits.append((at, at, None))
+    _check_disjoint(edits)
+    instrumentation.count("shares.created", n * len(shard_sets))
+
+    with instrumentation.span("aas.write", files=n):
+        with contextlib.ExitStack() as stack:
+            handles = [stack.enter_context(path.open("wb")) for path in output_paths]
+            cursor = 0
+            for start, end, pos in edits:
+                _copy(buf, cursor, start, handles)
+                if pos is not None:
+                    for idx, handle in enumerate(handles):
+                        shard_value = _format_shard_value(shard_sets[pos][idx], metas[pos])
+                        handle.write(json.dumps(shard_value).encode())
+                else:
+                    text = description if start < end else inserts[start]
+                    for handle in handles:
+                        handle.write(text.encode())
+                cursor = end
+            _copy(buf, cursor, len(buf), handles)
+    return output_paths
+
+
+def combine_aas_stream(
+    files: Iterable[Union[str, Path]],
+    target_ids: TargetSpec,
+    output: Union[str, Path],
+    *,
+    regex: bool = False,
+) -> Dict[str, str]:
+    """Streaming counterpart of :func:`~aas_holo_shard.aas.shard.combine_aas_many`.
+
+    The output is the first shard file with the recovered values put back and
+    the shard descriptions removed; every other byte is copied unchanged.
+    """
+    return _combine_stream(files, target_ids, output, regex, _ShardCollector())
+
+
+def _combine_stream(
+    files: Iterable[Union[str, Path]],
+    target_ids: TargetSpec,
+    output: Union[str, Path],
+    regex: bool,
+    collector: _ShardCollector,
+) -> Dict[str, str]:
+    files_list = [Path(path) for path in files]
+    if not files_list:
+        raise ValueError("no valid shards found")
+    with instrumentation.span("aas.combine", files=len(files_list), streaming=True):
+        with _mapped(files_list[0]) as first:
+            return _combine_mapped(first, files_list, target_ids, Path(output), regex, collector)
+
+
+def _collect_shards(
+    buf: mmap.mmap,
+    index: ElementIndex,
+    target_ids: TargetSpec,
+    regex: bool,
+    targets: List[str],
+    collector: _ShardCollector,
+    source: Path,
+) -> None:
+    def is_shard(element: _Element) -> bool:
+        return _parse_shard_value(str(_load(buf, element.value))) is not None
+
+    for name in resolve_targets(index, target_ids, regex=regex, predicate=is_shard):
+        if name not in targets:
+            targets.append(name)
+    for name in targets:
+        element = index.get(name)
+        if element is not None:
+            collector.add(name, str(_load(buf, element.value)), str(source))
+
+
+def _description_member(buf: mmap.mmap, element: _Element) -> Span:
+    """Return the span of ``"description": ...`` including one adjoining comma."""
+    start = element.description_key
+    end = element.description[1]  # type: ignore[index]
+    before = _skip_back(buf, start)
+    if buf[before - 1] == ord(","):
+        return before - 1, end
+    after = _WHITESPACE.match(buf, end).end()
+    if buf[after] == ord(","):
+        end = _WHITESPACE.match(buf, after + 1).end()
+    return start, end
+
+
+def _combine_mapped(
+    first: mmap.mmap,
+    files_list: List[Path],
+    target_ids: TargetSpec,
+    output_path: Path,
+    regex: bool,
+    collector: _ShardCollector,
+) -> Dict[str, str]:
+    targets: List[str] = []
+    first_index = _scan_index(first, target_ids, regex, files_list[0])
+    with instrumentation.span("aas.search", file=str(files_list[0])):
+        _collect_shards(first, first_index, target_ids, regex, targets, collector, files_list[0])
+    read = 1
+    for path in files_list[1:]:
+        if collector.complete(targets):
+            break
+        read += 1
+        with _mapped(path) as buf:
+            index = _scan_index(buf, target_ids, regex, path)
+            with instrumentation.span("aas.search", file=str(path)):
+                _collect_shards(buf, index, target_ids, regex, targets, collector, path)
+    instrumentation.count("aas.files_read", read)
+
+    recovered = _recover_targets(targets, collector)
+    edits: List[_Edit] = []
+    values = list(recovered.values())
+    for pos, name in enumerate(recovered):
+        element = first_index.get(name)
+        if element is None:
+            raise ValueError(f"element '{name}' not found in restored file")
+        edits.append((*element.value, pos))
+        if element.description is not None:
+            edits.append((*_description_member(first, element), None))
+    _check_disjoint(edits)
+
+    with instrumentation.span("aas.write", file=str(output_path)):
+        with output_path.open("wb") as handle:
+            cursor = 0
+            for start, end, pos in edits:
+                _copy(first, cursor, start, [handle])
+                if pos is not None:
+                    handle.write(json.dumps(values[pos]).encode())
+                cursor = end
+            _copy(first, cursor, len(first), [handle])
+    return recovered
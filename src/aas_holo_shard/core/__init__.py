@@ -1,15 +1,131 @@
 """Core cryptographic utilities."""
 
-from aas_holo_shard.core.shamir import (
-    CryptoError,
-    Share,
-    encrypt_and_split,
-    reconstruct_and_decrypt,
+from typing import TYPE_CHECKING
+
+from aas_holo_shard._lazy import attach
+
+__getattr__, __dir__ = attach(
+    __name__,
+    {
+        "aas_holo_shard.core.cdc": [
+            "decrypt_revision",
+            "encrypt_and_split_revision",
+            "encrypt_revision",
+        ],
+        "aas_holo_shard.core.chunked": [
+            "ChunkedReader",
+            "decrypt_range",
+            "encrypt_and_split_chunked",
+            "open_chunked",
+        ],
+        "aas_holo_shard.core.compress": [
+            "available_codecs",
+            "train_dictionary",
+        ],
+        "aas_holo_shard.core.envelope": [
+            "decrypt_envelope",
+            "encrypt_envelope",
+            "refresh_shares",
+            "rotate_envelope",
+        ],
+        "aas_holo_shard.core.shamir": [
+            "CryptoError",
+            "EncryptedBundle",
+            "Share",
+            "decrypt_into",
+            "encrypt_and_split",
+            "encrypt_into",
+            "encrypted_size",
+            "reconstruct_and_decrypt",
+            "robust_combine_key",
+        ],
+        "aas_holo_shard.core.service": [
+            "KeyCache",
+            "ReconstructionService",
+            "ServiceClient",
+        ],
+        "aas_holo_shard.core.stream": [
+            "decrypt_stream",
+            "encrypt_buffer_and_split",
+            "encrypt_file_and_split",
+            "encrypt_stream",
+            "reconstruct_and_decrypt_file",
+        ],
+    },
 )
 
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.core.cdc import (
+        decrypt_revision,
+        encrypt_and_split_revision,
+        encrypt_revision,
+    )
+    from aas_holo_shard.core.chunked import (
+        ChunkedReader,
+        decrypt_range,
+        encrypt_and_split_chunked,
+        open_chunked,
+    )
+    from aas_holo_shard.core.compress import available_codecs, train_dictionary
+    from aas_holo_shard.core.envelope import (
+        decrypt_envelope,
+        encrypt_envelope,
+        refresh_shares,
+        rotate_envelope,
+    )
+    from aas_holo_shard.core.shamir import (
+        CryptoError,
+        EncryptedBundle,
+        Share,
+        decrypt_into,
+        encrypt_and_split,
+        encrypt_into,
+        encrypted_size,
+        reconstruct_and_decrypt,
+        robust_combine_key,
+    )
+    from aas_holo_shard.core.service import (
+        KeyCache,
+        ReconstructionService,
+        ServiceClient,
+    )
+    from aas_holo_shard.core.stream import (
+        decrypt_stream,
+        encrypt_buffer_and_split,
+        encrypt_file_and_split,
+        encrypt_stream,
+        reconstruct_and_decrypt_file,
+    )
+
 __all__ = [
+    "ChunkedReader",
     "CryptoError",
+    "EncryptedBundle",
+    "KeyCache",
+    "ReconstructionService",
+    "ServiceClient",
     "Share",
+    "available_codecs",
+    "decrypt_envelope",
+    "decrypt_into",
+    "decrypt_range",
+    "decrypt_revision",
+    "decrypt_stream",
     "encrypt_and_split",
+    "encrypt_and_split_chunked",
+    "encrypt_and_split_revision",
+    "encrypt_buffer_and_split",
+    "encrypt_envelope",
+    "encrypt_file_and_split",
+    "encrypt_into",
+    "encrypt_revision",
+    "encrypt_stream",
+    "encrypted_size",
+    "open_chunked",
     "reconstruct_and_decrypt",
+    "reconstruct_and_decrypt_file",
+    "refresh_shares",
+    "robust_combine_key",
+    "rotate_envelope",
+    "train_dictionary",
 ]
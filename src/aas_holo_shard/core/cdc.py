@@ -0,0 +1,296 @@
+"""Content-defined chunking with convergent encryption for AASX revisions.
+
+Payloads are cut with a Gear rolling hash. A boundary falls where the top bits
+of the hash are zero, so an edit only moves the boundaries near it. Chunks are
+encrypted convergently under a single root key, which is the only thing that is
+Shamir-split:
+
+* chunk ID: ``HMAC(root, "id" || SHA-256(chunk))``
+* chunk key and nonce: ``HMAC(root, "key" || SHA-256(chunk))``
+
+Identical chunks therefore encrypt to identical blobs under the same root key,
+and a new revision only encrypts and stores the chunks the store lacks. The
+gear table is also derived from the root key, so chunk boundaries reveal
+nothing about the content to anyone without it. A revision is an AHS1-encrypted
+manifest listing its chunk IDs.
+
+Any mutable mapping from chunk ID to blob can act as the store; a ``dict``
+works, and :class:`DirectoryChunkStore` keeps one file per chunk.
+"""
+
+from __future__ import annotations
+
+import hashlib
+import hmac
+import json
+import os
+import tempfile
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Iterator, List, MutableMapping, Sequence, Tuple, Union
+
+from aas_holo_shard.core.shamir import (
+    AES,
+    BACKEND_PYCRYPTODOME,
+    KEY_SIZE,
+    TAG_SIZE,
+    CryptoError,
+    Share,
+    _combine_key,
+    _decrypt_with_key,
+    _encrypt_with_key,
+    _split_key,
+    _validate_backend,
+    _validate_thresholds,
+    get_random_bytes,
+)
+
+MIN_CHUNK_SIZE = 2 * 1024
+AVG_CHUNK_SIZE = 8 * 1024
+MAX_CHUNK_SIZE = 64 * 1024
+MANIFEST_VERSION = 1
+
+_MASK64 = (1 << 64) - 1
+_CHUNK_NONCE_SIZE = 12
+
+ChunkStore = MutableMapping[str, bytes]
+
+
+@dataclass(frozen=True)
+class DedupStats:
+    """How much of a revision was already present in the chunk store."""
+
+    chunks: int
+    new_chunks: int
+    bytes_total: int
+    bytes_new: int
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_total - self.bytes_new
+
+    @property
+    def dedup_ratio(self) -> float:
+        """Share of the payload (0..1) that did not need to be stored again."""
+        return self.bytes_saved / self.bytes_total if self.bytes_total else 0.0
+
+
+@dataclass(frozen=True)
+class Revision:
+    """An encrypted revision manifest plus the dedup statistics of storing it."""
+
+    manifest: bytes
+    stats: DedupStats
+
+
+class DirectoryChunkStore(MutableMapping[str, bytes]):
+    """Chunk store keeping one file per chunk ID under ``root``."""
+
+    def __init__(self, root: Union[str, Path]) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+
+    def _path(self, chunk_id: str) -> Path:
+        if len(chunk_id) != 64 or not all(c in "0123456789abcdef" for c in chunk_id):
+            raise KeyError(chunk_id)
+        return self.root / chunk_id[:2] / chunk_id
+
+    def __contains__(self, chunk_id: object) -> bool:
+        try:
+            return isinstance(chunk_id, str) and self._path(chunk_id).exists()
+        except KeyError:
+            return False
+
+    def __getitem__(self, chunk_id: str) -> bytes:
+        try:
+            return self._path(chunk_id).read_bytes()
+        except FileNotFoundError:
+            raise KeyError(chunk_id) from None
+
+    def __setitem__(self, chunk_id: str, blob: bytes) -> None:
+        path = self._path(chunk_id)
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        with os.fdopen(fd, "wb") as handle:
+            handle.write(blob)
+        os.replace(tmp_name, path)
+
+    def __delitem__(self, chunk_id: str) -> None:
+        try:
+            self._path(chunk_id).unlink()
+        except FileNotFoundError:
+            raise KeyError(chunk_id) from None
+
+    def __iter__(self) -> Iterator[str]:
+        for path in self.root.glob("*/*"):
+            if not path.name.startswith("."):
+                yield path.name
+
+    def __len__(self) -> int:
+        return sum(1 for _ in self)
+
+
+def _gear_table(root_key: bytes) -> List[int]:
+    seed = hmac.new(root_key, b"gear", hashlib.sha256).digest()
+    return [
+        int.from_bytes(hashlib.sha256(seed + bytes([value])).digest()[:8], "big")
+        for value in range(256)
+    ]
+
+
+def _check_sizes(min_size: int, avg_size: int, max_size: int) -> None:
+    if not 0 < min_size < avg_size < max_size:
+        raise CryptoError("chunk sizes must satisfy 0 < min_size < avg_size < max_size")
+    if avg_size & (avg_size - 1):
+        raise CryptoError("avg_size must be a power of two")
+
+
+def chunk_boundaries(
+    data: bytes,
+    gear: Sequence[int],
+    *,
+    min_size: int = MIN_CHUNK_SIZE,
+    avg_size: int = AVG_CHUNK_SIZE,
+    max_size: int = MAX_CHUNK_SIZE,
+) -> List[int]:
+    """Return the end offset of every content-defined chunk of ``data``."""
+    _check_sizes(min_size, avg_size, max_size)
+    bits = avg_size.bit_length() - 1
+    mask = ((1 << bits) - 1) << (64 - bits)
+    size = len(data)
+    cuts: List[int] = []
+    start = 0
+    while start < size:
+        end = min(start + max_size, size)
+        cut = end
+        if end - start > min_size:
+            digest = 0
+            # Hashing starts at the minimum size: boundaries before it are never used.
+            for offset in range(start + min_size, end):
+                digest = ((digest << 1) + gear[data[offset]]) & _MASK64
+                if not digest & mask:
+                    cut = offset + 1
+                    break
+        cuts.append(cut)
+        start = cut
+    return cuts
+
+
+def _derive(root_key: bytes, label: bytes, digest: bytes) -> bytes:
+    return hmac.new(root_key, label + digest, hashlib.sha256).digest()
+
+
+def _encrypt_chunk(root_key: bytes, digest: bytes, chunk: memoryview) -> bytes:
+    material = _derive(root_key, b"key", digest)
+    cipher = AES.new(material, AES.MODE_GCM, nonce=material[:_CHUNK_NONCE_SIZE])
+    ciphertext, tag = cipher.encrypt_and_digest(chunk)
+    return tag + ciphertext
+
+
+def _decrypt_chunk(root_key: bytes, digest: bytes, blob: bytes) -> bytes:
+    material = _derive(root_key, b"key", digest)
+    cipher = AES.new(material, AES.MODE_GCM, nonce=material[:_CHUNK_NONCE_SIZE])
+    try:
+        return cipher.decrypt_and_verify(blob[TAG_SIZE:], blob[:TAG_SIZE])
+    except ValueError as exc:
+        raise CryptoError("chunk failed verification") from exc
+
+
+def _encrypt_revision(
+    data: bytes,
+    root_key: bytes,
+    store: ChunkStore,
+    min_size: int,
+    avg_size: int,
+    max_size: int,
+) -> Revision:
+    view = memoryview(data)
+    cuts = chunk_boundaries(
+        data, _gear_table(root_key), min_size=min_size, avg_size=avg_size, max_size=max_size
+    )
+    entries = []
+    new_chunks = bytes_new = 0
+    start = 0
+    for cut in cuts:
+        chunk = view[start:cut]
+        digest = hashlib.sha256(chunk).digest()
+        chunk_id = _derive(root_key, b"id", digest).hex()
+        if chunk_id not in store:
+            store[chunk_id] = _encrypt_chunk(root_key, digest, chunk)
+            new_chunks += 1
+            bytes_new += len(chunk)
+        entries.append([chunk_id, digest.hex()])
+        start = cut
+
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "size": len(data),
+        "chunking": {"min": min_size, "avg": avg_size, "max": max_size},
+        "chunks": entries,
+    }
+    sealed = _encrypt_with_key(json.dumps(manifest, separators=(",", ":")).encode(), root_key)
+    return Revision(sealed, DedupStats(len(cuts), new_chunks, len(data), bytes_new))
+
+
+def encrypt_and_split_revision(
+    data: bytes,
+    store: ChunkStore,
+    *,
+    threshold: int,
+    total: int,
+    backend: str = BACKEND_PYCRYPTODOME,
+    min_size: int = MIN_CHUNK_SIZE,
+    avg_size: int = AVG_CHUNK_SIZE,
+    max_size: int = MAX_CHUNK_SIZE,
+) -> Tuple[Revision, List[Share]]:
+    """Store the first revision under a new root key and split that key."""
+    _validate_thresholds(threshold, total)
+    _validate_backend(backend)
+    _check_sizes(min_size, avg_size, max_size)
+    root_key = get_random_bytes(KEY_SIZE)
+    revision = _encrypt_revision(data, root_key, store, min_size, avg_size, max_size)
+    return revision, _split_key(root_key, threshold, total, backend)
+
+
+def encrypt_revision(
+    data: bytes,
+    store: ChunkStore,
+    shares: Sequence[Share],
+    *,
+    backend: str = BACKEND_PYCRYPTODOME,
+    min_size: int = MIN_CHUNK_SIZE,
+    avg_size: int = AVG_CHUNK_SIZE,
+    max_size: int = MAX_CHUNK_SIZE,
+) -> Revision:
+    """Store a further revision, encrypting only chunks missing from ``store``."""
+    _check_sizes(min_size, avg_size, max_size)
+    root_key = _combine_key(shares, backend)
+    return _encrypt_revision(data, root_key, store, min_size, avg_size, max_size)
+
+
+def decrypt_revision(
+    manifest: bytes,
+    store: ChunkStore,
+    shares: Sequence[Share],
+    *,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> bytes:
+    """Reassemble and verify a revision from its manifest and the chunk store."""
+    root_key = _combine_key(shares, backend)
+    try:
+        plan = json.loads(_decrypt_with_key(manifest, root_key))
+    except ValueError as exc:
+        raise CryptoError("revision manifest failed verification") from exc
+    if plan.get("version") != MANIFEST_VERSION:
+        raise CryptoError("unsupported revision manifest version")
+
+    out = bytearray()
+    for chunk_id, digest_hex in plan["chunks"]:
+        try:
+            blob = store[chunk_id]
+        except KeyError:
+            raise CryptoError(f"chunk {chunk_id} is missing from the store") from None
+        out += _decrypt_chunk(root_key, bytes.fromhex(digest_hex), blob)
+    if len(out) != plan["size"]:
+        raise CryptoError("revision size does not match its manifest")
+    return bytes(out)
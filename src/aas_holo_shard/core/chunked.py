@@ -0,0 +1,417 @@
+"""Chunked, seekable AHS2 container with parallel AES-GCM.
+
+Layout::
+
+    header   "AHS2" | flags u8 | 3 reserved | chunk_size u32 | plaintext_size u64
+             | nonce_prefix 8 bytes | chunk_count u32
+    tags     chunk_count * 16-byte GCM tags (the chunk index)
+    body     ciphertext chunks, each ``chunk_size`` bytes except the last
+
+Every chunk is sealed on its own with the container key, the 96-bit nonce
+``nonce_prefix || chunk_index`` and the raw header as associated data, so
+chunks cannot be reordered, truncated or moved between containers. Because
+chunk offsets follow from the header, any byte range can be decrypted by
+touching only the chunks that cover it.
+"""
+
+from __future__ import annotations
+
+import io
+import mmap
+import struct
+import threading
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from aas_holo_shard.core.shamir import (
+    AES,
+    BACKEND_PYCRYPTODOME,
+    KEY_SIZE,
+    TAG_SIZE,
+    Buffer,
+    CryptoError,
+    Share,
+    _combine_key,
+    _split_key,
+    _validate_thresholds,
+    _wipe,
+    _writable_view,
+    get_random_bytes,
+)
+
+MAGIC = b"AHS2"
+DEFAULT_CHUNK_SIZE = 1 << 20
+NONCE_PREFIX_SIZE = 8
+MAX_CHUNKS = 2**32 - 1
+
+_HEADER = struct.Struct(">4sB3xIQ8sI")
+HEADER_SIZE = _HEADER.size
+
+
+@dataclass(frozen=True)
+class ChunkedHeader:
+    """Parsed AHS2 header."""
+
+    flags: int
+    chunk_size: int
+    plaintext_size: int
+    nonce_prefix: bytes
+    chunk_count: int
+    raw: bytes
+
+    @classmethod
+    def parse(cls, raw: bytes) -> "ChunkedHeader":
+        if len(raw) < HEADER_SIZE:
+            raise CryptoError("encrypted payload is too short")
+        magic, flags, chunk_size, size, prefix, count = _HEADER.unpack(raw[:HEADER_SIZE])
+        if magic != MAGIC:
+            raise CryptoError("encrypted payload missing AHS2 magic header")
+        if flags != 0:
+            raise CryptoError(f"unsupported AHS2 flags: {flags:#04x}")
+        if chunk_size < 1 or count != _chunk_count(size, chunk_size):
+            raise CryptoError("corrupt AHS2 header")
+        return cls(flags, chunk_size, size, prefix, count, bytes(raw[:HEADER_SIZE]))
+
+    @property
+    def body_offset(self) -> int:
+        return HEADER_SIZE + self.chunk_count * TAG_SIZE
+
+    @property
+    def total_size(self) -> int:
+        return self.body_offset + self.plaintext_size
+
+    def chunk_length(self, index: int) -> int:
+        start = index * self.chunk_size
+        return max(0, min(self.chunk_size, self.plaintext_size - start))
+
+    def nonce(self, index: int) -> bytes:
+        return self.nonce_prefix + index.to_bytes(4, "big")
+
+
+def _chunk_count(size: int, chunk_size: int) -> int:
+    # An empty payload still gets one (empty) chunk so the header is authenticated.
+    return max(1, -(-size // chunk_size))
+
+
+def _encrypt_chunk(key: bytes, aad: bytes, nonce: bytes, chunk: Buffer) -> Tuple[bytes, bytes]:
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(aad)
+    return cipher.encrypt_and_digest(chunk)
+
+
+def _decrypt_chunk(
+    key: bytes,
+    aad: bytes,
+    nonce: bytes,
+    chunk: Buffer,
+    tag: bytes,
+    output: Optional[memoryview] = None,
+) -> Optional[bytes]:
+    """Decrypt one chunk; with ``output`` the plaintext is written there instead."""
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(aad)
+    try:
+        return cipher.decrypt_and_verify(chunk, tag, output=output)
+    except ValueError as exc:
+        raise CryptoError(
+            f"MAC check failed for chunk {int.from_bytes(nonce[-4:], 'big')}"
+        ) from exc
+
+
+@contextmanager
+def _pool(executor: Optional[Executor], workers: Optional[int], jobs: int) -> Iterator:
+    """Yield a ``map`` callable backed by ``executor`` or a scoped thread pool.
+
+    pycryptodome releases the GIL inside its AES-GCM primitives, so a thread
+    pool scales across cores without the pickling cost of processes.
+    """
+    if executor is not None:
+        yield executor.map
+    elif jobs <= 1 or workers == 1:
+        yield map
+    else:
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            yield pool.map
+
+
+def _transportable(executor: Optional[Executor], chunks: Sequence[Buffer]) -> Sequence[Buffer]:
+    if isinstance(executor, ProcessPoolExecutor):
+        return [bytes(chunk) for chunk in chunks]
+    return chunks
+
+
+def encrypt_chunked(
+    data: Buffer,
+    key: bytes,
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> bytes:
+    """Encrypt ``data`` under ``key`` into an AHS2 container."""
+    if len(key) != KEY_SIZE:
+        raise CryptoError(f"key must be {KEY_SIZE} bytes")
+    if chunk_size < 1 or chunk_size > 0xFFFFFFFF:
+        raise CryptoError("chunk size must be between 1 and 2**32 - 1")
+
+    view = memoryview(data).cast("B")
+    count = _chunk_count(len(view), chunk_size)
+    if count > MAX_CHUNKS:
+        raise CryptoError("payload needs too many chunks; raise chunk_size")
+
+    prefix = get_random_bytes(NONCE_PREFIX_SIZE)
+    raw = _HEADER.pack(MAGIC, 0, chunk_size, len(view), prefix, count)
+    header = ChunkedHeader(0, chunk_size, len(view), prefix, count, raw)
+
+    chunks = [view[i * chunk_size : (i + 1) * chunk_size] for i in range(count)]
+    with _pool(executor, workers, count) as pool_map:
+        sealed = list(
+            pool_map(
+                _encrypt_chunk,
+                [key] * count,
+                [raw] * count,
+                [header.nonce(i) for i in range(count)],
+                _transportable(executor, chunks),
+            )
+        )
+
+    out = bytearray(header.total_size)
+    out[:HEADER_SIZE] = raw
+    cursor = header.body_offset
+    for index, (ciphertext, tag) in enumerate(sealed):
+        tag_at = HEADER_SIZE + index * TAG_SIZE
+        out[tag_at : tag_at + TAG_SIZE] = tag
+        out[cursor : cursor + len(ciphertext)] = ciphertext
+        cursor += len(ciphertext)
+    return bytes(out)
+
+
+def encrypt_and_split_chunked(
+    aas_bytes: Buffer,
+    *,
+    threshold: int,
+    total: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> tuple[bytes, List[Share]]:
+    """Encrypt AAS bytes into an AHS2 container and split the key into shares."""
+    _validate_thresholds(threshold, total)
+    key = get_random_bytes(KEY_SIZE)
+    encrypted = encrypt_chunked(
+        aas_bytes, key, chunk_size=chunk_size, workers=workers, executor=executor
+    )
+    return encrypted, _split_key(key, threshold, total, backend)
+
+
+class ChunkedReader(io.RawIOBase):
+    """Seekable, read-only plaintext view of an AHS2 container.
+
+    ``source`` is either the container bytes or a seekable binary file. Only
+    the chunks covering the requested range are read and decrypted, so the
+    reader can be wrapped in :class:`zipfile.ZipFile` to extract one entry of
+    an encrypted AASX package.
+    """
+
+    def __init__(
+        self,
+        source: Union[Buffer, BinaryIO],
+        key: bytes,
+        *,
+        workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+    ) -> None:
+        super().__init__()
+        self._key = key
+        self._workers = workers
+        self._executor = executor
+        self._lock = threading.Lock()
+        if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+            self._buffer: Optional[memoryview] = memoryview(source).cast("B")
+            self._file: Optional[BinaryIO] = None
+        else:
+            self._buffer = None
+            self._file = source
+
+        self.header = ChunkedHeader.parse(self._read_at(0, HEADER_SIZE))
+        if self._buffer is not None and len(self._buffer) != self.header.total_size:
+            raise CryptoError("encrypted payload length does not match AHS2 header")
+        tags = self._read_at(HEADER_SIZE, self.header.chunk_count * TAG_SIZE)
+        if len(tags) != self.header.chunk_count * TAG_SIZE:
+            raise CryptoError("encrypted payload is truncated")
+        self._tags = [bytes(tags[i : i + TAG_SIZE]) for i in range(0, len(tags), TAG_SIZE)]
+        self._pos = 0
+        self._cached: Tuple[int, bytes] = (-1, b"")
+
+    def _read_at(self, offset: int, size: int) -> Buffer:
+        if self._buffer is not None:
+            return self._buffer[offset : offset + size]
+        assert self._file is not None
+        with self._lock:
+            self._file.seek(offset)
+            return self._file.read(size)
+
+    def _read_chunks(self, indexes: range) -> List[Buffer]:
+        header = self.header
+        chunks = []
+        for index in indexes:
+            length = header.chunk_length(index)
+            chunk = self._read_at(header.body_offset + index * header.chunk_size, length)
+            if len(chunk) != length:
+                raise CryptoError("encrypted payload is truncated")
+            chunks.append(chunk)
+        return chunks
+
+    def _decrypt_chunks(self, first: int, last: int) -> List[bytes]:
+        header = self.header
+        indexes = range(first, last + 1)
+        chunks = self._read_chunks(indexes)
+        count = len(chunks)
+        with _pool(self._executor, self._workers, count) as pool_map:
+            return list(
+                pool_map(
+                    _decrypt_chunk,
+                    [self._key] * count,
+                    [header.raw] * count,
+                    [header.nonce(i) for i in indexes],
+                    _transportable(self._executor, chunks),
+                    [self._tags[i] for i in indexes],
+                )
+            )
+
+    @property
+    def size(self) -> int:
+        return self.header.plaintext_size
+
+    def read_range(self, offset: int, length: int) -> bytes:
+        """Decrypt ``length`` plaintext bytes starting at ``offset``."""
+        if offset < 0 or length < 0:
+            raise CryptoError("offset and length must be >= 0")
+        end = min(offset + length, self.size)
+        if offset >= end:
+            return b""
+        size = self.header.chunk_size
+        first, last = offset // size, (end - 1) // size
+        if first == last:
+            plain = self._chunk(first)
+        else:
+            plain = b"".join(self._decrypt_chunks(first, last))
+        start = offset - first * size
+        return plain[start : start + end - offset]
+
+    def read_all(self) -> bytes:
+        """Decrypt and verify every chunk."""
+        return b"".join(self._decrypt_chunks(0, self.header.chunk_count - 1))
+
+    def read_all_into(self, out: Buffer) -> int:
+        """Decrypt and verify every chunk straight into the writable buffer ``out``.
+
+        Returns the plaintext size. If any chunk fails to verify, the
+        plaintext range of ``out`` is zeroed before the error is raised.
+        """
+        header = self.header
+        target = _writable_view(out, self.size)
+        indexes = range(header.chunk_count)
+        try:
+            if isinstance(self._executor, ProcessPoolExecutor):
+                # Worker processes cannot write into this process's buffer.
+                for index, plain in zip(indexes, self._decrypt_chunks(0, indexes[-1])):
+                    start = index * header.chunk_size
+                    target[start : start + len(plain)] = plain
+                return self.size
+            outputs = [
+                target[i * header.chunk_size : i * header.chunk_size + header.chunk_length(i)]
+                for i in indexes
+            ]
+            with _pool(self._executor, self._workers, len(indexes)) as pool_map:
+                for _ in pool_map(
+                    _decrypt_chunk,
+                    [self._key] * len(indexes),
+                    [header.raw] * len(indexes),
+                    [header.nonce(i) for i in indexes],
+                    self._read_chunks(indexes),
+                    self._tags,
+                    outputs,
+                ):
+                    pass
+        except CryptoError:
+            _wipe(target)
+            raise
+        return self.size
+
+    def _chunk(self, index: int) -> bytes:
+        if self._cached[0] != index:
+            self._cached = (index, self._decrypt_chunks(index, index)[0])
+        return self._cached[1]
+
+    def readable(self) -> bool:
+        return True
+
+    def seekable(self) -> bool:
+        return True
+
+    def tell(self) -> int:
+        return self._pos
+
+    def seek(self, offset: int, whence: int = io.SEEK_SET) -> int:
+        if whence == io.SEEK_SET:
+            pos = offset
+        elif whence == io.SEEK_CUR:
+            pos = self._pos + offset
+        elif whence == io.SEEK_END:
+            pos = self.size + offset
+        else:
+            raise ValueError(f"invalid whence: {whence}")
+        if pos < 0:
+            raise ValueError("negative seek position")
+        self._pos = pos
+        return pos
+
+    def readinto(self, buffer) -> int:
+        view = memoryview(buffer).cast("B")
+        data = self.read_range(self._pos, len(view))
+        view[: len(data)] = data
+        self._pos += len(data)
+        return len(data)
+
+
+def open_chunked(
+    encrypted: Union[Buffer, BinaryIO],
+    shares: Iterable[Share],
+    *,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> ChunkedReader:
+    """Reconstruct the key from shares and open an AHS2 container for reading."""
+    key = _combine_key(shares, backend)
+    return ChunkedReader(encrypted, key, workers=workers, executor=executor)
+
+
+def decrypt_chunked(
+    encrypted: Union[Buffer, BinaryIO],
+    key: bytes,
+    *,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+) -> bytes:
+    """Decrypt a whole AHS2 container with an already reconstructed key."""
+    return ChunkedReader(encrypted, key, workers=workers, executor=executor).read_all()
+
+
+def decrypt_range(
+    encrypted: Union[Buffer, BinaryIO],
+    shares: Iterable[Share],
+    offset: int,
+    length: int,
+    *,
+    workers: Optional[int] = None,
+    executor: Optional[Executor] = None,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> bytes:
+    """Decrypt only the plaintext bytes ``[offset, offset + length)``."""
+    reader = open_chunked(encrypted, shares, workers=workers, executor=executor, backend=backend)
+    return reader.read_range(offset, length)
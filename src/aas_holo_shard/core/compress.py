@@ -0,0 +1,354 @@
+"""Optional compression stage for single-stream containers (``AHZ1``).
+
+AAS JSON and XML shrink several times under any general-purpose compressor,
+but ciphertext does not compress at all, so the payload is compressed before
+it is encrypted. Layout::
+
+    header   "AHZ1" | codec u8 | flags u8 | 2 reserved | dictionary_id u32
+    nonce    16 bytes
+    tag      16-byte GCM tag
+    body     AES-GCM ciphertext of the compressed payload
+
+The 12-byte header is authenticated as GCM associated data, so the codec and
+dictionary cannot be swapped. Decryption (``reconstruct_and_decrypt``,
+``decrypt_stream``) recognises the magic and decompresses on its own. Because
+the tag is checked before anything is decompressed in memory, and forged
+ciphertext decrypts to noise, a crafted decompression bomb needs the key.
+
+Codecs: ``zlib`` and ``lzma`` from the standard library, and ``zstd`` when
+:mod:`compression.zstd` (Python 3.14+) or the ``zstandard`` package is
+installed. ``zlib`` and ``zstd`` accept a preset dictionary, which helps most
+for small documents that repeat the same keys; :func:`train_dictionary`
+builds one from sample documents. The dictionary is identified in the header
+by :func:`dictionary_id` and must be passed again to decrypt.
+
+Chunked ``AHS2`` containers are never compressed: their byte ranges map
+straight to plaintext offsets.
+"""
+
+from __future__ import annotations
+
+import collections
+import hashlib
+import lzma
+import re
+import struct
+import zlib
+from typing import Callable, Dict, Iterable, Iterator, Optional, Protocol, Sequence, Tuple
+
+from aas_holo_shard.core.shamir import (
+    AES,
+    NONCE_SIZE,
+    TAG_SIZE,
+    Buffer,
+    CryptoError,
+    _byte_view,
+    get_random_bytes,
+)
+
+MAGIC = b"AHZ1"
+CODEC_ZLIB = "zlib"
+CODEC_LZMA = "lzma"
+CODEC_ZSTD = "zstd"
+CODECS = (CODEC_ZLIB, CODEC_LZMA, CODEC_ZSTD)
+DEFAULT_DICTIONARY_SIZE = 16 * 1024
+
+_HEADER = struct.Struct(">4sBB2xI")
+HEADER_SIZE = _HEADER.size + NONCE_SIZE + TAG_SIZE
+
+_CODEC_IDS = {CODEC_ZLIB: 1, CODEC_LZMA: 2, CODEC_ZSTD: 3}
+_CODEC_NAMES = {value: name for name, value in _CODEC_IDS.items()}
+# zlib can only reference the last 32 KiB, so a longer preset dictionary is wasted.
+_ZLIB_WINDOW = 32 * 1024
+_ZSTD_DICT_MAGIC = b"\x37\xa4\x30\xec"
+_TOKEN = re.compile(rb'"[^"\\\n]{0,80}"\s*[:,]?\s*|</?[A-Za-z][^<>\n]{0,80}>')
+
+
+class Compressor(Protocol):
+    def compress(self, data: Buffer) -> bytes: ...
+
+    def flush(self) -> bytes: ...
+
+
+class Decompressor(Protocol):
+    eof: bool
+
+    def decompress(self, data: Buffer) -> bytes: ...
+
+
+class _Codec:
+    name = ""
+    levels = (0, 9)
+    default_level = 6
+    dictionaries = False
+
+    def compressor(self, level: int, dictionary: Optional[bytes]) -> Compressor:
+        raise NotImplementedError  # pragma: no cover - abstract
+
+    def decompressor(self, dictionary: Optional[bytes]) -> Decompressor:
+        raise NotImplementedError  # pragma: no cover - abstract
+
+
+class _ZlibCodec(_Codec):
+    name = CODEC_ZLIB
+    dictionaries = True
+
+    def compressor(self, level: int, dictionary: Optional[bytes]) -> Compressor:
+        if dictionary:
+            return zlib.compressobj(level, zlib.DEFLATED, zlib.MAX_WBITS, zdict=dictionary)
+        return zlib.compressobj(level)
+
+    def decompressor(self, dictionary: Optional[bytes]) -> Decompressor:
+        if dictionary:
+            return zlib.decompressobj(zlib.MAX_WBITS, zdict=dictionary)
+        return zlib.decompressobj()
+
+
+class _LzmaCodec(_Codec):
+    name = CODEC_LZMA
+
+    def compressor(self, level: int, dictionary: Optional[bytes]) -> Compressor:
+        return lzma.LZMACompressor(lzma.FORMAT_XZ, preset=level)
+
+    def decompressor(self, dictionary: Optional[bytes]) -> Decompressor:
+        return lzma.LZMADecompressor(lzma.FORMAT_XZ)
+
+
+class _ZstdCodec(_Codec):
+    """``compression.zstd`` (stdlib, 3.14+) or the ``zstandard`` package."""
+
+    name = CODEC_ZSTD
+    levels = (1, 22)
+    default_level = 3
+    dictionaries = True
+
+    def __init__(self) -> None:
+        try:
+            from compression import zstd  # type: ignore[import-not-found]
+
+            self._stdlib, self._module = True, zstd
+        except ImportError:
+            import zstandard  # type: ignore[import-not-found]
+
+            self._stdlib, self._module = False, zstandard
+
+    def _dict(self, dictionary: bytes):
+        if self._stdlib:
+            is_raw = not dictionary.startswith(_ZSTD_DICT_MAGIC)
+            return self._module.ZstdDict(dictionary, is_raw=is_raw)
+        return self._module.ZstdCompressionDict(dictionary)
+
+    def compressor(self, level: int, dictionary: Optional[bytes]) -> Compressor:
+        zstd_dict = self._dict(dictionary) if dictionary else None
+        if self._stdlib:
+            return self._module.ZstdCompressor(level=level, zstd_dict=zstd_dict)
+        return self._module.ZstdCompressor(level=level, dict_data=zstd_dict).compressobj()
+
+    def decompressor(self, dictionary: Optional[bytes]) -> Decompressor:
+        zstd_dict = self._dict(dictionary) if dictionary else None
+        if self._stdlib:
+            return self._module.ZstdDecompressor(zstd_dict=zstd_dict)
+        return self._module.ZstdDecompressor(dict_data=zstd_dict).decompressobj()
+
+    def train(self, samples: Sequence[bytes], size: int) -> bytes:
+        if self._stdlib:
+            return self._module.train_dict(samples, size).dict_content
+        return self._module.train_dictionary(size, list(samples)).as_bytes()
+
+
+_FACTORIES: Dict[str, Callable[[], _Codec]] = {
+    CODEC_ZLIB: _ZlibCodec,
+    CODEC_LZMA: _LzmaCodec,
+    CODEC_ZSTD: _ZstdCodec,
+}
+_loaded: Dict[str, _Codec] = {}
+
+
+def _codec(name: str) -> _Codec:
+    if name not in _FACTORIES:
+        raise CryptoError(f"unknown compression codec '{name}'; choose from {CODECS}")
+    if name not in _loaded:
+        try:
+            _loaded[name] = _FACTORIES[name]()
+        except ImportError as exc:
+            raise CryptoError(
+                f"compression codec '{name}' needs Python 3.14+ or the 'zstandard' package"
+            ) from exc
+    return _loaded[name]
+
+
+def available_codecs() -> Tuple[str, ...]:
+    """Codecs usable in this interpreter."""
+    names = []
+    for name in CODECS:
+        try:
+            _codec(name)
+        except CryptoError:
+            continue
+        names.append(name)
+    return tuple(names)
+
+
+def default_codec() -> str:
+    """``zstd`` when available, otherwise ``zlib``."""
+    return CODEC_ZSTD if CODEC_ZSTD in available_codecs() else CODEC_ZLIB
+
+
+def dictionary_id(dictionary: bytes) -> int:
+    """Non-zero 32-bit id of a preset dictionary, as stored in the header."""
+    return int.from_bytes(hashlib.sha256(dictionary).digest()[:4], "big") or 1
+
+
+def train_dictionary(
+    samples: Iterable[bytes], size: int = DEFAULT_DICTIONARY_SIZE, *, codec: Optional[str] = None
+) -> bytes:
+    """Build a preset dictionary from sample documents.
+
+    With ``codec="zstd"`` the zstd trainer is used. Otherwise the dictionary is
+    made of the JSON keys, strings and XML tags that occur in more than one
+    sample, the most valuable last because zlib reaches recent bytes most
+    cheaply.
+    """
+    sample_list = [bytes(sample) for sample in samples]
+    if not sample_list:
+        raise CryptoError("at least one sample is required")
+    impl = _codec(codec or CODEC_ZLIB)
+    if not impl.dictionaries:
+        raise CryptoError(f"{impl.name} does not support preset dictionaries")
+    if isinstance(impl, _ZstdCodec):
+        return impl.train(sample_list, size)
+    size = min(size, _ZLIB_WINDOW)
+
+    documents: "collections.Counter[bytes]" = collections.Counter()
+    for sample in sample_list:
+        documents.update(set(_TOKEN.findall(sample)))
+    quorum = 2 if len(sample_list) > 1 else 1
+    tokens = [token for token, seen in documents.items() if seen >= quorum]
+    tokens.sort(key=lambda token: (documents[token] * len(token), token), reverse=True)
+    chosen = []
+    used = 0
+    for token in tokens:
+        if used + len(token) > size:
+            continue
+        chosen.append(token)
+        used += len(token)
+    return b"".join(reversed(chosen))
+
+
+def _level(codec: _Codec, level: Optional[int]) -> int:
+    if level is None:
+        return codec.default_level
+    low, high = codec.levels
+    if not low <= level <= high:
+        raise CryptoError(f"{codec.name} level must be between {low} and {high}")
+    return level
+
+
+def _header(codec: str, dictionary: Optional[bytes]) -> bytes:
+    if dictionary and not _codec(codec).dictionaries:
+        raise CryptoError(f"{codec} does not support preset dictionaries")
+    dict_id = dictionary_id(dictionary) if dictionary else 0
+    return _HEADER.pack(MAGIC, _CODEC_IDS[codec], 0, dict_id)
+
+
+def _compressor(
+    codec: str, level: Optional[int] = None, dictionary: Optional[bytes] = None
+) -> Tuple[bytes, Compressor]:
+    """Return the associated-data header and a streaming compressor."""
+    impl = _codec(codec)
+    header = _header(codec, dictionary)
+    return header, impl.compressor(_level(impl, level), dictionary)
+
+
+def _decompressor(raw: Buffer, dictionaries: Optional[Iterable[bytes]] = None) -> Decompressor:
+    """Check an ``AHZ1`` header and return a decompressor for its body."""
+    if len(raw) < _HEADER.size:
+        raise CryptoError("encrypted payload is too short")
+    magic, codec_id, flags, dict_id = _HEADER.unpack(bytes(raw[: _HEADER.size]))
+    if magic != MAGIC:
+        raise CryptoError("encrypted payload missing AHZ1 magic header")
+    if flags != 0:
+        raise CryptoError(f"unsupported AHZ1 flags: {flags:#04x}")
+    if codec_id not in _CODEC_NAMES:
+        raise CryptoError(f"unknown AHZ1 codec id {codec_id}")
+    dictionary = None
+    if dict_id:
+        by_id = {dictionary_id(bytes(item)): bytes(item) for item in dictionaries or ()}
+        if dict_id not in by_id:
+            raise CryptoError(
+                f"payload was compressed with dictionary {dict_id:08x}; pass it in dictionaries"
+            )
+        dictionary = by_id[dict_id]
+    return _codec(_CODEC_NAMES[codec_id]).decompressor(dictionary)
+
+
+def _decompress_all(decompressor: Decompressor, data: Buffer) -> bytes:
+    plaintext = decompressor.decompress(data)
+    if not getattr(decompressor, "eof", True):
+        raise CryptoError("compressed payload is truncated")
+    return plaintext
+
+
+def _decompress_bounded(decompressor: Decompressor, data: Buffer, limit: int) -> Iterator[bytes]:
+    """Decompress ``data`` in pieces of at most ``limit`` bytes where the codec allows it.
+
+    zlib, lzma and ``compression.zstd`` take a ``max_length``; the
+    ``zstandard`` decompressobj does not, and returns its output at once.
+    """
+    if hasattr(decompressor, "unconsumed_tail"):  # zlib
+        while True:
+            piece = decompressor.decompress(data, limit)  # type: ignore[call-arg]
+            yield piece
+            data = decompressor.unconsumed_tail  # type: ignore[attr-defined]
+            if not data and len(piece) < limit:
+                return
+    elif hasattr(decompressor, "needs_input"):  # lzma, compression.zstd
+        yield decompressor.decompress(data, limit)  # type: ignore[call-arg]
+        while not decompressor.needs_input and not decompressor.eof:  # type: ignore[attr-defined]
+            yield decompressor.decompress(b"", limit)  # type: ignore[call-arg]
+    else:
+        yield decompressor.decompress(data)
+
+
+def _encrypt_with_key(
+    payload: Buffer,
+    key: bytes,
+    codec: str,
+    *,
+    level: Optional[int] = None,
+    dictionary: Optional[bytes] = None,
+) -> Optional[bytes]:
+    """Compress and encrypt ``payload`` as ``AHZ1``.
+
+    Returns ``None`` if compression does not make the payload smaller, e.g.
+    for an already compressed AASX package, so the caller can store it as
+    plain ``AHS1`` instead.
+    """
+    source = _byte_view(payload)
+    header, stream = _compressor(codec, level, dictionary)
+    compressed = stream.compress(source) + stream.flush()
+    if len(compressed) + len(header) >= len(source):
+        return None
+    nonce = get_random_bytes(NONCE_SIZE)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(header)
+    ciphertext, tag = cipher.encrypt_and_digest(compressed)
+    return b"".join((header, nonce, tag, ciphertext))
+
+
+def _decrypt_with_key(
+    encrypted: Buffer, key: bytes, dictionaries: Optional[Iterable[bytes]] = None
+) -> bytes:
+    """Verify and decrypt an ``AHZ1`` container, then decompress it."""
+    view = _byte_view(encrypted)
+    if len(view) < HEADER_SIZE:
+        raise CryptoError("encrypted payload is too short")
+    nonce = view[_HEADER.size : _HEADER.size + NONCE_SIZE]
+    tag = view[_HEADER.size + NONCE_SIZE : HEADER_SIZE]
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    cipher.update(view[: _HEADER.size])
+    try:
+        compressed = cipher.decrypt_and_verify(view[HEADER_SIZE:], tag)
+    except ValueError as exc:
+        raise CryptoError("MAC check failed") from exc
+    return _decompress_all(_decompressor(view, dictionaries), compressed)
@@ -0,0 +1,141 @@
+"""Envelope encryption: rotate or refresh shares without touching the payload.
+
+A random data key (DEK) encrypts the payload once, as AHS1 or chunked AHS2. A
+separate key-encryption key (KEK) wraps the DEK with AES-GCM, and only the KEK
+is Shamir-split. The wrapped DEK travels in :attr:`EncryptedBundle.wrapped_key`.
+
+* :func:`rotate_envelope` reconstructs the KEK, draws a new one and re-wraps
+  the DEK. It can change ``(threshold, total)`` and makes every old share
+  useless.
+* :func:`refresh_shares` re-randomises the existing shares by adding a sharing
+  of zero. The KEK stays the same, but a share from before the refresh cannot
+  be combined with shares from after it.
+
+Both only touch the wrapped key and the shares. The ciphertext body of the
+returned bundle is the same object as before.
+"""
+
+from __future__ import annotations
+
+from typing import Iterable, List, Optional
+
+from aas_holo_shard.core.shamir import (
+    BACKEND_PYCRYPTODOME,
+    KEY_SIZE,
+    CryptoError,
+    EncryptedBundle,
+    Share,
+    _combine_key,
+    _decrypt_with_key,
+    _encrypt_with_key,
+    _split_key,
+    _validate_backend,
+    _validate_thresholds,
+    get_random_bytes,
+)
+
+
+def _wrap(kek: bytes, dek: bytes) -> bytes:
+    return _encrypt_with_key(dek, kek)
+
+
+def _unwrap(kek: bytes, wrapped_key: Optional[bytes]) -> bytes:
+    if wrapped_key is None:
+        raise CryptoError("bundle has no wrapped data key; it is not an envelope bundle")
+    try:
+        dek = _decrypt_with_key(wrapped_key, kek)
+    except ValueError as exc:
+        raise CryptoError("wrapped data key failed verification; wrong shares?") from exc
+    if len(dek) != KEY_SIZE:
+        raise CryptoError(f"wrapped data key must be {KEY_SIZE} bytes")
+    return dek
+
+
+def encrypt_envelope(
+    aas_bytes: bytes,
+    *,
+    threshold: int,
+    total: int,
+    chunk_size: Optional[int] = None,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> EncryptedBundle:
+    """Encrypt under a fresh DEK, wrap it with a fresh KEK and split the KEK.
+
+    With ``chunk_size`` the body is a chunked AHS2 container, otherwise AHS1.
+    """
+    _validate_thresholds(threshold, total)
+    _validate_backend(backend)
+
+    dek = get_random_bytes(KEY_SIZE)
+    if chunk_size is None:
+        encrypted = _encrypt_with_key(aas_bytes, dek)
+    else:
+        from aas_holo_shard.core import chunked
+
+        encrypted = chunked.encrypt_chunked(aas_bytes, dek, chunk_size=chunk_size)
+
+    kek = get_random_bytes(KEY_SIZE)
+    return EncryptedBundle(encrypted, _split_key(kek, threshold, total, backend), _wrap(kek, dek))
+
+
+def decrypt_envelope(
+    bundle: EncryptedBundle,
+    shares: Iterable[Share],
+    *,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> bytes:
+    """Reconstruct the KEK, unwrap the DEK and decrypt the body."""
+    dek = _unwrap(_combine_key(shares, backend), bundle.wrapped_key)
+    return _decrypt_with_key(bundle.encrypted, dek)
+
+
+def rotate_envelope(
+    bundle: EncryptedBundle,
+    shares: Iterable[Share],
+    *,
+    threshold: int,
+    total: int,
+    backend: str = BACKEND_PYCRYPTODOME,
+    new_backend: Optional[str] = None,
+) -> EncryptedBundle:
+    """Re-wrap the DEK under a new KEK split ``threshold``-of-``total``.
+
+    ``shares`` must reconstruct the current KEK. Only the wrapped key and the
+    shares change; ``new_backend`` optionally switches the sharing engine.
+    """
+    _validate_thresholds(threshold, total)
+    new_backend = new_backend or backend
+    _validate_backend(new_backend)
+
+    dek = _unwrap(_combine_key(shares, backend), bundle.wrapped_key)
+    kek = get_random_bytes(KEY_SIZE)
+    return EncryptedBundle(
+        bundle.encrypted, _split_key(kek, threshold, total, new_backend), _wrap(kek, dek)
+    )
+
+
+def refresh_shares(
+    shares: Iterable[Share],
+    *,
+    threshold: int,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> List[Share]:
+    """Proactively refresh shares: same KEK, same indices, new share values.
+
+    Both backends share over binary fields, so adding a random degree
+    ``threshold - 1`` sharing of zero is a byte-wise XOR. Refresh every
+    outstanding share together; shares from different epochs do not combine.
+    """
+    share_list = [(int(idx), bytes(payload)) for idx, payload in shares]
+    if not share_list:
+        raise CryptoError("at least one share is required")
+    indices = [idx for idx, _ in share_list]
+    if len(set(indices)) != len(indices):
+        raise CryptoError("share indices must be unique")
+    if any(len(payload) != KEY_SIZE for _, payload in share_list):
+        raise CryptoError("share payload must be 32 bytes")
+    if min(indices) < 1:
+        raise CryptoError("share indices must be >= 1")
+
+    zero = dict(_split_key(bytes(KEY_SIZE), threshold, max(max(indices), threshold), backend))
+    return [(idx, bytes(a ^ b for a, b in zip(payload, zero[idx]))) for idx, payload in share_list]
@@ -0,0 +1,170 @@
+"""Byte-wise Shamir secret sharing over GF(2^8).
+
+Each byte of the secret is shared with its own random polynomial, so a share
+is exactly as long as the secret and secrets of any length are handled in a
+single batched operation. Field arithmetic uses log/antilog tables over the
+AES polynomial ``x^8 + x^4 + x^3 + x + 1``.
+
+Multiplying a whole share by a field scalar is a ``bytes.translate`` through a
+precomputed 256-byte table and share addition is one big-integer XOR, so the
+default path keeps the per-byte work in C. A NumPy implementation that
+evaluates every share index as one array operation is available with
+``use_numpy=True``; on CPython it measured slower than the translate path for
+secrets from 32 bytes to 1 MiB, so it is opt-in.
+"""
+
+from __future__ import annotations
+
+import secrets
+from typing import Any, Iterable, List, Sequence, Tuple
+
+GFShare = Tuple[int, bytes]
+
+MAX_SHARES = 255
+_POLY = 0x11B
+
+
+def _build_tables() -> Tuple[List[int], List[int]]:
+    exp = [0] * 512
+    log = [0] * 256
+    value = 1
+    for power in range(255):
+        exp[power] = value
+        log[value] = power
+        # Multiply by the generator 0x03: value * 2 (reduced) XOR value.
+        doubled = value << 1
+        if doubled & 0x100:
+            doubled ^= _POLY
+        value = doubled ^ value
+    for power in range(255, 512):
+        exp[power] = exp[power - 255]
+    return exp, log
+
+
+EXP, LOG = _build_tables()
+
+
+def gf_mul(a: int, b: int) -> int:
+    if a == 0 or b == 0:
+        return 0
+    return EXP[LOG[a] + LOG[b]]
+
+
+def gf_div(a: int, b: int) -> int:
+    if b == 0:
+        raise ZeroDivisionError("division by zero in GF(256)")
+    if a == 0:
+        return 0
+    return EXP[LOG[a] - LOG[b] + 255]
+
+
+def _mul_table(scalar: int) -> bytes:
+    return bytes(gf_mul(value, scalar) for value in range(256))
+
+
+_MUL_TABLES = [_mul_table(scalar) for scalar in range(256)]
+
+
+def _xor(left: bytes, right: bytes) -> bytes:
+    size = len(left)
+    return (int.from_bytes(left, "big") ^ int.from_bytes(right, "big")).to_bytes(size, "big")
+
+
+def _require_numpy() -> Any:
+    try:
+        import numpy
+    except ImportError as exc:  # pragma: no cover - optional dependency
+        raise RuntimeError("NumPy is required for use_numpy=True") from exc
+    return numpy
+
+
+def _validate(threshold: int, total: int) -> None:
+    if threshold < 1 or total < 1:
+        raise ValueError("threshold and total must be >= 1")
+    if threshold > total:
+        raise ValueError("threshold cannot be greater than total shares")
+    if total > MAX_SHARES:
+        raise ValueError(f"total shares must be <= {MAX_SHARES}")
+
+
+def lagrange_at_zero(indices: Sequence[int]) -> List[int]:
+    """Return the Lagrange basis coefficients at ``x = 0`` for ``indices``."""
+    if len(set(indices)) != len(indices):
+        raise ValueError("share indices must be unique")
+    for idx in indices:
+        if not 1 <= idx <= MAX_SHARES:
+            raise ValueError(f"share index must be between 1 and {MAX_SHARES}")
+
+    coefficients: List[int] = []
+    for j, xj in enumerate(indices):
+        numerator = 1
+        denominator = 1
+        for m, xm in enumerate(indices):
+            if m == j:
+                continue
+            numerator = gf_mul(numerator, xm)
+            denominator = gf_mul(denominator, xm ^ xj)
+        coefficients.append(gf_div(numerator, denominator))
+    return coefficients
+
+
+def split_secret(
+    secret: bytes, threshold: int, total: int, *, use_numpy: bool = False
+) -> List[GFShare]:
+    """Split ``secret`` into ``total`` shares, any ``threshold`` of which recover it."""
+    _validate(threshold, total)
+    secret = bytes(secret)
+    size = len(secret)
+    randomness = secrets.token_bytes(size * (threshold - 1))
+
+    if use_numpy:
+        np = _require_numpy()
+        exp = np.asarray(EXP, dtype=np.uint8)
+        log = np.asarray(LOG, dtype=np.int16)
+        coeffs = np.frombuffer(randomness, dtype=np.uint8).reshape(threshold - 1, size)
+        xs_log = log[np.arange(1, total + 1)][:, None]
+        acc = np.zeros((total, size), dtype=np.uint8)
+        # Horner evaluation for every share index and every byte at once.
+        for row in coeffs[::-1]:
+            product = np.where(acc == 0, 0, exp[log[acc] + xs_log])
+            acc = product.astype(np.uint8) ^ row
+        product = np.where(acc == 0, 0, exp[log[acc] + xs_log]).astype(np.uint8)
+        acc = product ^ np.frombuffer(secret, dtype=np.uint8)
+        return [(idx, acc[idx - 1].tobytes()) for idx in range(1, total + 1)]
+
+    rows = [randomness[i * size : (i + 1) * size] for i in range(threshold - 1)]
+    shares: List[GFShare] = []
+    for idx in range(1, total + 1):
+        table = _MUL_TABLES[idx]
+        acc = bytes(size)
+        for row in reversed(rows):
+            acc = _xor(acc.translate(table), row)
+        shares.append((idx, _xor(acc.translate(table), secret)))
+    return shares
+
+
+def combine_shares(shares: Iterable[GFShare], *, use_numpy: bool = False) -> bytes:
+    """Recover the secret from ``threshold`` or more shares."""
+    share_list = [(int(idx), bytes(payload)) for idx, payload in shares]
+    if not share_list:
+        raise ValueError("at least one share is required")
+    size = len(share_list[0][1])
+    if any(len(payload) != size for _, payload in share_list):
+        raise ValueError("all shares must have the same length")
+
+    coefficients = lagrange_at_zero([idx for idx, _ in share_list])
+
+    if use_numpy:
+        np = _require_numpy()
+        exp = np.asarray(EXP, dtype=np.uint8)
+        log = np.asarray(LOG, dtype=np.int16)
+        ys = np.frombuffer(b"".join(payload for _, payload in share_list), dtype=np.uint8)
+        ys = ys.reshape(len(share_list), size)
+        coeff_log = log[np.asarray(coefficients)][:, None]
+        terms = np.where(ys == 0, 0, exp[log[ys] + coeff_log]).astype(np.uint8)
+        return np.bitwise_xor.reduce(terms, axis=0).tobytes()
+
+    secret = bytes(size)
+    for coefficient, (_, payload) in zip(coefficients, share_list):
+        secret = _xor(secret, payload.translate(_MUL_TABLES[coefficient]))
+    return secret
@@ -0,0 +1,279 @@
+"""Error-correcting Shamir reconstruction (Berlekamp–Welch decoding).
+
+Shamir shares are points on a polynomial of degree ``k - 1``, i.e. a
+Reed–Solomon codeword, so with ``m > k`` shares up to ``(m - k) // 2``
+corrupted ones can be corrected and named without trying every ``k``-subset.
+
+:func:`decode` first interpolates the first ``k`` points and checks the rest.
+Only if that fails does it solve the Berlekamp–Welch key equation
+``Q(x_i) = y_i * E(x_i)`` by Gaussian elimination, where the roots of the
+error locator ``E`` are the faulty shares and ``P = Q / E``. Either way this
+costs ``O(m^3)`` field operations at most.
+
+Fields: :class:`PrimeField` (the AAS JSON mode's 521-bit prime),
+:data:`GF256` (the byte-wise engine in :mod:`aas_holo_shard.core.gf256`) and
+:data:`GF2_128` (pycryptodome's ``Shamir`` shares, polynomial
+``x^128 + x^7 + x^2 + x + 1`` with elements encoded as big-endian integers).
+"""
+
+from __future__ import annotations
+
+from typing import List, Optional, Protocol, Sequence, Tuple
+
+from aas_holo_shard.core import gf256
+
+Point = Tuple[int, int]
+
+
+class DecodingError(ValueError):
+    """Raised when the shares contain more errors than can be corrected."""
+
+
+class Field(Protocol):
+    """Arithmetic on field elements represented as non-negative ints."""
+
+    def add(self, a: int, b: int) -> int: ...
+
+    def sub(self, a: int, b: int) -> int: ...
+
+    def mul(self, a: int, b: int) -> int: ...
+
+    def inv(self, a: int) -> int: ...
+
+
+class PrimeField:
+    """Integers modulo a prime."""
+
+    def __init__(self, modulus: int) -> None:
+        self.modulus = modulus
+
+    def add(self, a: int, b: int) -> int:
+        return (a + b) % self.modulus
+
+    def sub(self, a: int, b: int) -> int:
+        return (a - b) % self.modulus
+
+    def mul(self, a: int, b: int) -> int:
+        return (a * b) % self.modulus
+
+    def inv(self, a: int) -> int:
+        if a % self.modulus == 0:
+            raise ZeroDivisionError("division by zero in the prime field")
+        return pow(a, -1, self.modulus)
+
+
+class _BinaryField:
+    """Shared helpers for fields of characteristic two, where ``a - b == a + b``."""
+
+    def add(self, a: int, b: int) -> int:
+        return a ^ b
+
+    sub = add
+
+    def mul(self, a: int, b: int) -> int:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+    def inv(self, a: int) -> int:  # pragma: no cover - abstract
+        raise NotImplementedError
+
+
+class _GF256Field(_BinaryField):
+    def mul(self, a: int, b: int) -> int:
+        return gf256.gf_mul(a, b)
+
+    def inv(self, a: int) -> int:
+        return gf256.gf_div(1, a)
+
+
+class _GF2_128Field(_BinaryField):
+    MODULUS = (1 << 128) | 0x87
+
+    def mul(self, a: int, b: int) -> int:
+        result = 0
+        while b:
+            if b & 1:
+                result ^= a
+            b >>= 1
+            a <<= 1
+            if a >> 128:
+                a ^= self.MODULUS
+        return result
+
+    def inv(self, a: int) -> int:
+        # Extended Euclid over GF(2)[x]: keeps u = g1 * a and v = g2 * a
+        # (mod MODULUS) until u reaches 1.
+        if a == 0:
+            raise ZeroDivisionError("division by zero in GF(2^128)")
+        u, v, g1, g2 = a, self.MODULUS, 1, 0
+        while u != 1:
+            shift = u.bit_length() - v.bit_length()
+            if shift < 0:
+                u, v, g1, g2 = v, u, g2, g1
+                shift = -shift
+            u ^= v << shift
+            g1 ^= g2 << shift
+        return g1
+
+
+GF256 = _GF256Field()
+GF2_128 = _GF2_128Field()
+
+
+def _evaluate(field: Field, poly: Sequence[int], x: int) -> int:
+    result = 0
+    for coefficient in reversed(poly):
+        result = field.add(field.mul(result, x), coefficient)
+    return result
+
+
+def _powers(field: Field, x: int, count: int) -> List[int]:
+    powers = [1]
+    for _ in range(count - 1):
+        powers.append(field.mul(powers[-1], x))
+    return powers
+
+
+def _solve(field: Field, rows: List[List[int]], size: int) -> Optional[List[int]]:
+    """Solve an augmented linear system; free variables are set to zero.
+
+    Returns ``None`` if the system is inconsistent.
+    """
+    rows = [list(row) for row in rows]
+    pivots: List[int] = []
+    rank = 0
+    for column in range(size):
+        pivot = next((i for i in range(rank, len(rows)) if rows[i][column]), None)
+        if pivot is None:
+            continue
+        rows[rank], rows[pivot] = rows[pivot], rows[rank]
+        scale = field.inv(rows[rank][column])
+        rows[rank] = [field.mul(value, scale) for value in rows[rank]]
+        for i, row in enumerate(rows):
+            factor = row[column]
+            if i != rank and factor:
+                rows[i] = [field.sub(a, field.mul(factor, b)) for a, b in zip(row, rows[rank])]
+        pivots.append(column)
+        rank += 1
+        if rank == len(rows):
+            break
+    if any(row[size] for row in rows[rank:]):
+        return None
+    solution = [0] * size
+    for row, column in enumerate(pivots):
+        solution[column] = rows[row][size]
+    return solution
+
+
+def _divide(field: Field, numerator: Sequence[int], monic: Sequence[int]) -> Tuple[List[int], bool]:
+    """Divide by a monic polynomial; returns the quotient and whether it was exact."""
+    remainder = list(numerator)
+    degree = len(monic) - 1
+    quotient = [0] * max(len(remainder) - degree, 1)
+    for i in range(len(remainder) - 1, degree - 1, -1):
+        coefficient = remainder[i]
+        if coefficient:
+            quotient[i - degree] = coefficient
+            for j, term in enumerate(monic):
+                remainder[i - degree + j] = field.sub(
+                    remainder[i - degree + j], field.mul(coefficient, term)
+                )
+    return quotient, not any(remainder[:degree])
+
+
+def _misses(field: Field, poly: Sequence[int], points: Sequence[Point]) -> List[int]:
+    return [x for x, y in points if _evaluate(field, poly, x) != y]
+
+
+def decode(field: Field, points: Sequence[Point], k: int) -> Tuple[List[int], List[int]]:
+    """Find the polynomial of degree ``< k`` through all but the faulty ``points``.
+
+    Returns its coefficients (constant term first, so ``[0]`` is the secret)
+    and the x-coordinates of the points it misses. Raises
+    :class:`DecodingError` if more than ``(len(points) - k) // 2`` points are
+    wrong, in particular if ``len(points) == k + 1`` and they disagree.
+    Beyond that bound a carefully forged set of shares can still decode to a
+    different polynomial, so keys should be checked (e.g. by the GCM tag).
+    """
+    if k < 1:
+        raise DecodingError("threshold must be >= 1")
+    xs = [x for x, _ in points]
+    if len(set(xs)) != len(xs):
+        raise DecodingError("share indices must be unique")
+    if len(points) < k:
+        raise DecodingError(f"{k} shares are required, got {len(points)}")
+
+    vandermonde = [_powers(field, x, k) + [y] for x, y in points[:k]]
+    poly = _solve(field, vandermonde, k)
+    if poly is not None and not _misses(field, poly, points[k:]):
+        return poly, []
+
+    errors = (len(points) - k) // 2
+    if errors == 0:
+        raise DecodingError(
+            f"shares are inconsistent; {k + 2} shares are needed to correct one faulty share"
+        )
+    width = k + errors
+    rows = []
+    for x, y in points:
+        powers = _powers(field, x, width)
+        locator = [field.sub(0, field.mul(y, power)) for power in powers[:errors]]
+        rows.append(powers + locator + [field.mul(y, powers[errors])])
+    solution = _solve(field, rows, width + errors)
+    if solution is not None:
+        poly, exact = _divide(field, solution[:width], solution[width:] + [1])
+        if exact:
+            poly = (poly + [0] * k)[:k]
+            faulty = _misses(field, poly, points)
+            if len(faulty) <= errors:
+                return poly, faulty
+    raise DecodingError(f"more than {errors} of {len(points)} shares are faulty")
+
+
+def _gf256_lagrange_at(indices: Sequence[int], point: int) -> List[int]:
+    coefficients: List[int] = []
+    for j, xj in enumerate(indices):
+        numerator = 1
+        denominator = 1
+        for m, xm in enumerate(indices):
+            if m != j:
+                numerator = gf256.gf_mul(numerator, point ^ xm)
+                denominator = gf256.gf_mul(denominator, xj ^ xm)
+        coefficients.append(gf256.gf_div(numerator, denominator))
+    return coefficients
+
+
+def combine_gf256(shares: Sequence[gf256.GFShare], k: int) -> Tuple[bytes, List[int]]:
+    """Robust counterpart of :func:`aas_holo_shard.core.gf256.combine_shares`.
+
+    Every byte position is its own codeword. The first ``k`` shares are
+    interpolated at the other indices with whole-share ``translate`` calls, and
+    only the byte positions where a share disagrees are decoded one by one.
+    Returns the secret and the indices of the faulty shares.
+    """
+    share_list = [(int(idx), bytes(payload)) for idx, payload in shares]
+    if len(share_list) < k:
+        raise DecodingError(f"{k} shares are required, got {len(share_list)}")
+    size = len(share_list[0][1])
+    if any(len(payload) != size for _, payload in share_list):
+        raise DecodingError("all shares must have the same length")
+    try:
+        secret = bytearray(gf256.combine_shares(share_list[:k]))
+    except ValueError as exc:
+        raise DecodingError(str(exc)) from exc
+
+    base = [idx for idx, _ in share_list[:k]]
+    suspect = 0
+    for idx, payload in share_list[k:]:
+        predicted = bytes(size)
+        for coefficient, (_, known) in zip(_gf256_lagrange_at(base, idx), share_list[:k]):
+            predicted = gf256._xor(predicted, known.translate(gf256._MUL_TABLES[coefficient]))
+        suspect |= int.from_bytes(predicted, "big") ^ int.from_bytes(payload, "big")
+
+    faulty = set()
+    for position in range(size):
+        if suspect >> (8 * (size - 1 - position)) & 0xFF:
+            points = [(idx, payload[position]) for idx, payload in share_list]
+            poly, bad = decode(GF256, points, k)
+            secret[position] = poly[0]
+            faulty.update(bad)
+    return bytes(secret), sorted(faulty)
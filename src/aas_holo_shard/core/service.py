@@ -0,0 +1,924 @@
+"""Long-running reconstruction service with a TTL key cache.
+
+:func:`~aas_holo_shard.core.shamir.reconstruct_and_decrypt` recombines the key
+from shares on every call. Clients that open the same protected AASX again and
+again can hand the shares to a :class:`ReconstructionService` once instead.
+The service keeps the reconstructed key in a :class:`KeyCache` and serves
+whole-file and byte-range decrypts concurrently. AES-GCM and share combining
+run on a thread pool (pycryptodome releases the GIL), so the event loop only
+parses requests.
+
+Keys are cached under the container id: the header and nonce of an ``AHS1``
+or compressed ``AHZ1`` blob, or the raw header of an ``AHS2`` container. An entry expires ``ttl``
+seconds after it was loaded, however often it is used. The cache holds at
+most ``max_entries`` keys, and an evicted key is overwritten with zeros as soon
+as no request is using it. That is best effort: pycryptodome keeps its own
+copy of the key schedule until each cipher object is garbage collected.
+
+:func:`serve` exposes the service over a small HTTP/1.1 protocol on a Unix
+socket (created with mode ``0600``) or a localhost TCP port::
+
+    POST   /keys            {"path": "model.aasx.enc",
+                             "shares": [{"index": 1, "payload": "<base64>"}, ...],
+                             "backend": "pycryptodome", "threshold": null}
+    GET    /decrypt?path=   plaintext; honours "Range: bytes=first-last"
+    DELETE /keys?path=      forget the container's key
+    GET    /stats           cache statistics
+
+Paths are opened by the service process, so anyone who can reach the socket
+can decrypt every container whose key is loaded. On TCP that would be every
+local user and, through DNS rebinding, any web page, so TCP requests must
+carry ``Authorization: Bearer <token>`` and a ``Host`` of ``127.0.0.1:<port>``
+or ``localhost:<port>``. Requests with an ``Origin`` header are refused on
+either transport. :class:`ServiceClient` is a blocking client for the same
+protocol. Run the service with
+``python -m aas_holo_shard.core.service --socket /run/aas-holo-shard.sock``.
+"""
+
+from __future__ import annotations
+
+import argparse
+import asyncio
+import base64
+import collections
+import functools
+import hmac
+import http.client
+import json
+import os
+import secrets
+import socket
+import sys
+import threading
+import time
+from concurrent.futures import Executor, ThreadPoolExecutor
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+from typing import (
+    Any,
+    BinaryIO,
+    Dict,
+    FrozenSet,
+    Iterable,
+    Iterator,
+    List,
+    NamedTuple,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
+from urllib.parse import parse_qs, quote, urlsplit
+
+from aas_holo_shard import instrumentation
+from aas_holo_shard.core import chunked, compress
+from aas_holo_shard.core.shamir import (
+    AES,
+    BACKEND_PYCRYPTODOME,
+    MAGIC,
+    NONCE_SIZE,
+    TAG_SIZE,
+    CryptoError,
+    Share,
+    _recover_key,
+)
+from aas_holo_shard.core.stream import DEFAULT_CHUNK_SIZE, _read_chunks
+
+DEFAULT_TTL = 900.0
+DEFAULT_MAX_KEYS = 128
+MAX_REQUEST_BODY = 1 << 20
+
+_AHS1_ID_SIZE = len(MAGIC) + NONCE_SIZE
+_AHS1_OVERHEAD = _AHS1_ID_SIZE + TAG_SIZE
+
+PathLike = Union[str, "os.PathLike[str]"]
+# Compressed bytes per decompress call when reading AHZ1; the output of each
+# call is further capped at DEFAULT_CHUNK_SIZE where the codec allows it.
+_INFLATE_INPUT = 64 * 1024
+
+
+class KeyNotLoaded(LookupError):
+    """Raised when no cached key matches a container; load its shares first."""
+
+
+class ServiceError(RuntimeError):
+    """Raised by :class:`ServiceClient` when the service answers with an error."""
+
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(f"service returned HTTP {status}: {message}")
+        self.status = status
+
+
+@dataclass
+class KeyCacheStats:
+    hits: int = 0
+    misses: int = 0
+    loads: int = 0
+    evictions: int = 0
+    expired: int = 0
+
+
+@dataclass
+class _Entry:
+    key: bytearray
+    loaded_at: float
+    leases: int = 0
+    evicted: bool = False
+
+
+def _zeroize(buffer: bytearray) -> None:
+    buffer[:] = bytes(len(buffer))
+
+
+def container_id(header: bytes) -> bytes:
+    """Return the cache id of a container from its first :data:`HEADER_PEEK` bytes."""
+    magic = bytes(header[: len(MAGIC)])
+    if magic == chunked.MAGIC:
+        return chunked.ChunkedHeader.parse(header).raw
+    if magic == MAGIC and len(header) >= _AHS1_OVERHEAD:
+        return bytes(header[:_AHS1_ID_SIZE])
+    if magic == compress.MAGIC and len(header) >= compress.HEADER_SIZE:
+        return bytes(header[: compress.HEADER_SIZE - TAG_SIZE])
+    raise CryptoError("not an AHS1, AHS2 or AHZ1 container")
+
+
+HEADER_PEEK = max(chunked.HEADER_SIZE, _AHS1_OVERHEAD, compress.HEADER_SIZE)
+
+
+class KeyCache:
+    """Thread-safe LRU of container keys bounded by entry count and age.
+
+    Use :meth:`lease` to borrow a key: it stays intact while leased, even if
+    it is evicted in the meantime, and is zeroized when the last lease ends.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_MAX_KEYS,
+        *,
+        ttl: Optional[float] = DEFAULT_TTL,
+        clock=time.monotonic,
+    ) -> None:
+        if max_entries < 1:
+            raise ValueError("max_entries must be >= 1")
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.stats = KeyCacheStats()
+        self._clock = clock
+        self._entries: "collections.OrderedDict[bytes, _Entry]" = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, cid: object) -> bool:
+        return cid in self._entries
+
+    def _evict(self, cid: bytes) -> None:
+        entry = self._entries.pop(cid)
+        entry.evicted = True
+        if entry.leases == 0:
+            _zeroize(entry.key)
+
+    def _expired(self, entry: _Entry) -> bool:
+        return self.ttl is not None and self._clock() - entry.loaded_at > self.ttl
+
+    def put(self, cid: bytes, key: bytes) -> None:
+        with self._lock:
+            if cid in self._entries:
+                self._evict(cid)
+            self._entries[cid] = _Entry(bytearray(key), self._clock())
+            self.stats.loads += 1
+            while len(self._entries) > self.max_entries:
+                self._evict(next(iter(self._entries)))
+                self.stats.evictions += 1
+
+    @contextmanager
+    def lease(self, cid: bytes) -> Iterator[Optional[bytearray]]:
+        """Yield the key for ``cid`` (``None`` on a miss) and pin it meanwhile."""
+        with self._lock:
+            entry = self._entries.get(cid)
+            if entry is not None and self._expired(entry):
+                self._evict(cid)
+                self.stats.expired += 1
+                entry = None
+            if entry is None:
+                self.stats.misses += 1
+            else:
+                self._entries.move_to_end(cid)
+                self.stats.hits += 1
+                entry.leases += 1
+        if entry is None:
+            yield None
+            return
+        try:
+            yield entry.key
+        finally:
+            with self._lock:
+                entry.leases -= 1
+                if entry.evicted and entry.leases == 0:
+                    _zeroize(entry.key)
+
+    def discard(self, cid: bytes) -> bool:
+        with self._lock:
+            if cid not in self._entries:
+                return False
+            self._evict(cid)
+            return True
+
+    def purge_expired(self) -> int:
+        """Evict (and zeroize) every expired key; returns how many were dropped."""
+        with self._lock:
+            stale = [cid for cid, entry in self._entries.items() if self._expired(entry)]
+            for cid in stale:
+                self._evict(cid)
+            self.stats.expired += len(stale)
+            return len(stale)
+
+    def clear(self) -> None:
+        with self._lock:
+            for cid in list(self._entries):
+                self._evict(cid)
+
+
+class Plaintext(NamedTuple):
+    """Decrypted bytes, where they start in the plaintext, and its total size."""
+
+    data: bytes
+    offset: int
+    size: int
+
+
+def _read_header(path: PathLike) -> bytes:
+    with open(path, "rb") as handle:
+        return handle.read(HEADER_PEEK)
+
+
+def _clamp(offset: int, length: Optional[int], size: int) -> Tuple[int, int]:
+    start = max(size + offset, 0) if offset < 0 else min(offset, size)
+    end = size if length is None else min(start + max(length, 0), size)
+    return start, end
+
+
+class _Window:
+    """Collect the bytes :func:`_clamp` selects from a stream of unknown size."""
+
+    def __init__(self, offset: int, length: Optional[int]) -> None:
+        self.offset = offset
+        self.length = length
+        self.size = 0
+        self._kept = bytearray()
+
+    def feed(self, data: bytes) -> None:
+        if self.offset < 0:
+            # Suffix range: keep a rolling tail of -offset bytes.
+            self._kept += data
+            del self._kept[: max(len(self._kept) + self.offset, 0)]
+        else:
+            stop = len(data)
+            if self.length is not None:
+                stop = min(stop, self.offset + max(self.length, 0) - self.size)
+            first = max(self.offset - self.size, 0)
+            if first < stop:
+                self._kept += data[first:stop]
+        self.size += len(data)
+
+    def result(self) -> Plaintext:
+        start, end = _clamp(self.offset, self.length, self.size)
+        return Plaintext(bytes(self._kept[: end - start]), start, self.size)
+
+
+def _verify(cipher, tag: bytes) -> None:
+    try:
+        cipher.verify(tag)
+    except ValueError as exc:
+        raise CryptoError("MAC check failed") from exc
+
+
+def _stream_plaintext(
+    handle: BinaryIO,
+    key: bytearray,
+    offset: int,
+    length: Optional[int],
+    dictionaries: Sequence[bytes] = (),
+) -> Plaintext:
+    """Decrypt an AHS1/AHZ1 container in chunks, keeping only the requested window.
+
+    There is a single tag over the whole payload, so every range is decrypted
+    and verified up to EOF, but memory stays around the range plus a chunk.
+    ``AHZ1`` is read twice: the tag is checked before anything is
+    decompressed, and again over the ciphertext that is decompressed.
+    """
+    magic = handle.read(len(MAGIC))
+    if magic == compress.MAGIC:
+        aad = magic + handle.read(compress.HEADER_SIZE - NONCE_SIZE - TAG_SIZE - len(MAGIC))
+    elif magic == MAGIC:
+        aad = b""
+    else:
+        raise CryptoError("encrypted payload missing magic header")
+    nonce = handle.read(NONCE_SIZE)
+    tag = handle.read(TAG_SIZE)
+    if len(tag) < TAG_SIZE:
+        raise CryptoError("encrypted payload is too short")
+
+    def new_cipher():
+        cipher = AES.new(bytes(key), AES.MODE_GCM, nonce=nonce)
+        cipher.update(aad)
+        return cipher
+
+    window = _Window(offset, length)
+    if not aad:
+        cipher = new_cipher()
+        for chunk in _read_chunks(handle, DEFAULT_CHUNK_SIZE):
+            window.feed(cipher.decrypt(chunk))
+        _verify(cipher, tag)
+        return window.result()
+
+    body = handle.tell()
+    cipher = new_cipher()
+    for chunk in _read_chunks(handle, DEFAULT_CHUNK_SIZE):
+        cipher.decrypt(chunk)
+    _verify(cipher, tag)
+    decompressor = compress._decompressor(aad, dictionaries)
+    handle.seek(body)
+    cipher = new_cipher()
+    try:
+        for chunk in _read_chunks(handle, _INFLATE_INPUT):
+            data = cipher.decrypt(chunk)
+            for piece in compress._decompress_bounded(decompressor, data, DEFAULT_CHUNK_SIZE):
+                window.feed(piece)
+    except Exception as exc:  # zlib.error, LZMAError, ZstdError, EOFError...
+        raise CryptoError(f"corrupt compressed payload: {exc}") from exc
+    _verify(cipher, tag)
+    if not getattr(decompressor, "eof", True):
+        raise CryptoError("compressed payload is truncated")
+    return window.result()
+
+
+def _read_plaintext(
+    path: PathLike,
+    key: bytearray,
+    offset: int,
+    length: Optional[int],
+    dictionaries: Sequence[bytes] = (),
+) -> Plaintext:
+    with open(path, "rb") as handle:
+        if handle.read(len(MAGIC)) == chunked.MAGIC:
+            handle.seek(0)
+            reader = chunked.ChunkedReader(handle, key, workers=1)
+            start, end = _clamp(offset, length, reader.size)
+            return Plaintext(reader.read_range(start, end - start), start, reader.size)
+        handle.seek(0)
+        return _stream_plaintext(handle, key, offset, length, dictionaries)
+
+
+def _check_key(path: PathLike, key: bytes, dictionaries: Sequence[bytes] = ()) -> None:
+    """Fail unless ``key`` opens the container (AHS2: its first chunk only)."""
+    try:
+        _read_plaintext(path, bytearray(key), 0, 1, dictionaries)
+    except ValueError as exc:
+        raise CryptoError(f"shares do not open this container: {exc}") from exc
+
+
+class ReconstructionService:
+    """Caches reconstructed keys and decrypts containers on a worker pool.
+
+    ``dictionaries`` are the preset compression dictionaries that ``AHZ1``
+    containers may refer to (see :mod:`aas_holo_shard.core.compress`).
+    """
+
+    def __init__(
+        self,
+        *,
+        cache: Optional[KeyCache] = None,
+        workers: Optional[int] = None,
+        executor: Optional[Executor] = None,
+        dictionaries: Iterable[bytes] = (),
+    ) -> None:
+        self.cache = cache if cache is not None else KeyCache()
+        self._dictionaries = tuple(bytes(item) for item in dictionaries)
+        self._owns_executor = executor is None
+        self._executor = executor or ThreadPoolExecutor(
+            max_workers=workers, thread_name_prefix="aas-holo-shard-service"
+        )
+        self._sweeper: Optional["asyncio.Task[None]"] = None
+
+    async def _run(self, func, *args):
+        return await asyncio.get_running_loop().run_in_executor(self._executor, func, *args)
+
+    async def container_id(self, path: PathLike) -> bytes:
+        return container_id(await self._run(_read_header, path))
+
+    async def load(
+        self,
+        path: PathLike,
+        shares: Iterable[Share],
+        *,
+        backend: str = BACKEND_PYCRYPTODOME,
+        threshold: Optional[int] = None,
+    ) -> bytes:
+        """Reconstruct and verify the key of ``path``, cache it, and return its id.
+
+        ``threshold`` enables robust combining, as in
+        :func:`~aas_holo_shard.core.shamir.reconstruct_and_decrypt`.
+        """
+        share_list = list(shares)
+        with instrumentation.span("service.load_key", backend=backend, shares=len(share_list)):
+            cid = await self.container_id(path)
+            key = await self._run(_recover_key, share_list, backend, threshold)
+            await self._run(_check_key, path, key, self._dictionaries)
+            self.cache.put(cid, key)
+        return cid
+
+    async def read(
+        self, path: PathLike, offset: int = 0, length: Optional[int] = None
+    ) -> Plaintext:
+        """Decrypt ``length`` bytes from ``offset`` (to the end if ``None``).
+
+        A negative ``offset`` counts from the end of the plaintext; ranges are
+        clamped to it. Raises :class:`KeyNotLoaded` if the key is not cached.
+        """
+        cid = await self.container_id(path)
+        with self.cache.lease(cid) as key:
+            if key is None:
+                raise KeyNotLoaded(f"no key loaded for {os.fspath(path)}")
+            with instrumentation.span("service.decrypt", offset=offset, length=length):
+                result = await self._run(
+                    _read_plaintext, path, key, offset, length, self._dictionaries
+                )
+        instrumentation.count("crypto.bytes", len(result.data), op="decrypt")
+        return result
+
+    async def decrypt(self, path: PathLike) -> bytes:
+        return (await self.read(path)).data
+
+    async def forget(self, path: PathLike) -> bool:
+        return self.cache.discard(await self.container_id(path))
+
+    def stats(self) -> Dict[str, Any]:
+        return dict(asdict(self.cache.stats), keys=len(self.cache))
+
+    def start_sweeper(self, interval: Optional[float] = None) -> None:
+        """Purge expired keys periodically, so idle keys do not outlive their TTL."""
+        if self._sweeper is not None or self.cache.ttl is None:
+            return
+        period = interval if interval is not None else min(self.cache.ttl, 30.0)
+        self._sweeper = asyncio.get_running_loop().create_task(self._sweep(period))
+
+    async def _sweep(self, period: float) -> None:
+        while True:
+            await asyncio.sleep(period)
+            self.cache.purge_expired()
+
+    async def aclose(self) -> None:
+        """Stop sweeping, zeroize every cached key and release the worker pool."""
+        if self._sweeper is not None:
+            self._sweeper.cancel()
+            try:
+                await self._sweeper
+            except asyncio.CancelledError:
+                pass
+            self._sweeper = None
+        self.cache.clear()
+        if self._owns_executor:
+            self._executor.shutdown(wait=False)
+
+
+class _BadRequest(Exception):
+    def __init__(self, status: int, message: str) -> None:
+        super().__init__(message)
+        self.status = status
+
+
+@dataclass
+class _Request:
+    method: str
+    path: str
+    query: Dict[str, str]
+    version: str
+    headers: Dict[str, str] = field(default_factory=dict)
+    body: bytes = b""
+
+    @property
+    def keep_alive(self) -> bool:
+        connection = self.headers.get("connection", "").lower()
+        if self.version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+
+_Response = Tuple[int, Dict[str, str], bytes]
+
+
+async def _read_request(reader: asyncio.StreamReader) -> Optional[_Request]:
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, version = line.decode("latin-1").split()
+    except ValueError:
+        raise _BadRequest(400, "malformed request line") from None
+    parts = urlsplit(target)
+    query = {name: values[-1] for name, values in parse_qs(parts.query).items()}
+    request = _Request(method.upper(), parts.path, query, version)
+    while True:
+        line = await reader.readline()
+        if line in (b"\r\n", b"\n", b""):
+            break
+        name, _, value = line.decode("latin-1").partition(":")
+        request.headers[name.strip().lower()] = value.strip()
+    if "transfer-encoding" in request.headers:
+        raise _BadRequest(411, "chunked request bodies are not supported")
+    try:
+        length = int(request.headers.get("content-length", "0"))
+    except ValueError:
+        raise _BadRequest(400, "invalid Content-Length") from None
+    if length > MAX_REQUEST_BODY:
+        raise _BadRequest(413, "request body too large")
+    if length:
+        request.body = await reader.readexactly(length)
+    return request
+
+
+def _json(status: int, data: Any) -> _Response:
+    body = json.dumps(data, separators=(",", ":")).encode("utf-8")
+    return status, {"Content-Type": "application/json"}, body
+
+
+def _parse_range(header: Optional[str]) -> Optional[Tuple[int, Optional[int]]]:
+    """Parse a single ``bytes=`` range into ``(offset, length)``; ignore anything else."""
+    if not header or not header.startswith("bytes=") or "," in header:
+        return None
+    first, _, last = header[len("bytes=") :].strip().partition("-")
+    try:
+        if not first:
+            suffix = int(last)
+            # An empty suffix can never be satisfied; reading nothing yields a 416.
+            return (-suffix, None) if suffix > 0 else (0, 0)
+        start = int(first)
+        if not last:
+            return start, None
+        end = int(last)
+    except ValueError:
+        return None
+    if start < 0 or end < start:
+        return None
+    return start, end - start + 1
+
+
+def _target(request: _Request) -> str:
+    path = request.query.get("path")
+    if not path:
+        raise _BadRequest(400, "missing 'path' query parameter")
+    return path
+
+
+async def _load(service: ReconstructionService, request: _Request) -> _Response:
+    try:
+        data = json.loads(request.body.decode("utf-8"))
+        shares = [
+            (int(item["index"]), base64.b64decode(item["payload"], validate=True))
+            for item in data["shares"]
+        ]
+        path = data["path"]
+    except (ValueError, KeyError, TypeError):
+        raise _BadRequest(400, "expected JSON with 'path' and 'shares'") from None
+    cid = await service.load(
+        path,
+        shares,
+        backend=data.get("backend") or BACKEND_PYCRYPTODOME,
+        threshold=data.get("threshold"),
+    )
+    return _json(200, {"key_id": cid.hex()})
+
+
+async def _decrypt(service: ReconstructionService, request: _Request) -> _Response:
+    headers = {"Content-Type": "application/octet-stream", "Accept-Ranges": "bytes"}
+    byte_range = _parse_range(request.headers.get("range"))
+    if byte_range is None:
+        return 200, headers, (await service.read(_target(request))).data
+    result = await service.read(_target(request), *byte_range)
+    if not result.data:
+        return 416, {"Content-Range": f"bytes */{result.size}"}, b""
+    last = result.offset + len(result.data) - 1
+    headers["Content-Range"] = f"bytes {result.offset}-{last}/{result.size}"
+    return 206, headers, result.data
+
+
+async def _forget(service: ReconstructionService, request: _Request) -> _Response:
+    return _json(200, {"forgotten": await service.forget(_target(request))})
+
+
+async def _stats(service: ReconstructionService, request: _Request) -> _Response:
+    return _json(200, service.stats())
+
+
+@dataclass
+class _Access:
+    """Who may use a listener: ``hosts`` (``None`` = any) and a bearer ``token``."""
+
+    token: Optional[str] = None
+    hosts: Optional[FrozenSet[str]] = None
+
+
+def new_token() -> str:
+    """Return a random bearer token for :func:`serve` and :class:`ServiceClient`."""
+    return secrets.token_urlsafe(32)
+
+
+def _refuse(access: _Access, request: _Request) -> Optional[_Response]:
+    """Return an error response unless ``request`` passes the ``access`` checks."""
+    if "origin" in request.headers:
+        return _json(403, {"error": "cross-origin requests are not allowed"})
+    if access.hosts is not None and request.headers.get("host", "").lower() not in access.hosts:
+        return _json(403, {"error": "unexpected Host header"})
+    if access.token is not None:
+        scheme, _, credentials = request.headers.get("authorization", "").partition(" ")
+        expected = access.token.encode("utf-8")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(
+            credentials.strip().encode("utf-8"), expected
+        ):
+            status, headers, body = _json(401, {"error": "missing or invalid bearer token"})
+            return status, dict(headers, **{"WWW-Authenticate": "Bearer"}), body
+    return None
+
+
+_ROUTES = {
+    ("POST", "/keys"): _load,
+    ("DELETE", "/keys"): _forget,
+    ("GET", "/decrypt"): _decrypt,
+    ("GET", "/stats"): _stats,
+}
+
+
+async def _dispatch(service: ReconstructionService, request: _Request) -> _Response:
+    handler = _ROUTES.get((request.method, request.path))
+    if handler is None:
+        if any(path == request.path for _, path in _ROUTES):
+            return _json(405, {"error": f"{request.method} is not allowed on {request.path}"})
+        return _json(404, {"error": f"unknown endpoint {request.path}"})
+    try:
+        return await handler(service, request)
+    except _BadRequest as exc:
+        return _json(exc.status, {"error": str(exc)})
+    except (KeyNotLoaded, FileNotFoundError) as exc:
+        return _json(404, {"error": str(exc)})
+    except ValueError as exc:
+        return _json(400, {"error": str(exc)})
+    except Exception as exc:  # noqa: BLE001 - report it and keep serving
+        return _json(500, {"error": f"{type(exc).__name__}: {exc}"})
+
+
+def _write_response(writer: asyncio.StreamWriter, response: _Response, keep_alive: bool) -> None:
+    status, headers, body = response
+    reason = http.client.responses.get(status, "")
+    lines = [f"HTTP/1.1 {status} {reason}"]
+    headers = dict(headers, **{"Content-Length": str(len(body))})
+    headers["Connection"] = "keep-alive" if keep_alive else "close"
+    lines.extend(f"{name}: {value}" for name, value in headers.items())
+    writer.write(("\r\n".join(lines) + "\r\n\r\n").encode("latin-1"))
+    writer.write(body)
+
+
+async def _handle_connection(
+    service: ReconstructionService,
+    access: _Access,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter,
+) -> None:
+    try:
+        while True:
+            try:
+                request = await _read_request(reader)
+            except _BadRequest as exc:
+                _write_response(writer, _json(exc.status, {"error": str(exc)}), False)
+                await writer.drain()
+                break
+            if request is None:
+                break
+            response = _refuse(access, request) or await _dispatch(service, request)
+            _write_response(writer, response, request.keep_alive)
+            await writer.drain()
+            if not request.keep_alive:
+                break
+    except (ConnectionError, asyncio.IncompleteReadError, asyncio.LimitOverrunError):
+        pass
+    finally:
+        writer.close()
+        try:
+            await writer.wait_closed()
+        except ConnectionError:
+            pass
+
+
+async def serve(
+    service: ReconstructionService,
+    *,
+    socket_path: Optional[PathLike] = None,
+    port: int = 0,
+    token: Optional[str] = None,
+) -> asyncio.AbstractServer:
+    """Start serving ``service`` on a Unix socket, or else on ``127.0.0.1:port``.
+
+    TCP requires a bearer ``token`` (see :func:`new_token`) and only accepts
+    ``Host: 127.0.0.1:<port>`` or ``localhost:<port>``. On a Unix socket the
+    token is optional; the socket is bound under a ``077`` umask, so it is
+    never reachable by other users. The caller owns the returned server;
+    close it and ``await service.aclose()`` to shut down.
+    """
+    if socket_path is not None:
+        access = _Access(token)
+        handler = functools.partial(_handle_connection, service, access)
+        umask = os.umask(0o077)
+        try:
+            server = await asyncio.start_unix_server(handler, path=os.fspath(socket_path))
+        finally:
+            os.umask(umask)
+        os.chmod(socket_path, 0o600)
+    else:
+        if not token:
+            raise ValueError("serving on TCP requires a bearer token; see new_token()")
+        # Nothing passes the Host check until the bound port is known.
+        access = _Access(token, frozenset())
+        handler = functools.partial(_handle_connection, service, access)
+        server = await asyncio.start_server(handler, "127.0.0.1", port)
+        bound = server.sockets[0].getsockname()[1]
+        access.hosts = frozenset({f"127.0.0.1:{bound}", f"localhost:{bound}"})
+    service.start_sweeper()
+    return server
+
+
+class _UnixConnection(http.client.HTTPConnection):
+    def __init__(self, socket_path: str, timeout: float) -> None:
+        super().__init__("localhost", timeout=timeout)
+        self._socket_path = socket_path
+
+    def connect(self) -> None:
+        sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+        sock.settimeout(self.timeout)
+        sock.connect(self._socket_path)
+        self.sock = sock
+
+
+class ServiceClient:
+    """Blocking client for :func:`serve`; keeps one keep-alive connection.
+
+    Not thread-safe: give each thread its own client.
+    """
+
+    def __init__(
+        self,
+        socket_path: Optional[PathLike] = None,
+        *,
+        port: Optional[int] = None,
+        token: Optional[str] = None,
+        timeout: float = 30.0,
+    ) -> None:
+        if (socket_path is None) == (port is None):
+            raise ValueError("pass exactly one of socket_path and port")
+        self._auth = {"Authorization": f"Bearer {token}"} if token else {}
+        if socket_path is not None:
+            self._conn: http.client.HTTPConnection = _UnixConnection(
+                os.fspath(socket_path), timeout
+            )
+        else:
+            self._conn = http.client.HTTPConnection("127.0.0.1", port, timeout=timeout)
+
+    def _request(
+        self,
+        method: str,
+        target: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> Tuple[int, bytes]:
+        try:
+            self._conn.request(method, target, body=body, headers=dict(self._auth, **headers or {}))
+            response = self._conn.getresponse()
+            payload = response.read()
+        except BaseException:
+            self._conn.close()
+            raise
+        if response.will_close:
+            self._conn.close()
+        if response.status >= 400 and response.status != 416:
+            try:
+                message = json.loads(payload)["error"]
+            except (ValueError, KeyError, TypeError):
+                message = payload[:200].decode("utf-8", "replace")
+            raise ServiceError(response.status, message)
+        return response.status, payload
+
+    @staticmethod
+    def _path_query(path: PathLike) -> str:
+        return "?path=" + quote(os.fspath(Path(path).resolve()))
+
+    def load(
+        self,
+        path: PathLike,
+        shares: Iterable[Share],
+        *,
+        backend: str = BACKEND_PYCRYPTODOME,
+        threshold: Optional[int] = None,
+    ) -> str:
+        """Send the shares of ``path`` to the service; returns the key id (hex)."""
+        data = {
+            "path": os.fspath(Path(path).resolve()),
+            "shares": [
+                {"index": int(idx), "payload": base64.b64encode(payload).decode("ascii")}
+                for idx, payload in shares
+            ],
+            "backend": backend,
+            "threshold": threshold,
+        }
+        body = json.dumps(data).encode("utf-8")
+        _, payload = self._request("POST", "/keys", body, {"Content-Type": "application/json"})
+        return json.loads(payload)["key_id"]
+
+    def decrypt(self, path: PathLike, offset: int = 0, length: Optional[int] = None) -> bytes:
+        """Fetch the plaintext of ``path``, or ``length`` bytes from ``offset``."""
+        if length == 0:
+            return b""
+        if offset < 0:
+            spec: Optional[str] = f"bytes={offset}"
+        elif length is not None:
+            spec = f"bytes={offset}-{offset + length - 1}"
+        else:
+            spec = f"bytes={offset}-" if offset else None
+        headers = {"Range": spec} if spec else {}
+        status, payload = self._request("GET", "/decrypt" + self._path_query(path), None, headers)
+        return b"" if status == 416 else payload
+
+    def forget(self, path: PathLike) -> bool:
+        _, payload = self._request("DELETE", "/keys" + self._path_query(path))
+        return bool(json.loads(payload)["forgotten"])
+
+    def stats(self) -> Dict[str, Any]:
+        return json.loads(self._request("GET", "/stats")[1])
+
+    def close(self) -> None:
+        self._conn.close()
+
+    def __enter__(self) -> "ServiceClient":
+        return self
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.close()
+
+
+async def _serve_forever(args: argparse.Namespace) -> None:
+    service = ReconstructionService(
+        cache=KeyCache(args.max_keys, ttl=args.ttl or None),
+        workers=args.workers,
+        dictionaries=[Path(path).read_bytes() for path in args.dictionary],
+    )
+    token = None if args.socket else new_token()
+    server = await serve(service, socket_path=args.socket, port=args.port, token=token)
+    if args.socket:
+        print(f"Serving on {args.socket}", flush=True)
+    else:
+        print(f"Serving on http://127.0.0.1:{server.sockets[0].getsockname()[1]}", flush=True)
+        print(f"Bearer token: {token}", flush=True)
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        await service.aclose()
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(
+        prog="python -m aas_holo_shard.core.service",
+        description="Serve decrypts of AHS1/AHS2 containers from a TTL key cache.",
+    )
+    where = parser.add_mutually_exclusive_group(required=True)
+    where.add_argument("--socket", help="Unix socket path (created with mode 0600)")
+    where.add_argument(
+        "--port",
+        type=int,
+        help="localhost TCP port (0 picks a free one); requires the printed bearer token",
+    )
+    parser.add_argument(
+        "--ttl", type=float, default=DEFAULT_TTL, help="key lifetime in seconds (0 = no expiry)"
+    )
+    parser.add_argument("--max-keys", type=int, default=DEFAULT_MAX_KEYS, help="cache capacity")
+    parser.add_argument("--workers", type=int, help="worker threads for AES-GCM")
+    parser.add_argument(
+        "--dictionary",
+        action="append",
+        default=[],
+        help="preset compression dictionary file for AHZ1 containers (repeatable)",
+    )
+    args = parser.parse_args(argv)
+    try:
+        asyncio.run(_serve_forever(args))
+    except KeyboardInterrupt:
+        pass
+    except OSError as exc:
+        print(f"Error: {exc}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -3,7 +3,7 @@
 from __future__ import annotations
 
 from dataclasses import dataclass
-from typing import Iterable, List, Tuple
+from typing import Iterable, List, Optional, Set, Tuple, Union
 
 try:
     from Crypto.Cipher import AES  # nosec B413 - pycryptodome import
@@ -14,13 +14,25 @@ except Exception as exc:  # pragma: no cover - handled at import time
         "pycryptodome is required for aas_holo_shard.core.shamir"
     ) from exc
 
+from aas_holo_shard import instrumentation
+from aas_holo_shard.core import gf256
+
 MAGIC = b"AHS1"
 KEY_SIZE = 32
 HALF_KEY = 16
 NONCE_SIZE = 16
 TAG_SIZE = 16
+HEADER_SIZE = len(MAGIC) + NONCE_SIZE + TAG_SIZE
+
+BACKEND_PYCRYPTODOME = "pycryptodome"
+BACKEND_GF256 = "gf256"
+BACKENDS = (BACKEND_PYCRYPTODOME, BACKEND_GF256)
 
 Share = Tuple[int, bytes]
+# Anything supporting the buffer protocol works too, e.g. ``mmap.mmap``.
+Buffer = Union[bytes, bytearray, memoryview]
+
+_WIPE_BLOCK = bytes(1 << 16)
 
 
 class CryptoError(ValueError):
@@ -38,10 +50,21 @@ def _validate_thresholds(threshold: int, total: int) -> None:
         raise CryptoError("total shares must be <= 255 for Shamir indices")
 
 
-def _split_key(key: bytes, threshold: int, total: int) -> List[Share]:
+def _validate_backend(backend: str) -> None:
+    if backend not in BACKENDS:
+        raise CryptoError(f"unknown share backend '{backend}'; choose from {BACKENDS}")
+
+
+def _split_key(
+    key: bytes, threshold: int, total: int, backend: str = BACKEND_PYCRYPTODOME
+) -> List[Share]:
     if len(key) != KEY_SIZE:
         raise CryptoError(f"key must be {KEY_SIZE} bytes")
     _validate_thresholds(threshold, total)
+    _validate_backend(backend)
+
+    if backend == BACKEND_GF256:
+        return gf256.split_secret(key, threshold, total)
 
     shares_1 = Shamir.split(threshold, total, key[:HALF_KEY])
     shares_2 = Shamir.split(threshold, total, key[HALF_KEY:])
@@ -52,7 +75,8 @@ def _split_key(key: bytes, threshold: int, total: int) -> List[Share]:
     return combined
 
 
-def _combine_key(shares: Iterable[Share]) -> bytes:
+def _combine_key(shares: Iterable[Share], backend: str = BACKEND_PYCRYPTODOME) -> bytes:
+    _validate_backend(backend)
     share_list = list(shares)
     if not share_list:
         raise CryptoError("at least one share is required")
@@ -63,6 +87,12 @@ def _combine_key(shares: Iterable[Share]) -> bytes:
         if len(payload) != KEY_SIZE:
             raise CryptoError("share payload must be 32 bytes")
 
+    if backend == BACKEND_GF256:
+        try:
+            return gf256.combine_shares(share_list)
+        except ValueError as exc:
+            raise CryptoError(str(exc)) from exc
+
     shares_1 = [(idx, payload[:HALF_KEY]) for idx, payload in share_list]
     shares_2 = [(idx, payload[HALF_KEY:]) for idx, payload in share_list]
 
@@ -71,68 +101,304 @@ def _combine_key(shares: Iterable[Share]) -> bytes:
     return key_1 + key_2
 
 
-def _pack_encrypted(nonce: bytes, tag: bytes, ciphertext: bytes) -> bytes:
+def robust_combine_key(
+    shares: Iterable[Share], threshold: int, backend: str = BACKEND_PYCRYPTODOME
+) -> Tuple[bytes, List[int]]:
+    """Reconstruct the key from more than ``threshold`` shares, correcting bad ones.
+
+    Up to ``(len(shares) - threshold) // 2`` corrupted shares are corrected
+    with Berlekamp–Welch decoding (:mod:`aas_holo_shard.core.robust`) instead
+    of trying every ``threshold``-subset. Returns the key and the indices of
+    the faulty shares.
+    """
+    from aas_holo_shard.core import robust
+
+    _validate_backend(backend)
+    share_list = list(shares)
+    for idx, payload in share_list:
+        if not isinstance(idx, int):
+            raise CryptoError("share index must be an int")
+        if len(payload) != KEY_SIZE:
+            raise CryptoError("share payload must be 32 bytes")
+
+    try:
+        if backend == BACKEND_GF256:
+            return robust.combine_gf256(share_list, threshold)
+        key = b""
+        faulty: Set[int] = set()
+        for half in (slice(None, HALF_KEY), slice(HALF_KEY, None)):
+            points = [(idx, int.from_bytes(payload[half], "big")) for idx, payload in share_list]
+            poly, bad = robust.decode(robust.GF2_128, points, threshold)
+            key += poly[0].to_bytes(HALF_KEY, "big")
+            faulty.update(bad)
+    except robust.DecodingError as exc:
+        raise CryptoError(str(exc)) from exc
+    return key, sorted(faulty)
+
+
+def _recover_key(shares: Iterable[Share], backend: str, threshold: Optional[int]) -> bytes:
+    if threshold is None:
+        return _combine_key(shares, backend)
+    return robust_combine_key(shares, threshold, backend)[0]
+
+
+def _byte_view(data: Buffer) -> memoryview:
+    """Flat byte view of any buffer-protocol object, without copying it.
+
+    pycryptodome only takes ``bytes``, ``bytearray`` and ``memoryview``, so
+    e.g. an ``mmap`` has to be wrapped before it reaches the cipher.
+    """
+    return memoryview(data).cast("B")
+
+
+def _writable_view(out: Buffer, size: int) -> memoryview:
+    view = _byte_view(out)
+    if view.readonly:
+        raise CryptoError("output buffer is read-only")
+    if len(view) < size:
+        raise CryptoError(f"output buffer must hold {size} bytes, got {len(view)}")
+    return view[:size]
+
+
+def _wipe(view: memoryview) -> None:
+    """Zero ``view`` in place, in blocks so no payload-sized buffer is allocated."""
+    for start in range(0, len(view), len(_WIPE_BLOCK)):
+        end = min(start + len(_WIPE_BLOCK), len(view))
+        view[start:end] = _WIPE_BLOCK[: end - start]
+
+
+def _pack_encrypted(nonce: bytes, tag: bytes, ciphertext: Buffer) -> bytes:
     if len(nonce) != NONCE_SIZE:
         raise CryptoError(f"nonce must be {NONCE_SIZE} bytes")
     if len(tag) != TAG_SIZE:
         raise CryptoError(f"tag must be {TAG_SIZE} bytes")
-    return MAGIC + nonce + tag + ciphertext
+    return b"".join((MAGIC, nonce, tag, ciphertext))
 
 
-def _unpack_encrypted(blob: bytes) -> tuple[bytes, bytes, bytes]:
-    header_len = len(MAGIC) + NONCE_SIZE + TAG_SIZE
-    if len(blob) < header_len:
+def _unpack_encrypted(blob: Buffer) -> tuple[bytes, bytes, memoryview]:
+    """Split an AHS1 blob; the ciphertext is a view into ``blob``, not a copy."""
+    view = _byte_view(blob)
+    if len(view) < HEADER_SIZE:
         raise CryptoError("encrypted payload is too short")
-    if not blob.startswith(MAGIC):
+    if view[: len(MAGIC)] != MAGIC:
         raise CryptoError("encrypted payload missing magic header")
 
     offset = len(MAGIC)
-    nonce = blob[offset : offset + NONCE_SIZE]
-    offset += NONCE_SIZE
-    tag = blob[offset : offset + TAG_SIZE]
-    offset += TAG_SIZE
-    ciphertext = blob[offset:]
-    return nonce, tag, ciphertext
+    nonce = bytes(view[offset : offset + NONCE_SIZE])
+    tag = bytes(view[offset + NONCE_SIZE : HEADER_SIZE])
+    return nonce, tag, view[HEADER_SIZE:]
+
+
+def encrypted_size(plaintext_size: int) -> int:
+    """Length of the AHS1 blob that holds ``plaintext_size`` bytes."""
+    return HEADER_SIZE + plaintext_size
 
 
 def encrypt_and_split(
-    aas_bytes: bytes,
+    aas_bytes: Buffer,
     *,
     threshold: int,
     total: int,
+    backend: str = BACKEND_PYCRYPTODOME,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+    dictionary: Optional[bytes] = None,
 ) -> tuple[bytes, List[Share]]:
-    """Encrypt AAS bytes and split the encryption key into shares."""
-    _validate_thresholds(threshold, total)
+    """Encrypt AAS bytes and split the encryption key into shares.
 
-    key = get_random_bytes(KEY_SIZE)
-    nonce = get_random_bytes(NONCE_SIZE)
-    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
-    ciphertext, tag = cipher.encrypt_and_digest(aas_bytes)
+    ``backend`` selects the secret-sharing engine: ``"pycryptodome"`` splits
+    the key as two 16-byte halves over GF(2^128), ``"gf256"`` shares it
+    byte-wise in one pass. Reconstruction must use the same backend.
 
-    encrypted = _pack_encrypted(cipher.nonce, tag, ciphertext)
-    shares = _split_key(key, threshold, total)
+    ``compression`` (``"zlib"``, ``"lzma"`` or ``"zstd"``, see
+    :mod:`aas_holo_shard.core.compress`) compresses the payload at ``level``,
+    optionally with a preset ``dictionary``, into an ``AHZ1`` container.
+    Payloads that do not shrink are stored as plain ``AHS1``.
+    """
+    _validate_thresholds(threshold, total)
+    _validate_backend(backend)
+    if compression is None and (level is not None or dictionary is not None):
+        raise CryptoError("level and dictionary require a compression codec")
+
+    with instrumentation.span(
+        "crypto.encrypt_and_split", bytes=len(aas_bytes), threshold=threshold, total=total
+    ):
+        key = get_random_bytes(KEY_SIZE)
+        with instrumentation.span("crypto.aes_gcm", bytes=len(aas_bytes)):
+            encrypted = None
+            if compression is not None:
+                from aas_holo_shard.core import compress
+
+                encrypted = compress._encrypt_with_key(
+                    aas_bytes, key, compression, level=level, dictionary=dictionary
+                )
+            if encrypted is None:
+                encrypted = _encrypt_with_key(aas_bytes, key)
+        with instrumentation.span("crypto.split_key", backend=backend):
+            shares = _split_key(key, threshold, total, backend)
+    instrumentation.count("crypto.bytes", len(aas_bytes), op="encrypt")
+    instrumentation.count("shares.created", total)
     return encrypted, shares
 
 
 def reconstruct_and_decrypt(
-    encrypted: bytes, shares: Iterable[Share]
+    encrypted: Buffer,
+    shares: Iterable[Share],
+    *,
+    backend: str = BACKEND_PYCRYPTODOME,
+    threshold: Optional[int] = None,
+    dictionaries: Optional[Iterable[bytes]] = None,
 ) -> bytes:
-    """Reconstruct the encryption key from shares and decrypt payload."""
-    key = _combine_key(shares)
-    nonce, tag, ciphertext = _unpack_encrypted(encrypted)
+    """Reconstruct the encryption key from shares and decrypt payload.
+
+    Accepts single-stream ``AHS1`` blobs, chunked ``AHS2`` containers and
+    compressed ``AHZ1`` containers, which are decompressed after the tag
+    check (pass the preset dictionary in ``dictionaries`` if one was used).
+    Given ``threshold`` and more shares than that, corrupted shares are
+    corrected (see :func:`robust_combine_key`) and the GCM tag is checked once,
+    against the decoded key.
+    """
+    share_list = list(shares)
+    with instrumentation.span("crypto.reconstruct_and_decrypt", bytes=len(encrypted)):
+        with instrumentation.span("crypto.combine_key", backend=backend, shares=len(share_list)):
+            key = _recover_key(share_list, backend, threshold)
+        with instrumentation.span("crypto.aes_gcm", bytes=len(encrypted)):
+            plaintext = _decrypt_with_key(encrypted, key, dictionaries)
+    instrumentation.count("crypto.bytes", len(plaintext), op="decrypt")
+    instrumentation.count("shares.processed", len(share_list))
+    return plaintext
+
+
+def encrypt_into(
+    payload: Buffer,
+    out: Buffer,
+    *,
+    threshold: int,
+    total: int,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> List[Share]:
+    """Encrypt ``payload`` into the writable buffer ``out`` and split the key.
+
+    Both may be any buffer-protocol objects (``bytearray``, ``memoryview``,
+    ``mmap``, ...) that do not overlap. The AHS1 blob fills the first
+    :func:`encrypted_size` bytes of ``out``, and the ciphertext is written
+    there directly instead of being built and then copied behind the header.
+    """
+    _validate_thresholds(threshold, total)
+    _validate_backend(backend)
+    source = _byte_view(payload)
+    target = _writable_view(out, encrypted_size(len(source)))
+
+    with instrumentation.span(
+        "crypto.encrypt_and_split", bytes=len(source), threshold=threshold, total=total
+    ):
+        key = get_random_bytes(KEY_SIZE)
+        nonce = get_random_bytes(NONCE_SIZE)
+        with instrumentation.span("crypto.aes_gcm", bytes=len(source)):
+            cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+            cipher.encrypt(source, output=target[HEADER_SIZE:])
+            target[:HEADER_SIZE] = MAGIC + nonce + cipher.digest()
+        with instrumentation.span("crypto.split_key", backend=backend):
+            shares = _split_key(key, threshold, total, backend)
+    instrumentation.count("crypto.bytes", len(source), op="encrypt")
+    instrumentation.count("shares.created", total)
+    return shares
+
+
+def decrypt_into(
+    encrypted: Buffer,
+    out: Buffer,
+    shares: Iterable[Share],
+    *,
+    backend: str = BACKEND_PYCRYPTODOME,
+    threshold: Optional[int] = None,
+    dictionaries: Optional[Iterable[bytes]] = None,
+) -> int:
+    """Reconstruct the key and decrypt ``encrypted`` into the writable buffer ``out``.
+
+    Accepts ``AHS1`` and ``AHS2`` containers in any buffer-protocol object, so
+    a memory-mapped file is decrypted without being read into memory first.
+    Returns the plaintext length. If the tag check fails, the plaintext already
+    written to ``out`` is zeroed before :class:`CryptoError` is raised.
+    ``AHZ1`` containers are accepted too, but decompress through a temporary.
+    """
+    share_list = list(shares)
+    source = _byte_view(encrypted)
+    with instrumentation.span("crypto.reconstruct_and_decrypt", bytes=len(source)):
+        with instrumentation.span("crypto.combine_key", backend=backend, shares=len(share_list)):
+            key = _recover_key(share_list, backend, threshold)
+        with instrumentation.span("crypto.aes_gcm", bytes=len(source)):
+            size = _decrypt_into_with_key(source, out, key, dictionaries)
+    instrumentation.count("crypto.bytes", size, op="decrypt")
+    instrumentation.count("shares.processed", len(share_list))
+    return size
+
+
+def _encrypt_with_key(payload: Buffer, key: bytes) -> bytes:
+    nonce = get_random_bytes(NONCE_SIZE)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    ciphertext, tag = cipher.encrypt_and_digest(_byte_view(payload))
+    return _pack_encrypted(nonce, tag, ciphertext)
+
+
+def _decrypt_with_key(
+    encrypted: Buffer, key: bytes, dictionaries: Optional[Iterable[bytes]] = None
+) -> bytes:
+    view = _byte_view(encrypted)
+    if view[: len(MAGIC)] == b"AHS2":
+        from aas_holo_shard.core import chunked
+
+        return chunked.decrypt_chunked(view, key)
+    if view[: len(MAGIC)] == b"AHZ1":
+        from aas_holo_shard.core import compress
+
+        return compress._decrypt_with_key(view, key, dictionaries)
+    nonce, tag, ciphertext = _unpack_encrypted(view)
     cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
     return cipher.decrypt_and_verify(ciphertext, tag)
 
 
+def _decrypt_into_with_key(
+    source: memoryview, out: Buffer, key: bytes, dictionaries: Optional[Iterable[bytes]]
+) -> int:
+    if source[: len(MAGIC)] == b"AHS2":
+        from aas_holo_shard.core import chunked
+
+        return chunked.ChunkedReader(source, key).read_all_into(out)
+    if source[: len(MAGIC)] == b"AHZ1":
+        from aas_holo_shard.core import compress
+
+        plaintext = compress._decrypt_with_key(source, key, dictionaries)
+        _writable_view(out, len(plaintext))[:] = plaintext
+        return len(plaintext)
+    nonce, tag, ciphertext = _unpack_encrypted(source)
+    target = _writable_view(out, len(ciphertext))
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    try:
+        cipher.decrypt_and_verify(ciphertext, tag, output=target)
+    except ValueError as exc:
+        _wipe(target)
+        raise CryptoError("MAC check failed") from exc
+    return len(target)
+
+
 @dataclass(frozen=True)
 class EncryptedBundle:
-    """Container for encrypted bytes plus the share list."""
+    """Container for encrypted bytes plus the share list.
+
+    Envelope bundles (see :mod:`aas_holo_shard.core.envelope`) also carry the
+    wrapped data key; their shares reconstruct the key-encryption key.
+    """
 
     encrypted: bytes
     shares: List[Share]
+    wrapped_key: Optional[bytes] = None
 
     def to_dict(self) -> dict:
-        return {
+        data = {
             "encrypted": self.encrypted,
             "shares": self.shares,
         }
+        if self.wrapped_key is not None:
+            data["wrapped_key"] = self.wrapped_key
+        return data
@@ -0,0 +1,336 @@
+"""Streaming AHS1 encryption for payloads that do not fit in memory."""
+
+from __future__ import annotations
+
+import io
+import os
+import tempfile
+from contextlib import contextmanager
+from pathlib import Path
+from typing import BinaryIO, Callable, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from aas_holo_shard.core.shamir import (
+    AES,
+    BACKEND_PYCRYPTODOME,
+    HEADER_SIZE,
+    KEY_SIZE,
+    MAGIC,
+    NONCE_SIZE,
+    TAG_SIZE,
+    Buffer,
+    CryptoError,
+    Share,
+    _byte_view,
+    _recover_key,
+    _split_key,
+    _validate_backend,
+    _validate_thresholds,
+    get_random_bytes,
+)
+
+DEFAULT_CHUNK_SIZE = 1 << 20
+
+
+def _check_chunk_size(chunk_size: int) -> None:
+    if chunk_size < 1:
+        raise CryptoError("chunk size must be >= 1")
+
+
+def _pump(cipher_op: Callable[..., object], src: BinaryIO, dst: BinaryIO, chunk_size: int) -> int:
+    """Feed ``src`` through ``cipher_op`` into ``dst`` using two fixed buffers."""
+    in_buf = bytearray(chunk_size)
+    out_buf = bytearray(chunk_size)
+    in_view = memoryview(in_buf)
+    out_view = memoryview(out_buf)
+    total = 0
+    while True:
+        read = src.readinto(in_view)
+        if not read:
+            return total
+        cipher_op(in_view[:read], output=out_view[:read])
+        dst.write(out_view[:read])
+        total += read
+
+
+def _read_chunks(src: BinaryIO, chunk_size: int) -> Iterator[memoryview]:
+    buffer = memoryview(bytearray(chunk_size))
+    while True:
+        read = src.readinto(buffer)
+        if not read:
+            return
+        yield buffer[:read]
+
+
+def encrypt_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    *,
+    threshold: int,
+    total: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: str = BACKEND_PYCRYPTODOME,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+    dictionary: Optional[bytes] = None,
+) -> List[Share]:
+    """Encrypt ``src`` into ``dst`` in AHS1 framing and split the key into shares.
+
+    Memory use is bounded by ``chunk_size``. AHS1 stores the GCM tag in front
+    of the ciphertext, so ``dst`` must be seekable: a placeholder tag is
+    written first and patched once the stream has been consumed.
+    ``compression`` writes an ``AHZ1`` container instead, compressing each
+    chunk on the way (see :mod:`aas_holo_shard.core.compress`).
+    """
+    _validate_thresholds(threshold, total)
+    _validate_backend(backend)
+    _check_chunk_size(chunk_size)
+    if not dst.seekable():
+        raise CryptoError("destination stream must be seekable")
+    if compression is None and (level is not None or dictionary is not None):
+        raise CryptoError("level and dictionary require a compression codec")
+
+    key = get_random_bytes(KEY_SIZE)
+    nonce = get_random_bytes(NONCE_SIZE)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+
+    header_at = dst.tell()
+    if compression is None:
+        aad = MAGIC
+        dst.write(MAGIC + nonce + bytes(TAG_SIZE))
+        _pump(cipher.encrypt, src, dst, chunk_size)
+    else:
+        from aas_holo_shard.core import compress
+
+        aad, compressor = compress._compressor(compression, level, dictionary)
+        cipher.update(aad)
+        dst.write(aad + nonce + bytes(TAG_SIZE))
+        for chunk in _read_chunks(src, chunk_size):
+            dst.write(cipher.encrypt(compressor.compress(chunk)))
+        dst.write(cipher.encrypt(compressor.flush()))
+    end = dst.tell()
+
+    dst.seek(header_at + len(aad) + NONCE_SIZE)
+    dst.write(cipher.digest())
+    dst.seek(end)
+    return _split_key(key, threshold, total, backend)
+
+
+def _decompress_stream(
+    cipher,
+    decompressor,
+    src: BinaryIO,
+    dst: BinaryIO,
+    chunk_size: int,
+    failure: Optional[Exception] = None,
+) -> Tuple[int, Optional[Exception]]:
+    """Decrypt and decompress ``src`` into ``dst``.
+
+    A decompression error (or a ``failure`` passed in for an unusable header)
+    stops the output but not the decryption, so that the caller can check
+    the tag first and report tampering as such.
+    """
+    written = 0
+    for chunk in _read_chunks(src, chunk_size):
+        compressed = cipher.decrypt(chunk)
+        if failure is None:
+            try:
+                plaintext = decompressor.decompress(compressed)
+            except Exception as exc:  # noqa: BLE001 - zlib.error, LZMAError, ZstdError...
+                failure = exc
+                continue
+            dst.write(plaintext)
+            written += len(plaintext)
+    if failure is None and not getattr(decompressor, "eof", True):
+        failure = CryptoError("compressed payload is truncated")
+    return written, failure
+
+
+def decrypt_stream(
+    src: BinaryIO,
+    dst: BinaryIO,
+    shares: Iterable[Share],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: str = BACKEND_PYCRYPTODOME,
+    threshold: Optional[int] = None,
+    dictionaries: Optional[Iterable[bytes]] = None,
+) -> int:
+    """Decrypt an AHS1 or AHZ1 stream into ``dst`` and verify the tag at the end.
+
+    Plaintext is written before the tag can be checked. If verification fails
+    a :class:`CryptoError` is raised and everything written to ``dst`` must be
+    discarded; :func:`reconstruct_and_decrypt_file` does this for you.
+    ``threshold`` enables correcting faulty shares as in
+    :func:`~aas_holo_shard.core.shamir.reconstruct_and_decrypt`. Compressed
+    ``AHZ1`` streams are detected and decompressed on the fly; pass their
+    preset dictionary in ``dictionaries``.
+    """
+    _check_chunk_size(chunk_size)
+    key = _recover_key(shares, backend, threshold)
+
+    header = src.read(HEADER_SIZE)
+    if len(header) < HEADER_SIZE:
+        raise CryptoError("encrypted payload is too short")
+    decompressor = None
+    failure: Optional[Exception] = None
+    if header.startswith(b"AHZ1"):
+        from aas_holo_shard.core import compress
+
+        header += src.read(compress.HEADER_SIZE - HEADER_SIZE)
+        if len(header) < compress.HEADER_SIZE:
+            raise CryptoError("encrypted payload is too short")
+        try:
+            decompressor = compress._decompressor(header, dictionaries)
+        except CryptoError as exc:
+            failure = exc
+        aad = header[: compress.HEADER_SIZE - NONCE_SIZE - TAG_SIZE]
+    elif header.startswith(MAGIC):
+        aad = MAGIC
+    else:
+        raise CryptoError("encrypted payload missing magic header")
+    nonce = header[len(aad) : len(aad) + NONCE_SIZE]
+    tag = header[len(aad) + NONCE_SIZE :]
+
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    if aad == MAGIC:
+        written = _pump(cipher.decrypt, src, dst, chunk_size)
+    else:
+        cipher.update(aad)
+        written, failure = _decompress_stream(cipher, decompressor, src, dst, chunk_size, failure)
+    try:
+        cipher.verify(tag)
+    except ValueError as exc:
+        raise CryptoError("MAC check failed") from exc
+    if isinstance(failure, CryptoError):
+        raise failure
+    if failure is not None:
+        raise CryptoError(f"corrupt compressed payload: {failure}") from failure
+    return written
+
+
+def _write_vectored(dst: BinaryIO, parts: Sequence[Buffer]) -> None:
+    """Write ``parts`` back to back without joining them first.
+
+    Uses ``os.writev`` on the underlying descriptor where there is one;
+    otherwise (in-memory streams, Windows) falls back to one write per part.
+    """
+    try:
+        fd = dst.fileno()
+    except (AttributeError, OSError, io.UnsupportedOperation):
+        fd = -1
+    if fd < 0 or not hasattr(os, "writev"):
+        for part in parts:
+            dst.write(part)
+        return
+
+    dst.flush()
+    views = [view for view in map(_byte_view, parts) if len(view)]
+    while views:
+        written = os.writev(fd, views)
+        while views and written >= len(views[0]):
+            written -= len(views.pop(0))
+        if views:
+            views[0] = views[0][written:]
+    if dst.seekable():
+        dst.seek(0, io.SEEK_CUR)  # resync a buffered file's cached position
+
+
+@contextmanager
+def _atomic_output(path: Path) -> Iterator[BinaryIO]:
+    """Write to a temporary sibling of ``path`` and rename it on success."""
+    fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=f".{path.name}.", suffix=".tmp")
+    try:
+        with os.fdopen(fd, "w+b") as handle:
+            yield handle
+            handle.flush()
+            os.fsync(handle.fileno())
+        os.replace(tmp_name, path)
+    except BaseException:
+        try:
+            os.unlink(tmp_name)
+        except FileNotFoundError:  # pragma: no cover - already cleaned up
+            pass
+        raise
+
+
+def encrypt_file_and_split(
+    input_path: Union[str, Path],
+    output_path: Union[str, Path],
+    *,
+    threshold: int,
+    total: int,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: str = BACKEND_PYCRYPTODOME,
+    compression: Optional[str] = None,
+    level: Optional[int] = None,
+    dictionary: Optional[bytes] = None,
+) -> List[Share]:
+    """Encrypt a file to an AHS1 (or compressed AHZ1) file with bounded memory."""
+    with open(input_path, "rb") as src, _atomic_output(Path(output_path)) as dst:
+        return encrypt_stream(
+            src,
+            dst,
+            threshold=threshold,
+            total=total,
+            chunk_size=chunk_size,
+            backend=backend,
+            compression=compression,
+            level=level,
+            dictionary=dictionary,
+        )
+
+
+def encrypt_buffer_and_split(
+    payload: Buffer,
+    output: Union[str, Path, BinaryIO],
+    *,
+    threshold: int,
+    total: int,
+    backend: str = BACKEND_PYCRYPTODOME,
+) -> List[Share]:
+    """Encrypt an in-memory payload to an AHS1 file or stream and split the key.
+
+    ``payload`` may be any buffer-protocol object. The ciphertext buffer is the
+    only payload-sized allocation: header and body are written with a single
+    vectored write instead of being concatenated. A path ``output`` only
+    appears once it is complete.
+    """
+    _validate_thresholds(threshold, total)
+    _validate_backend(backend)
+    source = _byte_view(payload)
+    key = get_random_bytes(KEY_SIZE)
+    nonce = get_random_bytes(NONCE_SIZE)
+    cipher = AES.new(key, AES.MODE_GCM, nonce=nonce)
+    ciphertext = bytearray(len(source))
+    cipher.encrypt(source, output=ciphertext)
+    parts = (MAGIC, nonce, cipher.digest(), ciphertext)
+
+    if isinstance(output, (str, os.PathLike)):
+        with _atomic_output(Path(output)) as dst:
+            _write_vectored(dst, parts)
+    else:
+        _write_vectored(output, parts)
+    return _split_key(key, threshold, total, backend)
+
+
+def reconstruct_and_decrypt_file(
+    encrypted_path: Union[str, Path],
+    output_path: Union[str, Path],
+    shares: Iterable[Share],
+    *,
+    chunk_size: int = DEFAULT_CHUNK_SIZE,
+    backend: str = BACKEND_PYCRYPTODOME,
+    threshold: Optional[int] = None,
+    dictionaries: Optional[Iterable[bytes]] = None,
+) -> int:
+    """Decrypt an AHS1/AHZ1 file; ``output_path`` only appears once the tag verifies."""
+    with open(encrypted_path, "rb") as src, _atomic_output(Path(output_path)) as dst:
+        return decrypt_stream(
+            src,
+            dst,
+            shares,
+            chunk_size=chunk_size,
+            backend=backend,
+            threshold=threshold,
+            dictionaries=dictionaries,
+        )
@@ -0,0 +1,232 @@
+"""Lightweight timing spans and counters for the package's hot paths.
+
+Instrumentation is off until a sink is registered with :func:`add_sink`.
+While it is off, :func:`span` returns a shared no-op context manager and
+:func:`count` returns straight away, so instrumented code pays for one global
+lookup and nothing else.
+
+A sink is any callable taking an :class:`Event`. Three are provided:
+
+* :class:`Recorder` aggregates totals in memory (handy in tests and shells),
+* :class:`LoggingSink` writes one stdlib ``logging`` record per event,
+* :class:`OpenTelemetrySink` forwards spans to an OpenTelemetry tracer and
+  counters to a meter (``opentelemetry-api`` is imported lazily).
+
+Span names used by the package: ``aas.split``, ``aas.combine``, ``aas.parse``,
+``aas.scan``, ``aas.search``, ``aas.shard``, ``aas.recover``, ``aas.write``,
+``shard.recover_secret``, ``crypto.encrypt_and_split``,
+``crypto.reconstruct_and_decrypt``, ``crypto.aes_gcm``, ``crypto.split_key``,
+``crypto.combine_key``, ``aasx.load_basyx``, ``ipfs.store_shares``,
+``ipfs.fetch_shares``, ``ipfs.request``, ``service.load_key`` and
+``service.decrypt``. Counters: ``shares.created``,
+``shares.processed``, ``aas.files_read``, ``crypto.bytes``,
+``ipfs.bytes_sent``, ``ipfs.bytes_received`` and ``ipfs.cache_hits``.
+"""
+
+from __future__ import annotations
+
+import threading
+import time
+from typing import TYPE_CHECKING, Any, Callable, Dict, List, NamedTuple, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    import logging
+
+SPAN = "span"
+COUNT = "count"
+
+
+class Event(NamedTuple):
+    """One finished span (``value`` is seconds) or counter increment."""
+
+    kind: str
+    name: str
+    value: float
+    attributes: Dict[str, Any]
+    start_ns: int = 0
+    error: Optional[str] = None
+
+
+Sink = Callable[[Event], None]
+
+_sinks: Tuple[Sink, ...] = ()
+_sinks_lock = threading.Lock()
+
+
+def add_sink(sink: Sink) -> Sink:
+    """Register ``sink`` and enable instrumentation; returns the sink."""
+    global _sinks
+    with _sinks_lock:
+        _sinks = _sinks + (sink,)
+    return sink
+
+
+def remove_sink(sink: Sink) -> None:
+    global _sinks
+    with _sinks_lock:
+        _sinks = tuple(registered for registered in _sinks if registered is not sink)
+
+
+def clear_sinks() -> None:
+    global _sinks
+    with _sinks_lock:
+        _sinks = ()
+
+
+def enabled() -> bool:
+    return bool(_sinks)
+
+
+def _emit(event: Event) -> None:
+    for sink in _sinks:
+        try:
+            sink(event)
+        except Exception:  # pragma: no cover - a broken sink must not break callers
+            import logging
+
+            logging.getLogger(__name__).exception("instrumentation sink failed")
+
+
+class _NoopSpan:
+    __slots__ = ()
+
+    def __enter__(self) -> "_NoopSpan":
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        return None
+
+    def set(self, key: str, value: Any) -> None:
+        return None
+
+
+_NOOP_SPAN = _NoopSpan()
+
+
+class _Span:
+    __slots__ = ("name", "attributes", "_start", "_start_ns")
+
+    def __init__(self, name: str, attributes: Dict[str, Any]) -> None:
+        self.name = name
+        self.attributes = attributes
+
+    def __enter__(self) -> "_Span":
+        self._start_ns = time.time_ns()
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        duration = time.perf_counter() - self._start
+        error = exc_type.__name__ if exc_type is not None else None
+        _emit(Event(SPAN, self.name, duration, self.attributes, self._start_ns, error))
+
+    def set(self, key: str, value: Any) -> None:
+        """Attach an attribute discovered while the span is running."""
+        self.attributes[key] = value
+
+
+def span(name: str, **attributes: Any):
+    """Time a block: ``with span("aas.parse", file=path) as s: ...``."""
+    if not _sinks:
+        return _NOOP_SPAN
+    return _Span(name, attributes)
+
+
+def count(name: str, value: float = 1, **attributes: Any) -> None:
+    """Add ``value`` to the counter ``name``."""
+    if not _sinks:
+        return
+    _emit(Event(COUNT, name, value, attributes, time.time_ns()))
+
+
+class Recorder:
+    """In-memory sink keeping span totals, counter totals and raw events."""
+
+    def __init__(self, keep_events: bool = True) -> None:
+        self.keep_events = keep_events
+        self.events: List[Event] = []
+        self.span_seconds: Dict[str, float] = {}
+        self.span_calls: Dict[str, int] = {}
+        self.counters: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        with self._lock:
+            if self.keep_events:
+                self.events.append(event)
+            if event.kind == SPAN:
+                self.span_seconds[event.name] = self.span_seconds.get(event.name, 0.0) + event.value
+                self.span_calls[event.name] = self.span_calls.get(event.name, 0) + 1
+            else:
+                self.counters[event.name] = self.counters.get(event.name, 0) + event.value
+
+    def __enter__(self) -> "Recorder":
+        return add_sink(self)
+
+    def __exit__(self, exc_type, exc, tb) -> None:
+        remove_sink(self)
+
+
+class LoggingSink:
+    """Sink that logs each event, e.g. ``span aas.parse 3.214ms file=a.json``."""
+
+    def __init__(self, logger: Optional[logging.Logger] = None, level: Optional[int] = None):
+        import logging
+
+        self.logger = logger or logging.getLogger("aas_holo_shard.metrics")
+        self.level = logging.DEBUG if level is None else level
+
+    def __call__(self, event: Event) -> None:
+        if not self.logger.isEnabledFor(self.level):
+            return
+        attrs = " ".join(f"{key}={value}" for key, value in event.attributes.items())
+        if event.kind == SPAN:
+            status = f" error={event.error}" if event.error else ""
+            self.logger.log(
+                self.level, "span %s %.3fms %s%s", event.name, event.value * 1e3, attrs, status
+            )
+        else:
+            self.logger.log(self.level, "count %s +%s %s", event.name, event.value, attrs)
+
+
+def _otel_value(value: Any) -> Any:
+    return value if isinstance(value, (bool, int, float, str)) else str(value)
+
+
+class OpenTelemetrySink:
+    """Forward spans to an OpenTelemetry tracer and counters to a meter.
+
+    Spans are exported after they finish with their real start and end times;
+    they are not made current, so they appear as siblings of the caller's span.
+    """
+
+    def __init__(self, tracer: Any = None, meter: Any = None) -> None:
+        if tracer is None or meter is None:
+            try:
+                from opentelemetry import metrics, trace
+            except ImportError as exc:  # pragma: no cover - optional dependency
+                raise RuntimeError(
+                    "opentelemetry-api is required unless a tracer and meter are passed"
+                ) from exc
+            tracer = tracer or trace.get_tracer("aas_holo_shard")
+            meter = meter or metrics.get_meter("aas_holo_shard")
+        self.tracer = tracer
+        self.meter = meter
+        self._counters: Dict[str, Any] = {}
+        self._lock = threading.Lock()
+
+    def __call__(self, event: Event) -> None:
+        attributes = {key: _otel_value(value) for key, value in event.attributes.items()}
+        if event.kind == SPAN:
+            if event.error:
+                attributes["error.type"] = event.error
+            otel_span = self.tracer.start_span(
+                event.name, start_time=event.start_ns, attributes=attributes
+            )
+            otel_span.end(end_time=event.start_ns + int(event.value * 1e9))
+            return
+        with self._lock:
+            counter = self._counters.get(event.name)
+            if counter is None:
+                counter = self._counters[event.name] = self.meter.create_counter(event.name)
+        counter.add(event.value, attributes)
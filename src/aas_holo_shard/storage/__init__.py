@@ -1,9 +1,83 @@
 """Storage backends for share payloads."""
 
-from aas_holo_shard.storage.ipfs import (
-    IPFSUnavailable,
-    fetch_shares,
-    store_shares,
+from typing import TYPE_CHECKING
+
+from aas_holo_shard._lazy import attach
+
+__getattr__, __dir__ = attach(
+    __name__,
+    {
+        "aas_holo_shard.storage.async_ipfs": [
+            "AsyncIPFSClient",
+            "QuorumResult",
+            "fetch_quorum_async",
+            "fetch_shares_async",
+            "store_shares_async",
+        ],
+        "aas_holo_shard.storage.cache": [
+            "CacheStats",
+            "DiskCache",
+            "MemoryCache",
+            "ShareCache",
+        ],
+        "aas_holo_shard.storage.ipfs": [
+            "IPFSUnavailable",
+            "fetch_from_pack",
+            "fetch_shares",
+            "store_pack",
+            "store_shares",
+        ],
+        "aas_holo_shard.storage.wire": [
+            "SharePack",
+            "ShareFormatError",
+            "build_pack",
+        ],
+    },
 )
 
-__all__ = ["IPFSUnavailable", "fetch_shares", "store_shares"]
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.storage.async_ipfs import (
+        AsyncIPFSClient,
+        QuorumResult,
+        fetch_quorum_async,
+        fetch_shares_async,
+        store_shares_async,
+    )
+    from aas_holo_shard.storage.cache import (
+        CacheStats,
+        DiskCache,
+        MemoryCache,
+        ShareCache,
+    )
+    from aas_holo_shard.storage.ipfs import (
+        IPFSUnavailable,
+        fetch_from_pack,
+        fetch_shares,
+        store_pack,
+        store_shares,
+    )
+    from aas_holo_shard.storage.wire import (
+        SharePack,
+        ShareFormatError,
+        build_pack,
+    )
+
+__all__ = [
+    "AsyncIPFSClient",
+    "CacheStats",
+    "DiskCache",
+    "IPFSUnavailable",
+    "MemoryCache",
+    "QuorumResult",
+    "ShareCache",
+    "ShareFormatError",
+    "SharePack",
+    "build_pack",
+    "fetch_from_pack",
+    "fetch_quorum_async",
+    "fetch_shares",
+    "fetch_shares_async",
+    "store_pack",
+    "store_shares",
+    "store_shares_async",
+]
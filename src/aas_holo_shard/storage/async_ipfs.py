@@ -0,0 +1,411 @@
+"""Concurrent asyncio access to the IPFS HTTP API for share payloads.
+
+Requests go straight to the daemon's ``/api/v0`` endpoints through a pool of
+keep-alive :mod:`http.client` connections, so no extra dependency is needed.
+Blocking socket work runs on a dedicated thread pool sized to the concurrency
+limit, while an :class:`asyncio.Semaphore` bounds in-flight requests. Failed
+requests are retried with exponential backoff and every attempt has its own
+timeout.
+"""
+
+from __future__ import annotations
+
+import asyncio
+import collections
+import http.client
+import json
+import queue
+import secrets
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+from urllib.parse import quote, urlsplit
+
+from aas_holo_shard import instrumentation
+from aas_holo_shard.storage import wire
+from aas_holo_shard.storage.ipfs import (
+    WIRE_JSON,
+    IPFSUnavailable,
+    deserialize_share,
+    serialize_share,
+)
+
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.core.shamir import Share
+
+DEFAULT_API_URL = "http://127.0.0.1:5001"
+LATENCY_WINDOW = 256
+
+
+class IPFSRequestError(IPFSUnavailable):
+    """Raised when the IPFS API answers with an HTTP error status."""
+
+    def __init__(self, status: int, body: bytes) -> None:
+        super().__init__(f"IPFS API returned HTTP {status}: {body[:200]!r}")
+        self.status = status
+
+
+class HTTPConnectionPool:
+    """Thread-safe pool of keep-alive connections to a single HTTP host."""
+
+    def __init__(self, base_url: str = DEFAULT_API_URL, *, size: int = 8, timeout: float = 30.0):
+        parts = urlsplit(base_url)
+        if parts.scheme not in ("http", "https") or not parts.hostname:
+            raise ValueError(f"unsupported IPFS API URL: {base_url!r}")
+        self._https = parts.scheme == "https"
+        self._host = parts.hostname
+        self._port = parts.port
+        self._prefix = parts.path.rstrip("/")
+        self._timeout = timeout
+        self._idle: "queue.LifoQueue[http.client.HTTPConnection]" = queue.LifoQueue(maxsize=size)
+        self._lock = threading.Lock()
+        self.created = 0
+
+    def _connect(self) -> http.client.HTTPConnection:
+        with self._lock:
+            self.created += 1
+        if self._https:
+            return http.client.HTTPSConnection(self._host, self._port, timeout=self._timeout)
+        return http.client.HTTPConnection(self._host, self._port, timeout=self._timeout)
+
+    def _release(self, conn: http.client.HTTPConnection) -> None:
+        try:
+            self._idle.put_nowait(conn)
+        except queue.Full:
+            conn.close()
+
+    def request(
+        self,
+        method: str,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> bytes:
+        """Send one request and return the response body (blocking)."""
+        try:
+            conn = self._idle.get_nowait()
+        except queue.Empty:
+            conn = self._connect()
+
+        try:
+            conn.request(method, self._prefix + path, body=body, headers=headers or {})
+            response = conn.getresponse()
+            payload = response.read()
+        except BaseException:
+            conn.close()
+            raise
+
+        if response.will_close:
+            conn.close()
+        else:
+            self._release(conn)
+        if response.status >= 400:
+            raise IPFSRequestError(response.status, payload)
+        return payload
+
+    def close(self) -> None:
+        while True:
+            try:
+                self._idle.get_nowait().close()
+            except queue.Empty:
+                return
+
+
+def _multipart(payload: bytes) -> Tuple[bytes, str]:
+    boundary = secrets.token_hex(16)
+    body = b"".join(
+        [
+            f"--{boundary}\r\n".encode("ascii"),
+            b'Content-Disposition: form-data; name="file"; filename="share"\r\n',
+            b"Content-Type: application/octet-stream\r\n\r\n",
+            payload,
+            f"\r\n--{boundary}--\r\n".encode("ascii"),
+        ]
+    )
+    return body, f"multipart/form-data; boundary={boundary}"
+
+
+def _is_retryable(exc: BaseException) -> bool:
+    if isinstance(exc, IPFSRequestError):
+        return exc.status >= 500
+    return isinstance(exc, (OSError, http.client.HTTPException, asyncio.TimeoutError))
+
+
+@dataclass(frozen=True)
+class HolderResponse:
+    """A custodian that answered a quorum fetch."""
+
+    cid: str
+    index: int
+    latency: float
+
+
+@dataclass(frozen=True)
+class QuorumResult:
+    """Outcome of :meth:`AsyncIPFSClient.fetch_quorum`."""
+
+    shares: List[Share]
+    responders: List[HolderResponse]
+    elapsed: float
+    failures: Dict[str, str] = field(default_factory=dict)
+    cancelled: List[str] = field(default_factory=list)
+
+
+class AsyncIPFSClient:
+    """Asyncio IPFS client with bounded concurrency, retries and timeouts.
+
+    With a ``cache`` (see :mod:`aas_holo_shard.storage.cache`), ``cat`` serves
+    known CIDs locally and both ``add_bytes`` and ``cat`` populate it.
+    """
+
+    def __init__(
+        self,
+        base_url: str = DEFAULT_API_URL,
+        *,
+        concurrency: int = 16,
+        retries: int = 3,
+        backoff: float = 0.1,
+        timeout: float = 30.0,
+        cache=None,
+    ) -> None:
+        if concurrency < 1:
+            raise ValueError("concurrency must be >= 1")
+        if retries < 0:
+            raise ValueError("retries must be >= 0")
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.cache = cache
+        self.pool = HTTPConnectionPool(base_url, size=concurrency, timeout=timeout)
+        self._executor = ThreadPoolExecutor(
+            max_workers=concurrency, thread_name_prefix="aas-holo-shard-ipfs"
+        )
+        self._concurrency = concurrency
+        self._semaphore: Optional[asyncio.Semaphore] = None
+        self._latencies: Deque[float] = collections.deque(maxlen=LATENCY_WINDOW)
+
+    async def __aenter__(self) -> "AsyncIPFSClient":
+        return self
+
+    async def __aexit__(self, exc_type, exc, tb) -> None:
+        await self.aclose()
+
+    async def aclose(self) -> None:
+        self._executor.shutdown(wait=False)
+        self.pool.close()
+
+    async def _call(
+        self,
+        path: str,
+        body: Optional[bytes] = None,
+        headers: Optional[Dict[str, str]] = None,
+    ) -> bytes:
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self._concurrency)
+        loop = asyncio.get_running_loop()
+
+        attempt = 0
+        with instrumentation.span("ipfs.request", path=path.split("?", 1)[0]) as request_span:
+            while True:
+                async with self._semaphore:
+                    future = loop.run_in_executor(
+                        self._executor, self.pool.request, "POST", path, body, headers
+                    )
+                    try:
+                        payload = await asyncio.wait_for(future, self.timeout)
+                        request_span.set("attempts", attempt + 1)
+                        return payload
+                    except Exception as exc:
+                        if attempt >= self.retries or not _is_retryable(exc):
+                            raise IPFSUnavailable(f"IPFS request {path} failed: {exc}") from exc
+                await asyncio.sleep(self.backoff * (2**attempt))
+                attempt += 1
+
+    async def add_bytes(self, payload: bytes) -> str:
+        body, content_type = _multipart(payload)
+        raw = await self._call(
+            "/api/v0/add?pin=true&quieter=true", body, {"Content-Type": content_type}
+        )
+        # The add endpoint streams one JSON object per line; the last one
+        # describes the root object.
+        lines = [line for line in raw.splitlines() if line.strip()]
+        if not lines:
+            raise IPFSUnavailable("IPFS add returned an empty response")
+        cid = str(json.loads(lines[-1])["Hash"])
+        if self.cache is not None:
+            self.cache.put(cid, payload)
+        return cid
+
+    async def cat(self, cid: str) -> bytes:
+        if self.cache is not None:
+            cached = self.cache.get(cid)
+            if cached is not None:
+                instrumentation.count("ipfs.cache_hits")
+                return cached
+        started = time.perf_counter()
+        payload = await self._call(f"/api/v0/cat?arg={quote(cid, safe='')}")
+        self._latencies.append(time.perf_counter() - started)
+        instrumentation.count("ipfs.bytes_received", len(payload))
+        if self.cache is not None:
+            self.cache.put(cid, payload)
+        return payload
+
+    def latency_percentile(self, quantile: float) -> Optional[float]:
+        """Return the ``quantile`` (0..1) of recent successful ``cat`` latencies."""
+        if not 0 <= quantile <= 1:
+            raise ValueError("quantile must be between 0 and 1")
+        if not self._latencies:
+            return None
+        ordered = sorted(self._latencies)
+        return ordered[min(len(ordered) - 1, int(quantile * len(ordered)))]
+
+    async def fetch_quorum(
+        self,
+        cids: Iterable[str],
+        threshold: int,
+        *,
+        hedge_after: Optional[float] = None,
+    ) -> QuorumResult:
+        """Return as soon as ``threshold`` distinct valid shares have arrived.
+
+        With ``hedge_after=None`` every CID is requested at once. Otherwise
+        only ``threshold`` requests start immediately and the remaining CIDs
+        are requested once ``hedge_after`` seconds pass without a quorum, or
+        as soon as one of the first requests fails; passing
+        ``latency_percentile(0.95)`` hedges at the observed tail latency.
+        Outstanding requests are cancelled once the quorum is reached.
+        """
+        cid_list = list(cids)
+        if threshold < 1:
+            raise ValueError("threshold must be >= 1")
+        if threshold > len(cid_list):
+            raise ValueError("threshold cannot exceed the number of CIDs")
+
+        started = time.perf_counter()
+        tasks: Dict["asyncio.Task[bytes]", str] = {}
+        waiting = list(cid_list)
+
+        def launch(count: int) -> None:
+            for cid in waiting[:count]:
+                tasks[asyncio.ensure_future(self.cat(cid))] = cid
+            del waiting[:count]
+
+        launch(len(waiting) if hedge_after is None else threshold)
+        hedge_at = None if hedge_after is None else started + hedge_after
+
+        shares: List[Share] = []
+        responders: List[HolderResponse] = []
+        failures: Dict[str, str] = {}
+        seen: Set[int] = set()
+        pending = set(tasks)
+        try:
+            while len(shares) < threshold and (pending or waiting):
+                timeout = None
+                if waiting and hedge_at is not None:
+                    timeout = max(0.0, hedge_at - time.perf_counter())
+                if pending:
+                    done, pending = await asyncio.wait(
+                        pending, timeout=timeout, return_when=asyncio.FIRST_COMPLETED
+                    )
+                else:
+                    done = set()
+                if not done or any(task.exception() is not None for task in done):
+                    launch(len(waiting))
+                    pending |= {task for task in tasks if not task.done()}
+
+                for task in done:
+                    cid = tasks[task]
+                    try:
+                        share = deserialize_share(task.result())
+                    except Exception as exc:
+                        failures[cid] = str(exc)
+                        continue
+                    if share[0] in seen:
+                        failures[cid] = f"duplicate share index {share[0]}"
+                        continue
+                    seen.add(share[0])
+                    shares.append(share)
+                    responders.append(HolderResponse(cid, share[0], time.perf_counter() - started))
+        finally:
+            cancelled = [tasks[task] for task in tasks if not task.done()]
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+
+        if len(shares) < threshold:
+            raise IPFSUnavailable(
+                f"only {len(shares)} of {threshold} required shares could be fetched: {failures}"
+            )
+        return QuorumResult(
+            shares[:threshold],
+            responders[:threshold],
+            time.perf_counter() - started,
+            failures,
+            cancelled + waiting,
+        )
+
+    async def store_shares(
+        self, shares: Iterable[Share], *, wire_format: str = WIRE_JSON
+    ) -> List[str]:
+        """Store every share concurrently; CIDs are returned in input order."""
+        payloads = [serialize_share(share, wire_format=wire_format) for share in shares]
+        with instrumentation.span("ipfs.store_shares", shares=len(payloads)):
+            cids = await asyncio.gather(*(self.add_bytes(payload) for payload in payloads))
+        instrumentation.count("ipfs.bytes_sent", sum(len(payload) for payload in payloads))
+        return list(cids)
+
+    async def store_pack(self, entries: Mapping[str, Share]) -> str:
+        """Store many shares of one custodian as a single pack object."""
+        return await self.add_bytes(wire.build_pack(entries))
+
+    async def fetch_pack(self, cid: str) -> wire.SharePack:
+        """Fetch a pack object; look shares up with :meth:`SharePack.get`."""
+        return wire.SharePack(await self.cat(cid))
+
+    async def fetch_shares(self, cids: Iterable[str]) -> List[Share]:
+        """Fetch every CID concurrently; shares are returned in input order."""
+        cid_list = list(cids)
+        with instrumentation.span("ipfs.fetch_shares", shares=len(cid_list)):
+            payloads = await asyncio.gather(*(self.cat(cid) for cid in cid_list))
+        return [deserialize_share(payload) for payload in payloads]
+
+
+async def fetch_quorum_async(
+    cids: Iterable[str],
+    threshold: int,
+    client: Optional[AsyncIPFSClient] = None,
+    *,
+    hedge_after: Optional[float] = None,
+    **options,
+) -> QuorumResult:
+    """Fetch any ``threshold`` shares, creating a short-lived client if none is given."""
+    if client is not None:
+        return await client.fetch_quorum(cids, threshold, hedge_after=hedge_after)
+    async with AsyncIPFSClient(**options) as owned:
+        return await owned.fetch_quorum(cids, threshold, hedge_after=hedge_after)
+
+
+async def store_shares_async(
+    shares: Iterable[Share],
+    client: Optional[AsyncIPFSClient] = None,
+    *,
+    wire_format: str = WIRE_JSON,
+    **options,
+) -> List[str]:
+    """Store shares concurrently, creating a short-lived client if none is given."""
+    if client is not None:
+        return await client.store_shares(shares, wire_format=wire_format)
+    async with AsyncIPFSClient(**options) as owned:
+        return await owned.store_shares(shares, wire_format=wire_format)
+
+
+async def fetch_shares_async(
+    cids: Iterable[str], client: Optional[AsyncIPFSClient] = None, **options
+) -> List[Share]:
+    """Fetch shares concurrently, creating a short-lived client if none is given."""
+    if client is not None:
+        return await client.fetch_shares(cids)
+    async with AsyncIPFSClient(**options) as owned:
+        return await owned.fetch_shares(cids)
@@ -0,0 +1,363 @@
+"""Local content-addressed cache for share payloads fetched from IPFS.
+
+Payloads are keyed by CID, so a cached entry never goes stale. Evicting entries
+only bounds memory and disk use. :class:`ShareCache` puts an in-memory LRU in
+front of an optional on-disk store. When the CID format is recognised, every
+entry read back from disk is checked against its CID. That covers CIDv0, and
+CIDv1 ``raw`` or ``dag-pb`` leaves with a sha2-256 digest.
+
+Any object with ``get(cid) -> Optional[bytes]`` and ``put(cid, payload)``
+methods can be passed as ``cache=`` to the storage helpers.
+"""
+
+from __future__ import annotations
+
+import base64
+import collections
+import hashlib
+import os
+import re
+import tempfile
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Callable, Dict, Optional, Tuple, Union
+
+DEFAULT_MEMORY_BYTES = 64 << 20
+
+_BASE58 = "123456789ABCDEFGHJKLMNPQRSTUVWXYZabcdefghijkmnopqrstuvwxyz"
+_SHA2_256 = 0x12
+_CODEC_RAW = 0x55
+_CODEC_DAG_PB = 0x70
+# ``ipfs add`` stores payloads up to one default chunk as a single dag-pb leaf.
+_SINGLE_BLOCK_LIMIT = 256 * 1024
+_SAFE_KEY = re.compile(r"[A-Za-z0-9_-]{1,128}")
+
+
+@dataclass
+class CacheStats:
+    hits: int = 0
+    misses: int = 0
+    evictions: int = 0
+    expired: int = 0
+    corrupt: int = 0
+
+
+def _varint(value: int) -> bytes:
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(data: bytes, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while offset < len(data) and shift < 64:
+        byte = data[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+    raise ValueError("invalid varint")
+
+
+def _b58decode(text: str) -> bytes:
+    number = 0
+    for char in text:
+        number = number * 58 + _BASE58.index(char)
+    body = number.to_bytes((number.bit_length() + 7) // 8, "big")
+    return bytes(len(text) - len(text.lstrip("1"))) + body
+
+
+def _b58encode(data: bytes) -> str:
+    number = int.from_bytes(data, "big")
+    out = ""
+    while number:
+        number, rem = divmod(number, 58)
+        out = _BASE58[rem] + out
+    return "1" * (len(data) - len(data.lstrip(b"\0"))) + out
+
+
+def _dag_pb_leaf(payload: bytes) -> bytes:
+    """Encode ``payload`` as the single-block UnixFS file node ``ipfs add`` creates."""
+    unixfs = b"\x08\x02"
+    if payload:
+        unixfs += b"\x12" + _varint(len(payload)) + payload
+    unixfs += b"\x18" + _varint(len(payload))
+    return b"\x0a" + _varint(len(unixfs)) + unixfs
+
+
+def compute_cid(payload: bytes, *, version: int = 0) -> str:
+    """Return the CID ``ipfs add`` assigns to a single-block ``payload``.
+
+    ``version=0`` gives the default ``Qm...`` form; ``version=1`` gives the
+    ``raw`` leaf CID produced by ``ipfs add --cid-version=1``.
+    """
+    if version == 0:
+        if len(payload) > _SINGLE_BLOCK_LIMIT:
+            raise ValueError("CIDv0 computation only supports single-block payloads")
+        digest = hashlib.sha256(_dag_pb_leaf(payload)).digest()
+        return _b58encode(bytes([_SHA2_256, 32]) + digest)
+    if version == 1:
+        digest = hashlib.sha256(payload).digest()
+        raw = b"\x01" + _varint(_CODEC_RAW) + bytes([_SHA2_256, 32]) + digest
+        return "b" + base64.b32encode(raw).decode("ascii").rstrip("=").lower()
+    raise ValueError("CID version must be 0 or 1")
+
+
+def _parse_cid(cid: str) -> Optional[Tuple[int, bytes]]:
+    """Return ``(codec, sha256 digest)`` for CIDs we can verify, else ``None``."""
+    try:
+        if len(cid) == 46 and cid.startswith("Qm"):
+            codec, multihash = _CODEC_DAG_PB, _b58decode(cid)
+        elif cid.startswith("b"):
+            text = cid[1:].upper()
+            raw = base64.b32decode(text + "=" * (-len(text) % 8))
+            version, offset = _read_varint(raw, 0)
+            if version != 1:
+                return None
+            codec, offset = _read_varint(raw, offset)
+            multihash = raw[offset:]
+        else:
+            return None
+    except ValueError:
+        return None
+    if len(multihash) != 34 or multihash[0] != _SHA2_256 or multihash[1] != 32:
+        return None
+    if codec not in (_CODEC_RAW, _CODEC_DAG_PB):
+        return None
+    return codec, multihash[2:]
+
+
+def verify_cid(cid: str, payload: bytes) -> Optional[bool]:
+    """Check ``payload`` against ``cid``; ``None`` means the CID cannot be checked here."""
+    parsed = _parse_cid(cid)
+    if parsed is None:
+        return None
+    codec, digest = parsed
+    if codec == _CODEC_RAW:
+        return hashlib.sha256(payload).digest() == digest
+    if len(payload) > _SINGLE_BLOCK_LIMIT:
+        return None
+    return hashlib.sha256(_dag_pb_leaf(payload)).digest() == digest
+
+
+class MemoryCache:
+    """Thread-safe in-memory LRU bounded by total payload size and entry age."""
+
+    def __init__(
+        self,
+        max_bytes: int = DEFAULT_MEMORY_BYTES,
+        *,
+        ttl: Optional[float] = None,
+        clock: Callable[[], float] = time.monotonic,
+    ) -> None:
+        if max_bytes < 0:
+            raise ValueError("max_bytes must be >= 0")
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.size = 0
+        self.stats = CacheStats()
+        self._clock = clock
+        self._entries: "collections.OrderedDict[str, Tuple[bytes, float]]" = (
+            collections.OrderedDict()
+        )
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, cid: object) -> bool:
+        return cid in self._entries
+
+    def _drop(self, cid: str) -> None:
+        payload, _ = self._entries.pop(cid)
+        self.size -= len(payload)
+
+    def get(self, cid: str) -> Optional[bytes]:
+        with self._lock:
+            entry = self._entries.get(cid)
+            if entry is None:
+                self.stats.misses += 1
+                return None
+            payload, stored_at = entry
+            if self.ttl is not None and self._clock() - stored_at > self.ttl:
+                self._drop(cid)
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+            self._entries.move_to_end(cid)
+            self.stats.hits += 1
+            return payload
+
+    def put(self, cid: str, payload: bytes) -> None:
+        payload = bytes(payload)
+        if len(payload) > self.max_bytes:
+            return
+        with self._lock:
+            if cid in self._entries:
+                self._drop(cid)
+            self._entries[cid] = (payload, self._clock())
+            self.size += len(payload)
+            while self.size > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._drop(oldest)
+                self.stats.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self.size = 0
+
+
+class DiskCache:
+    """Content-addressed directory of payloads, one file per CID.
+
+    Entries older than ``ttl`` seconds are ignored and removed on read. Once
+    the store grows past ``max_bytes``, the least recently written entries are
+    evicted. Only CIDs made of ``[A-Za-z0-9_-]`` characters are stored.
+    """
+
+    def __init__(
+        self,
+        root: Union[str, Path],
+        *,
+        max_bytes: Optional[int] = None,
+        ttl: Optional[float] = None,
+    ) -> None:
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+        self._index: Dict[str, Tuple[int, float]] = {}
+        for path in self.root.glob("*/*"):
+            if path.is_file() and _SAFE_KEY.fullmatch(path.name):
+                stat = path.stat()
+                self._index[path.name] = (stat.st_size, stat.st_mtime)
+        self.size = sum(size for size, _ in self._index.values())
+
+    def _path(self, cid: str) -> Optional[Path]:
+        if not _SAFE_KEY.fullmatch(cid):
+            return None
+        return self.root / cid[-2:] / cid
+
+    def _remove(self, cid: str) -> None:
+        path = self._path(cid)
+        size, _ = self._index.pop(cid, (0, 0.0))
+        self.size -= size
+        if path is not None:
+            try:
+                path.unlink()
+            except FileNotFoundError:
+                pass
+
+    def get(self, cid: str) -> Optional[bytes]:
+        path = self._path(cid)
+        with self._lock:
+            entry = self._index.get(cid)
+            if path is None or entry is None:
+                self.stats.misses += 1
+                return None
+            if self.ttl is not None and time.time() - entry[1] > self.ttl:
+                self._remove(cid)
+                self.stats.expired += 1
+                self.stats.misses += 1
+                return None
+        try:
+            payload = path.read_bytes()
+        except FileNotFoundError:
+            with self._lock:
+                self._index.pop(cid, None)
+                self.stats.misses += 1
+            return None
+        if verify_cid(cid, payload) is False:
+            with self._lock:
+                self._remove(cid)
+                self.stats.corrupt += 1
+                self.stats.misses += 1
+            return None
+        with self._lock:
+            self.stats.hits += 1
+        return payload
+
+    def put(self, cid: str, payload: bytes) -> None:
+        path = self._path(cid)
+        if path is None or (self.max_bytes is not None and len(payload) > self.max_bytes):
+            return
+        path.parent.mkdir(exist_ok=True)
+        fd, tmp_name = tempfile.mkstemp(dir=path.parent, prefix=".", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as handle:
+                handle.write(payload)
+            os.replace(tmp_name, path)
+        except BaseException:
+            os.unlink(tmp_name)
+            raise
+
+        with self._lock:
+            previous, _ = self._index.get(cid, (0, 0.0))
+            self._index[cid] = (len(payload), time.time())
+            self.size += len(payload) - previous
+            if self.max_bytes is None:
+                return
+            for oldest in sorted(self._index, key=lambda key: self._index[key][1]):
+                if self.size <= self.max_bytes:
+                    break
+                self._remove(oldest)
+                self.stats.evictions += 1
+
+
+class ShareCache:
+    """In-memory LRU in front of an optional :class:`DiskCache`.
+
+    Disk hits are promoted into memory. ``put`` refuses payloads that do not
+    match a verifiable CID, so a misbehaving gateway cannot poison the cache.
+    """
+
+    def __init__(
+        self,
+        memory: Optional[MemoryCache] = None,
+        disk: Optional[DiskCache] = None,
+        *,
+        verify: bool = True,
+    ) -> None:
+        self.memory = memory if memory is not None else MemoryCache()
+        self.disk = disk
+        self.verify = verify
+        self.stats = CacheStats()
+        self._lock = threading.Lock()
+
+    def _count(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.stats.hits += 1
+            else:
+                self.stats.misses += 1
+
+    def get(self, cid: str) -> Optional[bytes]:
+        payload = self.memory.get(cid)
+        if payload is None and self.disk is not None:
+            payload = self.disk.get(cid)
+            if payload is not None:
+                self.memory.put(cid, payload)
+        self._count(payload is not None)
+        return payload
+
+    def put(self, cid: str, payload: bytes) -> None:
+        if self.verify and verify_cid(cid, payload) is False:
+            with self._lock:
+                self.stats.corrupt += 1
+            raise ValueError(f"payload does not match CID {cid}")
+        self.memory.put(cid, payload)
+        if self.disk is not None:
+            self.disk.put(cid, payload)
@@ -4,9 +4,17 @@ from __future__ import annotations
 
 import base64
 import json
-from typing import Iterable, List, Optional
+from typing import TYPE_CHECKING, Dict, Iterable, List, Mapping, Optional
 
-from aas_holo_shard.core.shamir import Share
+from aas_holo_shard import instrumentation
+from aas_holo_shard.storage import wire
+
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.core.shamir import Share
+
+WIRE_JSON = "json"
+WIRE_BINARY = "binary"
+WIRE_FORMATS = (WIRE_JSON, WIRE_BINARY)
 
 
 class IPFSUnavailable(RuntimeError):
@@ -28,7 +36,12 @@ def _get_client(client=None):
         raise IPFSUnavailable("unable to connect to local IPFS daemon") from exc
 
 
-def serialize_share(share: Share) -> bytes:
+def serialize_share(share: Share, *, wire_format: str = WIRE_JSON) -> bytes:
+    """Encode a share as JSON (default) or as a compact binary record."""
+    if wire_format == WIRE_BINARY:
+        return wire.encode_share(share)
+    if wire_format != WIRE_JSON:
+        raise ValueError(f"unknown wire format {wire_format!r}; expected one of {WIRE_FORMATS}")
     idx, payload = share
     data = {
         "index": int(idx),
@@ -38,24 +51,65 @@ def serialize_share(share: Share) -> bytes:
 
 
 def deserialize_share(payload: bytes) -> Share:
+    """Decode a share in either wire format; binary records are detected by magic."""
+    if wire.is_binary_share(payload):
+        return wire.decode_share(payload)
     data = json.loads(payload.decode("utf-8"))
     return int(data["index"]), base64.b64decode(data["payload"])
 
 
-def store_shares(shares: Iterable[Share], client=None) -> List[str]:
+def store_shares(
+    shares: Iterable[Share], client=None, *, wire_format: str = WIRE_JSON, cache=None
+) -> List[str]:
     ipfs = _get_client(client)
     cids: List[str] = []
-    for share in shares:
-        cid = ipfs.add_bytes(serialize_share(share))
-        cids.append(cid)
+    sent = 0
+    with instrumentation.span("ipfs.store_shares", wire_format=wire_format) as store_span:
+        for share in shares:
+            payload = serialize_share(share, wire_format=wire_format)
+            cid = ipfs.add_bytes(payload)
+            if cache is not None:
+                cache.put(cid, payload)
+            cids.append(cid)
+            sent += len(payload)
+        store_span.set("shares", len(cids))
+    instrumentation.count("ipfs.bytes_sent", sent)
     return cids
 
 
-def fetch_shares(cids: Iterable[str], client=None) -> List[Share]:
-    ipfs = _get_client(client)
+def fetch_shares(cids: Iterable[str], client=None, *, cache=None) -> List[Share]:
+    """Fetch shares by CID; with ``cache`` only misses reach the IPFS daemon."""
+    ipfs = None
     shares: List[Share] = []
-    for cid in cids:
-        payload = ipfs.cat(cid)
-        shares.append(deserialize_share(payload))
+    received = hits = 0
+    with instrumentation.span("ipfs.fetch_shares") as fetch_span:
+        for cid in cids:
+            payload = cache.get(cid) if cache is not None else None
+            if payload is None:
+                if ipfs is None:
+                    ipfs = _get_client(client)
+                payload = ipfs.cat(cid)
+                received += len(payload)
+                if cache is not None:
+                    cache.put(cid, payload)
+            else:
+                hits += 1
+            shares.append(deserialize_share(payload))
+        fetch_span.set("shares", len(shares))
+    instrumentation.count("ipfs.bytes_received", received)
+    if hits:
+        instrumentation.count("ipfs.cache_hits", hits)
     return shares
 
+
+def store_pack(entries: Mapping[str, Share], client=None) -> str:
+    """Store one custodian's shares for many assets as a single pack object."""
+    ipfs = _get_client(client)
+    return ipfs.add_bytes(wire.build_pack(entries))
+
+
+def fetch_from_pack(cid: str, asset_ids: Iterable[str], client=None) -> Dict[str, Share]:
+    """Fetch a pack object once and return the shares for ``asset_ids``."""
+    ipfs = _get_client(client)
+    pack = wire.SharePack(ipfs.cat(cid))
+    return {asset_id: pack.get(asset_id) for asset_id in asset_ids}
@@ -0,0 +1,206 @@
+"""Compact binary wire format for shares and multi-share pack objects.
+
+Share record (version 1)::
+
+    "AHSB" | version u8 | index u8 | varint payload length | payload
+           | varint metadata length | metadata (compact JSON) | crc32 u32
+
+Pack object (version 1)::
+
+    "AHSP" | version u8 | varint entry count | varint index length | index
+           | crc32 u32 of everything before | records
+
+The pack index lists ``varint id length | asset id (UTF-8) | varint offset |
+varint length`` per entry, with offsets relative to the first record. Opening a
+pack parses only the index; each lookup then slices one share record.
+"""
+
+from __future__ import annotations
+
+import json
+import struct
+import zlib
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Mapping, Optional, Tuple
+
+if TYPE_CHECKING:  # pragma: no cover
+    from aas_holo_shard.core.shamir import Share
+
+SHARE_MAGIC = b"AHSB"
+PACK_MAGIC = b"AHSP"
+VERSION = 1
+
+_CRC = struct.Struct(">I")
+
+
+class ShareFormatError(ValueError):
+    """Raised when a binary share record or pack is malformed."""
+
+
+def _varint(value: int) -> bytes:
+    if value < 0:
+        raise ShareFormatError("varint cannot be negative")
+    out = bytearray()
+    while True:
+        byte = value & 0x7F
+        value >>= 7
+        if value:
+            out.append(byte | 0x80)
+        else:
+            out.append(byte)
+            return bytes(out)
+
+
+def _read_varint(blob: memoryview, offset: int) -> Tuple[int, int]:
+    value = 0
+    shift = 0
+    while True:
+        if offset >= len(blob):
+            raise ShareFormatError("truncated varint")
+        byte = blob[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if not byte & 0x80:
+            return value, offset
+        shift += 7
+        if shift > 63:
+            raise ShareFormatError("varint is too long")
+
+
+def _take(blob: memoryview, offset: int, size: int) -> Tuple[memoryview, int]:
+    if offset + size > len(blob):
+        raise ShareFormatError("record is truncated")
+    return blob[offset : offset + size], offset + size
+
+
+def _check_crc(blob: memoryview, end: int) -> None:
+    if end + _CRC.size > len(blob):
+        raise ShareFormatError("record is truncated")
+    (expected,) = _CRC.unpack_from(blob, end)
+    if zlib.crc32(blob[:end]) != expected:
+        raise ShareFormatError("checksum mismatch")
+
+
+def _check_header(blob: memoryview, magic: bytes) -> int:
+    if bytes(blob[: len(magic)]) != magic:
+        raise ShareFormatError(f"missing {magic.decode('ascii')} magic")
+    if len(blob) <= len(magic) or blob[len(magic)] != VERSION:
+        raise ShareFormatError("unsupported wire format version")
+    return len(magic) + 1
+
+
+def is_binary_share(payload: bytes) -> bool:
+    return payload[: len(SHARE_MAGIC)] == SHARE_MAGIC
+
+
+def encode_share(share: Share, metadata: Optional[Mapping[str, Any]] = None) -> bytes:
+    """Encode a share (and optional JSON-serializable metadata) as a binary record."""
+    idx, payload = share
+    if not 0 <= int(idx) <= 255:
+        raise ShareFormatError("share index must fit in one byte")
+    meta = b""
+    if metadata:
+        meta = json.dumps(dict(metadata), separators=(",", ":"), sort_keys=True).encode("utf-8")
+    body = b"".join(
+        [
+            SHARE_MAGIC,
+            bytes([VERSION, int(idx)]),
+            _varint(len(payload)),
+            bytes(payload),
+            _varint(len(meta)),
+            meta,
+        ]
+    )
+    return body + _CRC.pack(zlib.crc32(body))
+
+
+def decode_share_with_metadata(record: bytes) -> Tuple[Share, Dict[str, Any]]:
+    """Decode a binary share record, verifying its checksum."""
+    blob = memoryview(record)
+    offset = _check_header(blob, SHARE_MAGIC)
+    _, offset = _take(blob, offset, 1)
+    idx = blob[offset - 1]
+    size, offset = _read_varint(blob, offset)
+    payload, offset = _take(blob, offset, size)
+    size, offset = _read_varint(blob, offset)
+    meta, offset = _take(blob, offset, size)
+    _check_crc(blob, offset)
+    if offset + _CRC.size != len(blob):
+        raise ShareFormatError("trailing bytes after share record")
+    metadata = json.loads(bytes(meta).decode("utf-8")) if size else {}
+    return (idx, bytes(payload)), metadata
+
+
+def decode_share(record: bytes) -> Share:
+    return decode_share_with_metadata(record)[0]
+
+
+def build_pack(
+    entries: Mapping[str, Share],
+    metadata: Optional[Mapping[str, Mapping[str, Any]]] = None,
+) -> bytes:
+    """Bundle many shares of one custodian into a single indexed pack object.
+
+    ``entries`` maps asset IDs to shares; ``metadata`` optionally maps asset IDs
+    to per-share metadata.
+    """
+    metadata = metadata or {}
+    index = bytearray()
+    records: List[bytes] = []
+    offset = 0
+    for asset_id in sorted(entries):
+        record = encode_share(entries[asset_id], metadata.get(asset_id))
+        key = asset_id.encode("utf-8")
+        index += _varint(len(key)) + key + _varint(offset) + _varint(len(record))
+        records.append(record)
+        offset += len(record)
+
+    head = PACK_MAGIC + bytes([VERSION]) + _varint(len(records)) + _varint(len(index)) + index
+    return b"".join([head, _CRC.pack(zlib.crc32(head))] + records)
+
+
+class SharePack:
+    """Read-only view of a pack object with O(1) lookup by asset ID."""
+
+    def __init__(self, blob: bytes) -> None:
+        self._blob = memoryview(blob)
+        offset = _check_header(self._blob, PACK_MAGIC)
+        count, offset = _read_varint(self._blob, offset)
+        index_size, offset = _read_varint(self._blob, offset)
+        index_end = offset + index_size
+        _check_crc(self._blob, index_end)
+        self._data_start = index_end + _CRC.size
+
+        self._index: Dict[str, Tuple[int, int]] = {}
+        while offset < index_end:
+            size, offset = _read_varint(self._blob, offset)
+            key, offset = _take(self._blob, offset, size)
+            record_offset, offset = _read_varint(self._blob, offset)
+            record_size, offset = _read_varint(self._blob, offset)
+            self._index[bytes(key).decode("utf-8")] = (record_offset, record_size)
+        if len(self._index) != count or offset != index_end:
+            raise ShareFormatError("pack index is corrupt")
+
+    def __len__(self) -> int:
+        return len(self._index)
+
+    def __contains__(self, asset_id: object) -> bool:
+        return asset_id in self._index
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self._index)
+
+    def _record(self, asset_id: str) -> bytes:
+        try:
+            offset, size = self._index[asset_id]
+        except KeyError:
+            raise KeyError(asset_id) from None
+        start = self._data_start + offset
+        record, _ = _take(self._blob, start, size)
+        return bytes(record)
+
+    def get(self, asset_id: str) -> Share:
+        """Return the share stored for ``asset_id``; raises ``KeyError`` if absent."""
+        return decode_share(self._record(asset_id))
+
+    def get_with_metadata(self, asset_id: str) -> Tuple[Share, Dict[str, Any]]:
+        return decode_share_with_metadata(self._record(asset_id))
@@ -0,0 +1,80 @@
+"""In-process fake of the IPFS HTTP API used by the storage tests."""
+
+import json
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+from aas_holo_shard.storage.cache import compute_cid
+
+
+class FakeIPFS:
+    def __init__(self) -> None:
+        self.blocks = {}
+        self.delays = {}
+        self.fail_next = 0
+        self.requests = 0
+        self.connections = set()
+        self.lock = threading.Lock()
+        fake = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+            disable_nagle_algorithm = True
+
+            def log_message(self, *args) -> None:
+                pass
+
+            def _reply(self, status: int, body: bytes) -> None:
+                self.send_response(status)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_POST(self) -> None:
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                url = urlsplit(self.path)
+                with fake.lock:
+                    fake.requests += 1
+                    fake.connections.add(self.client_address)
+                    if fake.fail_next:
+                        fake.fail_next -= 1
+                        self._reply(503, b"busy")
+                        return
+
+                if url.path == "/api/v0/add":
+                    payload = body.split(b"\r\n\r\n", 1)[1].rsplit(b"\r\n--", 1)[0]
+                    cid = fake.add(payload)
+                    self._reply(200, json.dumps({"Name": "share", "Hash": cid}).encode() + b"\n")
+                elif url.path == "/api/v0/cat":
+                    cid = parse_qs(url.query)["arg"][0]
+                    time.sleep(fake.delays.get(cid, 0))
+                    if cid not in fake.blocks:
+                        self._reply(500, b'{"Message": "not found"}')
+                    else:
+                        self._reply(200, fake.blocks[cid])
+                else:
+                    self._reply(404, b"unknown endpoint")
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        # Clients that time out hang up mid-response; that is expected here.
+        self.server.handle_error = lambda request, client_address: None
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        self.thread = threading.Thread(
+            target=self.server.serve_forever, kwargs={"poll_interval": 0.05}, daemon=True
+        )
+
+    def add(self, payload: bytes) -> str:
+        cid = compute_cid(payload)
+        self.blocks[cid] = payload
+        return cid
+
+    def __enter__(self) -> "FakeIPFS":
+        self.thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self.server.shutdown()
+        self.server.server_close()
@@ -0,0 +1,67 @@
+import pytest
+
+from aas_holo_shard.aas import shard
+from aas_holo_shard.aas.index import DuplicateElementError, ElementIndex
+
+
+def _make_nested() -> dict:
+    return {
+        "submodels": [
+            {
+                "idShort": "ProductionParams",
+                "submodelElements": [
+                    {"idShort": "MasterKey", "value": "one"},
+                    {
+                        "idShort": "Line2",
+                        "modelType": "SubmodelElementCollection",
+                        "value": [{"idShort": "MasterKey", "value": "two"}],
+                    },
+                ],
+            },
+            {
+                "idShort": "Maintenance",
+                "submodelElements": [{"idShort": "Interval", "value": "30d"}],
+            },
+        ]
+    }
+
+
+def test_index_lookup_by_id_and_path() -> None:
+    index = ElementIndex(_make_nested())
+    assert index.get("Interval") == {"idShort": "Interval", "value": "30d"}
+    assert index.get("ProductionParams/MasterKey")["value"] == "one"
+    assert index.get("ProductionParams/Line2/MasterKey")["value"] == "two"
+    assert index.get("Missing") is None
+    assert "Maintenance/Interval" in index
+    assert len(index) == 4
+
+
+def test_index_detects_duplicates() -> None:
+    index = ElementIndex(_make_nested())
+    assert index.duplicates() == {
+        "MasterKey": ["ProductionParams/MasterKey", "ProductionParams/Line2/MasterKey"]
+    }
+    with pytest.raises(DuplicateElementError):
+        index.get("MasterKey")
+    with pytest.raises(DuplicateElementError):
+        shard.find_element(_make_nested(), "MasterKey")
+
+
+def test_index_references_tree() -> None:
+    doc = _make_nested()
+    ElementIndex(doc).get("Interval")["value"] = "60d"
+    assert doc["submodels"][1]["submodelElements"][0]["value"] == "60d"
+
+
+def test_split_and_combine_by_path(tmp_path) -> None:
+    import json
+
+    source = tmp_path / "nested.json"
+    source.write_text(json.dumps(_make_nested()))
+    with pytest.raises(DuplicateElementError):
+        shard.split_aas(source, "MasterKey", n=2, k=2)
+
+    outputs = shard.split_aas(source, "ProductionParams/Line2/*", n=3, k=2)
+    recovered = shard.combine_aas_many(outputs[:2], "*/Line2/*", tmp_path / "restored.json")
+    assert recovered == {"ProductionParams/Line2/MasterKey": "two"}
+    assert json.loads((tmp_path / "restored.json").read_text()) == _make_nested()
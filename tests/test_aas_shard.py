@@ -52,6 +52,118 @@ def test_parse_shard_value() -> None:
     assert valid == (1, 2)
 
 
+def test_parse_shard_with_metadata() -> None:
+    assert shard._parse_shard("SHARD_GF1:3:ff:2:5:ab") == (
+        (3, b"\xff"),
+        shard.ShardMeta(2, 5, "ab"),
+    )
+    assert shard._parse_shard("SHARD_V1:1:2") == ((1, 2), None)
+    assert shard._parse_shard("SHARD_V1:1:2:3:4") is None
+    assert shard._parse_shard("00:1A:2B:3C:4D:5E") is None
+    assert shard._parse_shard("SHARD_V1:abc:def") is None
+    assert shard._parse_shard("SHARD_GF1:1:zz:2:3:ab") is None
+
+
+def test_combine_glob_skips_colon_separated_values(tmp_path) -> None:
+    sample = _make_sample()
+    sample["submodels"][0]["submodelElements"].append(
+        {
+            "idShort": "MacAddress",
+            "modelType": "Property",
+            "valueType": "xs:string",
+            "value": "00:1A:2B:3C:4D:5E",
+        }
+    )
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(sample))
+    outputs = shard.split_aas(source, "MasterKey", n=3, k=2)
+
+    restored = tmp_path / "restored.json"
+    for streaming in (False, True):
+        recovered = shard.combine_aas_many(outputs[:2], "*", restored, streaming=streaming)
+        assert recovered == {"MasterKey": "TopSecretValue"}
+        assert json.loads(restored.read_text()) == sample
+
+
+def test_combine_stops_after_k_consistent_shards(tmp_path) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_sample()))
+    outputs = shard.split_aas(source, "MasterKey", n=4, k=2)
+    value = shard.find_element(json.loads(outputs[0].read_text()), "MasterKey")["value"]
+    assert value.split(":")[3:5] == ["2", "4"]
+
+    # Files after the k-th shard are never opened.
+    missing = tmp_path / "missing.json"
+    restored = tmp_path / "restored.json"
+    assert shard.combine_aas([outputs[2], outputs[0], missing], "MasterKey", restored) == (
+        "TopSecretValue"
+    )
+    assert shard.combine_aas_many(
+        [outputs[3], outputs[1], missing], "MasterKey", restored, streaming=True
+    ) == {"MasterKey": "TopSecretValue"}
+
+
+def test_combine_ignores_shards_of_other_splits(tmp_path) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_sample()))
+    old = [
+        path.rename(tmp_path / f"old_{path.name}")
+        for path in shard.split_aas(source, "MasterKey", n=3, k=2)
+    ]
+    new = shard.split_aas(source, "MasterKey", n=3, k=2)
+    restored = tmp_path / "restored.json"
+    assert shard.combine_aas([old[0], new[1], new[2]], "MasterKey", restored) == "TopSecretValue"
+    with pytest.raises(ValueError, match="2 shards from the same split, found 1"):
+        shard.combine_aas([old[0], new[1]], "MasterKey", restored)
+
+
+def _tamper(path) -> None:
+    doc = json.loads(path.read_text())
+    elem = shard.find_element(doc, "MasterKey")
+    prefix, x, y, *meta = elem["value"].split(":")
+    forged = int(y) + 1 if prefix == shard.SHARD_PREFIX else "00" * (len(y) // 2)
+    elem["value"] = ":".join([prefix, x, str(forged), *meta])
+    path.write_text(json.dumps(doc))
+
+
+@pytest.mark.parametrize("backend", shard.BACKENDS)
+@pytest.mark.parametrize("streaming", [False, True])
+def test_combine_robust_corrects_and_names_faulty_files(tmp_path, backend, streaming) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_sample()))
+    outputs = shard.split_aas(source, "MasterKey", n=5, k=2, backend=backend)
+    _tamper(outputs[2])
+    restored = tmp_path / "restored.json"
+
+    recovered, faulty = shard.combine_aas_robust(
+        outputs, "MasterKey", restored, streaming=streaming
+    )
+    assert recovered == {"MasterKey": "TopSecretValue"}
+    assert faulty == {"MasterKey": [str(outputs[2])]}
+
+    _tamper(outputs[3])
+    with pytest.raises(ValueError, match="faulty"):
+        shard.combine_aas_robust(outputs[:4], "MasterKey", restored, streaming=streaming)
+
+
+def test_combine_robust_requires_shard_metadata(tmp_path, capsys) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_sample()))
+    outputs = shard.split_aas(source, "MasterKey", n=4, k=2)
+    _tamper(outputs[0])
+    argv = ["combine", "MasterKey", *map(str, outputs), "-o", str(tmp_path / "r.json")]
+    assert shard.main(argv + ["--robust"]) == 0
+    assert f"Ignored faulty shards of MasterKey: {outputs[0]}" in capsys.readouterr().out
+
+    legacy = tmp_path / "legacy.json"
+    doc = json.loads(outputs[1].read_text())
+    elem = shard.find_element(doc, "MasterKey")
+    elem["value"] = ":".join(elem["value"].split(":")[:3])
+    legacy.write_text(json.dumps(doc))
+    with pytest.raises(ValueError, match="needs shards that record k"):
+        shard.combine_aas_robust([legacy], "MasterKey", tmp_path / "r.json")
+
+
 def test_int_to_str_zero() -> None:
     assert shard.int_to_str(0) == ""
 
@@ -146,3 +258,206 @@ def test_main_error_path(capsys) -> None:
     assert shard.main(["combine", "Missing", "missing.json"]) == 1
     captured = capsys.readouterr()
     assert "Error:" in captured.err
+
+
+def _make_multi_sample() -> dict:
+    sample = _make_sample()
+    elements = sample["submodels"][0]["submodelElements"]
+    elements.append(
+        {"idShort": "Recipe_A", "modelType": "Property", "valueType": "xs:string", "value": "a"}
+    )
+    elements.append(
+        {"idShort": "Recipe_B", "modelType": "Property", "valueType": "xs:string", "value": "b"}
+    )
+    return sample
+
+
+def test_resolve_targets_glob_and_regex() -> None:
+    sample = _make_multi_sample()
+    assert shard.resolve_targets(sample, "Recipe_*") == ["Recipe_A", "Recipe_B"]
+    assert shard.resolve_targets(sample, ["MasterKey", "Recipe_?"]) == [
+        "MasterKey",
+        "Recipe_A",
+        "Recipe_B",
+    ]
+    assert shard.resolve_targets(sample, r"Recipe_[B]|Master\w+", regex=True) == [
+        "MasterKey",
+        "Recipe_B",
+    ]
+
+
+def test_split_and_combine_many(tmp_path) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_multi_sample()))
+
+    outputs = shard.split_aas(source, ["MasterKey", "Recipe_*"], n=3, k=2)
+    assert len(outputs) == 3
+    shard_payload = json.loads(outputs[1].read_text())
+    for name in ("MasterKey", "Recipe_A", "Recipe_B"):
+        elem = shard.find_element(shard_payload, name)
+        assert elem is not None
+        assert shard._parse_shard_value(elem["value"]) is not None
+
+    recovered = shard.combine_aas_many(outputs[1:], "*", tmp_path / "restored.json")
+    assert recovered == {"MasterKey": "TopSecretValue", "Recipe_A": "a", "Recipe_B": "b"}
+    restored = json.loads((tmp_path / "restored.json").read_text())
+    assert restored == _make_multi_sample()
+
+
+def test_split_glob_skips_collections(tmp_path) -> None:
+    sample = _make_sample()
+    sample["submodels"][0]["submodelElements"].append(
+        {
+            "idShort": "Settings",
+            "modelType": "SubmodelElementCollection",
+            "value": [
+                {"idShort": "Inner", "modelType": "Property", "valueType": "xs:int", "value": "7"}
+            ],
+        }
+    )
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(sample))
+    restored = tmp_path / "restored.json"
+
+    for streaming in (False, True):
+        outputs = shard.split_aas(source, "*", n=2, k=2, streaming=streaming)
+        payload = json.loads(outputs[0].read_text())
+        assert isinstance(shard.find_element(payload, "Settings")["value"], list)
+        recovered = shard.combine_aas_many(outputs, "*", restored, streaming=streaming)
+        assert recovered == {"MasterKey": "TopSecretValue", "Inner": "7"}
+        assert json.loads(restored.read_text()) == sample
+
+        with pytest.raises(ValueError, match="'Settings'.*collection"):
+            shard.split_aas(source, "Settings", n=2, k=2, streaming=streaming)
+
+
+def test_split_pattern_without_match(tmp_path) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_sample()))
+    with pytest.raises(ValueError):
+        shard.split_aas(source, "Nothing*", n=2, k=2)
+
+
+def test_main_multi_field(tmp_path, capsys) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_multi_sample()))
+
+    assert shard.main(["split", str(source), "MasterKey,Recipe_A", "-n", "2", "-k", "2"]) == 0
+    assert shard.main(
+        [
+            "combine",
+            "MasterKey,Recipe_A",
+            str(tmp_path / "factory_shard_1.json"),
+            str(tmp_path / "factory_shard_2.json"),
+            "-o",
+            str(tmp_path / "restored.json"),
+        ]
+    ) == 0
+
+    captured = capsys.readouterr()
+    assert "Recovered Recipe_A: a" in captured.out
+
+
+def test_split_template_matches_copy_output(tmp_path, monkeypatch) -> None:
+    sample = _make_multi_sample()
+    sample["submodels"][0]["submodelElements"][1]["description"] = [
+        {"language": "de", "text": "Rezept"}
+    ]
+    sample["submodels"][0]["submodelElements"][2]["value"] = "ünïcødé"
+    monkeypatch.setattr(
+        shard, "make_shards", lambda secret, n, k: [(i, secret + i) for i in range(1, n + 1)]
+    )
+    monkeypatch.setattr(shard, "_new_sharing_id", lambda: "f00d")
+
+    outputs = {}
+    for template in (True, False):
+        workdir = tmp_path / str(template)
+        workdir.mkdir()
+        source = workdir / "factory.json"
+        source.write_text(json.dumps(sample))
+        outputs[template] = shard.split_aas(source, "*", n=3, k=2, template=template)
+
+    for templated, copied in zip(outputs[True], outputs[False]):
+        assert templated.read_bytes() == copied.read_bytes()
+
+
+def test_shard_template_rejects_ambiguous_placeholder() -> None:
+    sample = _make_sample()
+    elem = shard.find_element(sample, "MasterKey")
+    assert shard._build_shard_template(sample, [elem, elem]) is None
+
+
+def test_split_and_combine_gf256_long_secret(tmp_path) -> None:
+    sample = _make_sample()
+    sample["submodels"][0]["submodelElements"][0]["value"] = "Ä" * 500
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(sample))
+
+    outputs = shard.split_aas(source, "MasterKey", n=4, k=3, backend="gf256")
+    value = shard.find_element(json.loads(outputs[0].read_text()), "MasterKey")["value"]
+    assert value.startswith(f"{shard.SHARD_GF_PREFIX}:1:")
+    assert len(bytes.fromhex(value.split(":")[2])) == len("Ä".encode("utf-8")) * 500
+
+    recovered = shard.combine_aas(outputs[1:], "MasterKey", tmp_path / "restored.json")
+    assert recovered == "Ä" * 500
+
+
+def test_combine_rejects_mixed_backends(tmp_path) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(json.dumps(_make_sample()))
+    prime = shard.split_aas(source, "MasterKey", n=2, k=2)[0].rename(tmp_path / "p.json")
+    gf = shard.split_aas(source, "MasterKey", n=2, k=2, backend="gf256")[1]
+    with pytest.raises(ValueError):
+        shard.combine_aas([prime, gf], "MasterKey", tmp_path / "restored.json")
+    with pytest.raises(ValueError):
+        shard.split_aas(source, "MasterKey", n=2, k=2, backend="nope")
+
+
+def test_lagrange_coefficients_cached_and_order_independent() -> None:
+    shard._lagrange_at_zero.cache_clear()
+    first = shard.lagrange_coefficients([1, 3, 5])
+    second = shard.lagrange_coefficients([5, 1, 3])
+    assert second == [first[2], first[0], first[1]]
+    assert shard._lagrange_at_zero.cache_info().hits == 1
+    assert sum(first) % shard.PRIME == 1
+    with pytest.raises(ValueError):
+        shard.lagrange_coefficients([1, 1])
+
+
+def test_batch_inverse() -> None:
+    values = [2, 3, shard.PRIME - 1, 12345678901234567890]
+    inverses = shard._batch_inverse(values)
+    assert all((v * inv) % shard.PRIME == 1 for v, inv in zip(values, inverses))
+    with pytest.raises(ValueError):
+        shard._batch_inverse([1, shard.PRIME])
+
+
+def test_recover_secrets_batch() -> None:
+    secrets_in = [shard.str_to_int(f"asset-{i}") for i in range(50)]
+    per_secret = [shard.make_shards(secret, n=5, k=3) for secret in secrets_in]
+    columns = [(x, [shards[x - 1][1] for shards in per_secret]) for x in (2, 4, 5)]
+    assert shard.recover_secrets(columns) == secrets_in
+    with pytest.raises(ValueError):
+        shard.recover_secrets([])
+    with pytest.raises(ValueError):
+        shard.recover_secrets([(1, [1, 2]), (2, [1])])
+
+
+def test_make_shards_batch_columns() -> None:
+    secrets_in = [shard.str_to_int(f"asset-{i}") for i in range(20)] + [0]
+    columns = shard.make_shards_batch(secrets_in, n=4, k=3)
+    assert [x for x, _ in columns] == [1, 2, 3, 4]
+    assert all(len(ys) == len(secrets_in) for _, ys in columns)
+    assert shard.recover_secrets(columns[1:]) == secrets_in
+    single = [(x, ys[5]) for x, ys in columns[:3]]
+    assert shard.recover_secret(single) == secrets_in[5]
+
+
+def test_make_shards_batch_invalid_inputs() -> None:
+    assert shard.make_shards_batch([], n=2, k=2) == [(1, []), (2, [])]
+    with pytest.raises(ValueError):
+        shard.make_shards_batch([1], n=0, k=1)
+    with pytest.raises(ValueError):
+        shard.make_shards_batch([1], n=1, k=2)
+    with pytest.raises(ValueError):
+        shard.make_shards_batch([shard.PRIME], n=2, k=1)
@@ -0,0 +1,191 @@
+import json
+import tracemalloc
+
+import pytest
+from hypothesis import given, strategies as st
+
+from aas_holo_shard.aas import shard, stream
+from aas_holo_shard.aas.index import DuplicateElementError, ElementIndex
+
+
+def _property(id_short: str, value, **extra) -> dict:
+    return {"idShort": id_short, "modelType": "Property", "value": value, **extra}
+
+
+def _make_sample() -> dict:
+    return {
+        "assetAdministrationShells": [{"id": "urn:uuid:fac-1", "idShort": "Demo"}],
+        "submodels": [
+            {
+                "idShort": "ProductionParams",
+                "submodelElements": [
+                    _property("MasterKey", "TopSecretValue"),
+                    _property("Recipe_A", 'sugar { "quoted" ] }'),
+                    _property("Recipe_B", "Ünïcödé"),
+                    _property("Batch", 42),
+                    {
+                        "idShort": "Line",
+                        "modelType": "SubmodelElementCollection",
+                        "value": [_property("Pin", "1234", description=[{"text": "old"}])],
+                    },
+                ],
+            }
+        ],
+    }
+
+
+def _write(tmp_path, doc, name="aas.json", **dump) -> str:
+    path = tmp_path / name
+    path.write_text(json.dumps(doc, **dump))
+    return str(path)
+
+
+def _shard_paths(tmp_path, *indices, stem="aas"):
+    return [tmp_path / f"{stem}_shard_{idx}.json" for idx in indices]
+
+
+@pytest.mark.parametrize("dump", [{"indent": 2}, {}, {"separators": (",", ":")}])
+def test_stream_roundtrip_restores_original_bytes(tmp_path, dump) -> None:
+    source = _write(tmp_path, _make_sample(), **dump)
+    paths = stream.split_aas_stream(source, ["MasterKey", "Recipe_*", "Batch"], 3, 2)
+    assert len(paths) == 3
+
+    first = json.loads(paths[0].read_text())
+    elements = first["submodels"][0]["submodelElements"]
+    assert shard._parse_shard_value(elements[0]["value"]) is not None
+    assert elements[0]["description"] == shard._shard_description()
+
+    output = tmp_path / "restored.json"
+    recovered = stream.combine_aas_stream(paths[1:], ["MasterKey", "Recipe_*", "Batch"], output)
+    assert recovered == {
+        "MasterKey": "TopSecretValue",
+        "Recipe_A": 'sugar { "quoted" ] }',
+        "Recipe_B": "Ünïcödé",
+        "Batch": "42",
+    }
+    restored = json.loads(output.read_text())
+    assert restored["submodels"][0]["submodelElements"][3]["value"] == "42"
+    expected = _make_sample()
+    expected["submodels"][0]["submodelElements"][3]["value"] = "42"
+    assert restored == expected
+
+
+def test_stream_output_only_touches_targets(tmp_path) -> None:
+    source = _write(tmp_path, _make_sample(), indent=4)
+    original = (tmp_path / "aas.json").read_bytes()
+    (path,) = stream.split_aas_stream(source, "MasterKey", 1, 1)
+    written = path.read_bytes()
+    prefix = original[: original.index(b"TopSecretValue") - 1]
+    suffix = original[original.index(b'"idShort": "Recipe_A"') :]
+    assert written.startswith(prefix)
+    assert written.endswith(suffix)
+
+
+def test_stream_and_in_memory_paths_interoperate(tmp_path) -> None:
+    source = _write(tmp_path, _make_sample(), indent=2)
+    stream.split_aas_stream(source, "ProductionParams/Line/Pin", 3, 2, backend=shard.BACKEND_GF256)
+    in_memory = tmp_path / "in_memory.json"
+    assert (
+        shard.combine_aas(_shard_paths(tmp_path, 1, 3), "ProductionParams/Line/Pin", in_memory)
+        == "1234"
+    )
+
+    shard.split_aas(source, "ProductionParams/Line/Pin", 3, 2)
+    streamed = tmp_path / "streamed.json"
+    recovered = shard.combine_aas_many(
+        _shard_paths(tmp_path, 2, 3), "ProductionParams/Line/Pin", streamed, streaming=True
+    )
+    assert recovered == {"ProductionParams/Line/Pin": "1234"}
+    assert json.loads(streamed.read_text()) == json.loads(in_memory.read_text())
+
+
+def test_stream_existing_description_is_replaced(tmp_path) -> None:
+    source = _write(tmp_path, _make_sample())
+    paths = stream.split_aas_stream(source, "Pin", 2, 2)
+    pin = json.loads(paths[0].read_text())["submodels"][0]["submodelElements"][4]["value"][0]
+    assert pin["description"] == shard._shard_description()
+
+    output = tmp_path / "restored.json"
+    stream.combine_aas_stream(paths, "Pin", output)
+    pin = json.loads(output.read_text())["submodels"][0]["submodelElements"][4]["value"][0]
+    assert pin == {"idShort": "Pin", "modelType": "Property", "value": "1234"}
+
+
+def test_stream_selection_errors(tmp_path) -> None:
+    doc = _make_sample()
+    doc["submodels"].append({"idShort": "Other", "submodelElements": [_property("Pin", "x")]})
+    source = _write(tmp_path, doc)
+    with pytest.raises(DuplicateElementError):
+        stream.split_aas_stream(source, "Pin", 2, 2)
+    with pytest.raises(ValueError, match="no elements match"):
+        stream.split_aas_stream(source, "Missing*", 2, 2)
+    with pytest.raises(ValueError, match="'Line'.*collection"):
+        stream.split_aas_stream(
+            source, ["Line", "ProductionParams/Line/Pin"], 2, 2, backend="gf256"
+        )
+    assert stream.split_aas_stream(source, r"Other/P.n", 2, 2, regex=True)
+
+
+def test_stream_rejects_malformed_and_empty_input(tmp_path) -> None:
+    broken = tmp_path / "broken.json"
+    broken.write_text('{"submodels": [{"idShort": "A", "value": "x"}')
+    with pytest.raises(ValueError, match="unbalanced"):
+        stream.split_aas_stream(broken, "A", 2, 2)
+    empty = tmp_path / "empty.json"
+    empty.write_text("")
+    with pytest.raises(ValueError, match="empty"):
+        stream.split_aas_stream(empty, "A", 2, 2)
+
+
+def test_stream_split_memory_is_bounded_by_targets(tmp_path) -> None:
+    filler = [_property(f"Filler{i}", "x" * 200) for i in range(20_000)]
+    doc = {"submodels": [{"idShort": "Big", "submodelElements": filler + [_property("Key", "v")]}]}
+    source = _write(tmp_path, doc)
+    size = (tmp_path / "aas.json").stat().st_size
+    assert size > 4_000_000
+
+    tracemalloc.start()
+    try:
+        stream.split_aas_stream(source, "Key", 3, 2)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    assert peak < size / 2
+
+
+def test_cli_stream_flag(tmp_path, monkeypatch, capsys) -> None:
+    source = _write(tmp_path, _make_sample())
+    monkeypatch.chdir(tmp_path)
+    assert shard.main(["split", source, "MasterKey", "-n", "3", "-k", "2", "--stream"]) == 0
+    files = [str(path) for path in _shard_paths(tmp_path, 1, 2)]
+    assert shard.main(["combine", "MasterKey", *files, "-o", "out.json", "--stream"]) == 0
+    assert "TopSecretValue" in capsys.readouterr().out
+
+
+_names = st.sampled_from(["A", "B", "Key", "k/ey", "Ä"])
+_scalars = st.one_of(st.none(), st.booleans(), st.integers(), st.text(max_size=8))
+_nodes = st.recursive(
+    _scalars,
+    lambda children: st.one_of(
+        st.lists(children, max_size=4),
+        st.dictionaries(st.sampled_from(["idShort", "value", "x", "description"]), children),
+        st.fixed_dictionaries({"idShort": _names, "value": children}),
+    ),
+    max_leaves=25,
+)
+
+
+@given(_nodes, st.sampled_from([None, 1]))
+def test_scan_matches_element_index(node, indent) -> None:
+    doc = {"environment": node}
+    raw = json.dumps(doc, indent=indent).encode()
+    expected = [
+        (name, path, json.dumps(elem["value"], sort_keys=True))
+        for name, path, elem in ElementIndex(doc).entries()
+    ]
+    found = [
+        (e.id_short, e.path(), json.dumps(json.loads(raw[slice(*e.value)]), sort_keys=True))
+        for e in stream._scan(raw, lambda name: True)
+    ]
+    # The scanner reports elements as they close, i.e. children before parents.
+    assert sorted(found) == sorted(expected)
@@ -0,0 +1,135 @@
+import asyncio
+
+import pytest
+
+from aas_holo_shard.storage import async_ipfs, ipfs
+
+
+def test_async_roundtrip_reuses_connections(fake_ipfs) -> None:
+    shares = [(idx, bytes([idx]) * 32) for idx in range(1, 41)]
+
+    async def scenario():
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url, concurrency=4) as client:
+            cids = await client.store_shares(shares)
+            fetched = await client.fetch_shares(cids)
+            return cids, fetched, client.pool.created
+
+    cids, fetched, created = asyncio.run(scenario())
+    assert fetched == shares
+    assert len(set(cids)) == len(shares)
+    assert created <= 4
+    assert fake_ipfs.requests == 80
+
+
+def test_async_helpers_without_client(fake_ipfs) -> None:
+    cids = asyncio.run(async_ipfs.store_shares_async([(1, b"abc")], base_url=fake_ipfs.url))
+    assert ipfs.deserialize_share(fake_ipfs.blocks[cids[0]]) == (1, b"abc")
+    fetched = asyncio.run(async_ipfs.fetch_shares_async(cids, base_url=fake_ipfs.url))
+    assert fetched == [(1, b"abc")]
+
+
+def test_async_helpers_binary_wire_format(fake_ipfs) -> None:
+    share = (2, b"\x00" * 32)
+    binary = ipfs.serialize_share(share, wire_format=ipfs.WIRE_BINARY)
+
+    async def scenario():
+        cids = await async_ipfs.store_shares_async(
+            [share], base_url=fake_ipfs.url, wire_format=ipfs.WIRE_BINARY
+        )
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url) as client:
+            cids += await async_ipfs.store_shares_async(
+                [share], client, wire_format=ipfs.WIRE_BINARY
+            )
+        return cids
+
+    cids = asyncio.run(scenario())
+    assert [fake_ipfs.blocks[cid] for cid in cids] == [binary, binary]
+    assert asyncio.run(async_ipfs.fetch_shares_async(cids, base_url=fake_ipfs.url)) == [share] * 2
+
+
+def test_async_retries_transient_errors(fake_ipfs) -> None:
+    fake_ipfs.fail_next = 2
+    cid = fake_ipfs.add(ipfs.serialize_share((3, b"xyz")))
+
+    async def scenario():
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url, retries=2, backoff=0) as client:
+            return await client.fetch_shares([cid])
+
+    assert asyncio.run(scenario()) == [(3, b"xyz")]
+    assert fake_ipfs.requests == 3
+
+
+def test_async_gives_up_and_times_out(fake_ipfs) -> None:
+    fake_ipfs.delays["slow"] = 0.5
+
+    async def fetch(cid, **options):
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url, backoff=0, **options) as client:
+            return await client.cat(cid)
+
+    with pytest.raises(ipfs.IPFSUnavailable):
+        asyncio.run(fetch("missing", retries=3))
+    with pytest.raises(ipfs.IPFSUnavailable):
+        asyncio.run(fetch("slow", retries=0, timeout=0.05))
+
+
+def test_async_client_validation() -> None:
+    with pytest.raises(ValueError):
+        async_ipfs.AsyncIPFSClient("ftp://host")
+    with pytest.raises(ValueError):
+        async_ipfs.AsyncIPFSClient(concurrency=0)
+    with pytest.raises(ValueError):
+        async_ipfs.AsyncIPFSClient(retries=-1)
+
+
+def _store(fake_ipfs, count: int):
+    return [
+        fake_ipfs.add(ipfs.serialize_share((idx, bytes([idx]) * 32))) for idx in range(1, count + 1)
+    ]
+
+
+def test_quorum_ignores_slow_and_broken_holders(fake_ipfs) -> None:
+    cids = _store(fake_ipfs, 5)
+    fake_ipfs.delays[cids[0]] = 2.0
+    fake_ipfs.blocks[cids[1]] = b"not a share"
+
+    async def scenario():
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url, retries=0) as client:
+            return await client.fetch_quorum(cids, 3)
+
+    result = asyncio.run(scenario())
+    assert sorted(idx for idx, _ in result.shares) == [3, 4, 5]
+    assert [resp.index for resp in result.responders] == [idx for idx, _ in result.shares]
+    assert result.elapsed < 1.0
+    assert cids[1] in result.failures
+    assert cids[0] in result.cancelled
+
+
+def test_quorum_hedges_after_delay(fake_ipfs) -> None:
+    cids = _store(fake_ipfs, 4)
+    fake_ipfs.delays[cids[0]] = 2.0
+
+    async def scenario():
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url, retries=0) as client:
+            result = await client.fetch_quorum(cids, 2, hedge_after=0.05)
+            return result, client.latency_percentile(0.5)
+
+    result, median = asyncio.run(scenario())
+    assert {resp.index for resp in result.responders} in ({2, 3}, {2, 4}, {3, 4})
+    assert result.elapsed < 1.0
+    assert median is not None and median < 1.0
+    assert fake_ipfs.requests <= 4
+
+
+def test_quorum_without_enough_shares(fake_ipfs) -> None:
+    cids = _store(fake_ipfs, 2) + ["missing-1", "missing-2"]
+
+    with pytest.raises(ipfs.IPFSUnavailable):
+        asyncio.run(
+            async_ipfs.fetch_quorum_async(
+                cids, 3, hedge_after=10, base_url=fake_ipfs.url, retries=0
+            )
+        )
+    with pytest.raises(ValueError):
+        asyncio.run(async_ipfs.fetch_quorum_async(cids, 5, base_url=fake_ipfs.url))
+    with pytest.raises(ValueError):
+        async_ipfs.AsyncIPFSClient().latency_percentile(2)
@@ -0,0 +1,171 @@
+import csv
+import json
+
+import pytest
+
+from aas_holo_shard.aas import batch, shard
+
+
+def _doc(secret: str) -> dict:
+    return {
+        "submodels": [
+            {
+                "idShort": "Params",
+                "submodelElements": [
+                    {"idShort": "MasterKey", "modelType": "Property", "value": secret},
+                    {"idShort": "Public", "modelType": "Property", "value": "visible"},
+                ],
+            }
+        ]
+    }
+
+
+def _tree(root) -> dict:
+    secrets = {"a.json": "alpha", "b.json": "beta", "nested/c.json": "gamma"}
+    for name, secret in secrets.items():
+        path = root / name
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(json.dumps(_doc(secret)))
+    return secrets
+
+
+def _value(path) -> str:
+    return json.loads(path.read_text())["submodels"][0]["submodelElements"][0]["value"]
+
+
+@pytest.mark.parametrize("workers", [1, 2])
+def test_split_and_combine_batch_roundtrip(tmp_path, workers) -> None:
+    secrets = _tree(tmp_path / "in")
+    (tmp_path / "in" / "a_shard_1.json").write_text("{}")  # stale shard files are ignored
+
+    tasks = batch.discover_split_tasks([tmp_path / "in"], tmp_path / "shards", "MasterKey")
+    assert len(tasks) == 3
+    result = batch.run_split_batch(tasks, 3, 2, workers=workers)
+    assert result.summary() == {"total": 3, "ok": 3, "failed": 0, "skipped": 0}
+    assert (tmp_path / "shards" / "nested" / "c_shard_3.json").exists()
+    assert not (tmp_path / "in" / "b_shard_1.json").exists()
+
+    for index in (2, 3):
+        for path in (tmp_path / "shards").rglob(f"*_shard_{index}.json"):
+            custodian = tmp_path / f"custodian{index}" / path.relative_to(tmp_path / "shards")
+            custodian.parent.mkdir(parents=True, exist_ok=True)
+            path.replace(custodian)
+
+    tasks = batch.discover_combine_tasks(
+        [tmp_path / "custodian2", tmp_path / "custodian3"], tmp_path / "out", "MasterKey"
+    )
+    result = batch.run_combine_batch(tasks, workers=workers, streaming=True)
+    assert result.ok == 3
+    for name, secret in secrets.items():
+        assert _value(tmp_path / "out" / name) == secret
+
+
+def test_failures_are_recorded_and_batch_continues(tmp_path) -> None:
+    _tree(tmp_path / "in")
+    (tmp_path / "in" / "broken.json").write_text("{not json")
+    tasks = batch.discover_split_tasks([tmp_path / "in"], tmp_path / "out", "MasterKey")
+    seen = []
+    result = batch.run_split_batch(
+        tasks, 2, 2, workers=1, progress=lambda record, done, total: seen.append((done, total))
+    )
+    assert (result.ok, result.failed) == (3, 1)
+    (failure,) = [record for record in result.records if record.status == batch.STATUS_FAILED]
+    assert failure.task.endswith("broken.json")
+    assert failure.outputs == ()
+    assert failure.error
+    assert seen == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_journal_resumes_only_unchanged_tasks(tmp_path) -> None:
+    _tree(tmp_path / "in")
+    journal = tmp_path / "run.journal"
+    tasks = batch.discover_split_tasks([tmp_path / "in"], tmp_path / "out", "MasterKey")
+    first = batch.run_split_batch(tasks, 3, 2, workers=1, journal=journal)
+    assert first.ok == 3
+
+    with journal.open("a") as handle:
+        handle.write('{"task": "cut sho')  # interrupted mid-write
+    (tmp_path / "in" / "a.json").write_text(json.dumps(_doc("changed")))
+    (tmp_path / "out" / "b_shard_2.json").unlink()
+
+    second = batch.run_split_batch(tasks, 3, 2, workers=1, journal=journal)
+    status = {record.task.rsplit("/", 1)[-1]: record.status for record in second.records}
+    assert status == {"a.json": "ok", "b.json": "ok", "c.json": "skipped"}
+
+    changed_options = batch.run_split_batch(tasks, 3, 3, workers=1, journal=journal)
+    assert changed_options.skipped == 0
+
+    fresh = batch.run_split_batch(tasks, 3, 3, workers=1, journal=journal, resume=False)
+    assert fresh.skipped == 0
+    assert len(journal.read_text().splitlines()) == 3
+
+
+def test_manifests_and_reports(tmp_path) -> None:
+    _tree(tmp_path / "in")
+    manifest = tmp_path / "split.csv"
+    manifest.write_text("file,id,output_dir\nin/a.json,,first\nin/b.json,Mast.*,\n")
+    tasks = batch.load_split_manifest(manifest, tmp_path / "out", "MasterKey", regex=True)
+    assert [task.output_dir for task in tasks] == [
+        str(tmp_path / "out" / "first"),
+        str(tmp_path / "out"),
+    ]
+    assert tasks[1].target_id == ("Mast.*",)
+    result = batch.run_split_batch(tasks, 2, 2, workers=1, regex=True)
+
+    report = batch.write_report(result, tmp_path / "report.csv")
+    with report.open(newline="") as handle:
+        rows = list(csv.DictReader(handle))
+    assert [row["status"] for row in rows] == ["ok", "ok"]
+    assert rows[0]["outputs"].split(";")[1].endswith("first/a_shard_2.json")
+
+    combine = tmp_path / "combine.json"
+    combine.write_text(
+        json.dumps([{"output": "a.json", "files": ["out/first/a_shard_1.json", "missing.json"]}])
+    )
+    tasks = batch.load_combine_manifest(combine, tmp_path / "restored", "MasterKey")
+    result = batch.run_combine_batch(tasks, workers=1)
+    assert result.failed == 1
+    data = json.loads(batch.write_report(result, tmp_path / "report.json").read_text())
+    assert data["summary"]["failed"] == 1
+    assert "alpha" not in json.dumps(data)
+
+
+def test_planning_rejects_bad_input(tmp_path) -> None:
+    (tmp_path / "x").mkdir()
+    (tmp_path / "x" / "a.json").write_text("{}")
+    (tmp_path / "a.json").write_text("{}")
+    with pytest.raises(ValueError, match="two tasks"):
+        batch.discover_split_tasks([tmp_path / "x", tmp_path / "a.json"], tmp_path, "K")
+    manifest = tmp_path / "m.json"
+    manifest.write_text(json.dumps([{"file": "a.json"}]))
+    with pytest.raises(ValueError, match="no idShort"):
+        batch.load_split_manifest(manifest, tmp_path)
+    with pytest.raises(ValueError):
+        batch.run_split_batch([], 2, 3)
+
+
+def test_cli_batch_commands(tmp_path, capsys) -> None:
+    secrets = _tree(tmp_path / "in")
+    shards, out, report = tmp_path / "shards", tmp_path / "out", tmp_path / "report.json"
+    argv = ["split-batch", "MasterKey", str(tmp_path / "in"), "-o", str(shards), "-j", "1"]
+    assert shard.main(argv) == 0
+    assert (shards / ".split-batch.journal").exists()
+    assert "3 tasks: 3 ok, 0 failed, 0 skipped" in capsys.readouterr().out
+    assert shard.main(argv + ["--report", str(report)]) == 0
+    assert json.loads(report.read_text())["summary"]["skipped"] == 3
+
+    for path in shards.rglob("*_shard_1.json"):
+        path.unlink()
+    argv = ["combine-batch", "MasterKey", str(shards), "-o", str(out), "-j", "2", "-q"]
+    assert shard.main(argv) == 0
+    for name, secret in secrets.items():
+        assert _value(out / name) == secret
+
+    (shards / "a_shard_2.json").unlink()
+    (shards / "a_shard_3.json").write_text("{}")
+    assert shard.main(argv + ["--no-resume"]) == 1
+    captured = capsys.readouterr()
+    assert "1 failed" in captured.out
+
+    assert shard.main(["combine-batch", "MasterKey", "-o", str(out)]) == 1
+    assert "nothing to do" in capsys.readouterr().err
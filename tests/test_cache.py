@@ -0,0 +1,109 @@
+import asyncio
+
+import pytest
+
+from aas_holo_shard.storage import async_ipfs, ipfs
+from aas_holo_shard.storage.cache import (
+    DiskCache,
+    MemoryCache,
+    ShareCache,
+    compute_cid,
+    verify_cid,
+)
+
+
+class CountingClient:
+    def __init__(self):
+        self.store = {}
+        self.cats = 0
+
+    def add_bytes(self, payload: bytes) -> str:
+        cid = compute_cid(payload)
+        self.store[cid] = payload
+        return cid
+
+    def cat(self, cid: str) -> bytes:
+        self.cats += 1
+        return self.store[cid]
+
+
+def test_compute_and_verify_cid() -> None:
+    payload = b"hello world\n"
+    assert compute_cid(payload) == "QmT78zSuBmuS4z925WZfrqQ1qHaJ56DQaTfyMUF7F8ff5o"
+    assert compute_cid(b"") == "QmbFMke1KXqnYyBBWxB74N4c5SBnJMVAiMNRcGu6x1AwQH"
+    cid_v1 = compute_cid(payload, version=1)
+    assert cid_v1.startswith("bafkrei")
+
+    assert verify_cid(compute_cid(payload), payload) is True
+    assert verify_cid(cid_v1, payload) is True
+    assert verify_cid(cid_v1, b"tampered") is False
+    assert verify_cid("cid-0", payload) is None
+
+
+def test_memory_cache_lru_and_ttl() -> None:
+    now = [0.0]
+    cache = MemoryCache(max_bytes=10, ttl=5, clock=lambda: now[0])
+    cache.put("a", b"aaaa")
+    cache.put("b", b"bbbb")
+    assert cache.get("a") == b"aaaa"
+    cache.put("c", b"cccc")  # evicts "b", the least recently used entry
+    assert "b" not in cache and cache.get("a") == b"aaaa"
+    assert cache.stats.evictions == 1
+
+    now[0] = 6.0
+    assert cache.get("c") is None
+    assert cache.stats.expired == 1
+    assert (cache.stats.hits, cache.stats.misses) == (2, 1)
+
+
+def test_disk_cache_persists_and_detects_corruption(tmp_path) -> None:
+    payload = b"share payload"
+    cid = compute_cid(payload)
+    DiskCache(tmp_path).put(cid, payload)
+
+    reopened = DiskCache(tmp_path)
+    assert reopened.size == len(payload)
+    assert reopened.get(cid) == payload
+
+    (tmp_path / cid[-2:] / cid).write_bytes(b"bit rot")
+    assert reopened.get(cid) is None
+    assert reopened.stats.corrupt == 1
+    assert not (tmp_path / cid[-2:] / cid).exists()
+
+    small = DiskCache(tmp_path / "small", max_bytes=20)
+    for index in range(3):
+        small.put(f"key{index}", bytes(10))
+    assert small.size <= 20 and small.get("key0") is None
+    assert small.get("../escape") is None
+
+
+def test_fetch_shares_serves_repeats_from_cache(tmp_path) -> None:
+    client = CountingClient()
+    shares = [(1, b"abc"), (2, b"def")]
+    cids = ipfs.store_shares(shares, client=client)
+
+    cache = ShareCache(disk=DiskCache(tmp_path))
+    assert ipfs.fetch_shares(cids, client=client, cache=cache) == shares
+    assert ipfs.fetch_shares(cids, client=client, cache=cache) == shares
+    assert client.cats == 2
+    assert (cache.stats.hits, cache.stats.misses) == (2, 2)
+
+    warm = ShareCache(disk=DiskCache(tmp_path))
+    assert ipfs.fetch_shares(cids, client=object(), cache=warm) == shares
+
+    client.store[cids[0]] = b"forged"
+    with pytest.raises(ValueError, match="does not match"):
+        ipfs.fetch_shares(cids[:1], client=client, cache=ShareCache())
+
+
+def test_async_client_uses_cache(fake_ipfs) -> None:
+    cache = ShareCache()
+
+    async def scenario():
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url, cache=cache) as client:
+            cids = await client.store_shares([(1, b"abc"), (2, b"def")])
+            return await client.fetch_shares(cids)
+
+    assert asyncio.run(scenario()) == [(1, b"abc"), (2, b"def")]
+    assert fake_ipfs.requests == 2
+    assert cache.stats.hits == 2
@@ -0,0 +1,67 @@
+import random
+
+import pytest
+
+from aas_holo_shard.core import cdc, shamir
+
+SIZES = {"min_size": 512, "avg_size": 2048, "max_size": 8192}
+
+
+def _payload(seed: int, size: int) -> bytes:
+    return random.Random(seed).randbytes(size)
+
+
+def test_boundaries_resync_after_an_insert() -> None:
+    gear = cdc._gear_table(b"k" * 32)
+    data = _payload(1, 100_000)
+    edited = data[:50_000] + b"inserted bytes" + data[50_000:]
+
+    cuts = cdc.chunk_boundaries(data, gear, **SIZES)
+    edited_cuts = cdc.chunk_boundaries(edited, gear, **SIZES)
+    assert cuts[-1] == len(data)
+    assert all(SIZES["min_size"] < b - a <= SIZES["max_size"] for a, b in zip(cuts, cuts[1:-1]))
+    shifted = {cut + 14 for cut in cuts if cut > 50_000}
+    assert len(shifted & set(edited_cuts)) >= len(shifted) - 2
+
+
+def test_revisions_only_store_changed_chunks(tmp_path) -> None:
+    store = cdc.DirectoryChunkStore(tmp_path)
+    first_data = _payload(2, 200_000)
+    first, shares = cdc.encrypt_and_split_revision(first_data, store, threshold=2, total=3, **SIZES)
+    assert first.stats.new_chunks == first.stats.chunks == len(store)
+    assert first.stats.dedup_ratio == 0.0
+
+    second_data = first_data[:120_000] + b"changed" + first_data[120_100:]
+    second = cdc.encrypt_revision(second_data, store, shares[1:], **SIZES)
+    assert second.stats.new_chunks <= 3
+    assert second.stats.dedup_ratio > 0.9
+    assert second.stats.bytes_saved == len(second_data) - second.stats.bytes_new
+
+    assert cdc.decrypt_revision(first.manifest, store, shares[:2]) == first_data
+    assert cdc.decrypt_revision(second.manifest, store, shares[::2]) == second_data
+
+    same = cdc.encrypt_revision(second_data, store, shares[:2], **SIZES)
+    assert same.stats.new_chunks == 0 and same.stats.dedup_ratio == 1.0
+
+
+def test_tampered_or_missing_chunks_are_rejected() -> None:
+    store = {}
+    revision, shares = cdc.encrypt_and_split_revision(
+        _payload(3, 20_000), store, threshold=1, total=1, **SIZES
+    )
+    chunk_id = next(iter(store))
+    blob = bytearray(store[chunk_id])
+    blob[-1] ^= 1
+    store[chunk_id] = bytes(blob)
+    with pytest.raises(shamir.CryptoError, match="verification"):
+        cdc.decrypt_revision(revision.manifest, store, shares)
+
+    del store[chunk_id]
+    with pytest.raises(shamir.CryptoError, match="missing"):
+        cdc.decrypt_revision(revision.manifest, store, shares)
+
+    _, other = cdc.encrypt_and_split_revision(b"x", {}, threshold=1, total=1)
+    with pytest.raises(shamir.CryptoError, match="manifest"):
+        cdc.decrypt_revision(revision.manifest, store, other)
+    with pytest.raises(shamir.CryptoError):
+        cdc.chunk_boundaries(b"", [0] * 256, min_size=1, avg_size=3, max_size=8)
@@ -0,0 +1,109 @@
+import io
+import zipfile
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from hypothesis import given, strategies as st
+
+from aas_holo_shard.core import chunked, shamir
+
+
+@given(st.binary(max_size=3000), st.integers(min_value=1, max_value=512))
+def test_chunked_roundtrip(data: bytes, chunk_size: int) -> None:
+    encrypted, shares = chunked.encrypt_and_split_chunked(
+        data, threshold=2, total=3, chunk_size=chunk_size, workers=4
+    )
+    assert encrypted.startswith(chunked.MAGIC)
+    assert shamir.reconstruct_and_decrypt(encrypted, shares[1:]) == data
+
+
+@given(
+    st.binary(min_size=1, max_size=2000),
+    st.integers(min_value=0, max_value=2100),
+    st.integers(min_value=0, max_value=700),
+)
+def test_decrypt_range(data: bytes, offset: int, length: int) -> None:
+    encrypted, shares = chunked.encrypt_and_split_chunked(data, threshold=1, total=1, chunk_size=97)
+    assert (
+        chunked.decrypt_range(encrypted, shares, offset, length) == data[offset : offset + length]
+    )
+
+
+def test_reader_opens_zip_entry_from_file(tmp_path) -> None:
+    package = io.BytesIO()
+    with zipfile.ZipFile(package, "w") as archive:
+        archive.writestr("aasx/cad/model.step", b"\0" * 200_000)
+        archive.writestr("aasx/submodel.json", b'{"idShort": "Nameplate"}')
+
+    path = tmp_path / "package.ahs2"
+    encrypted, shares = chunked.encrypt_and_split_chunked(
+        package.getvalue(), threshold=2, total=2, chunk_size=4096
+    )
+    path.write_bytes(encrypted)
+
+    with path.open("rb") as handle, ThreadPoolExecutor(2) as pool:
+        reader = chunked.open_chunked(handle, shares, executor=pool)
+        with zipfile.ZipFile(io.BufferedReader(reader)) as archive:
+            assert archive.read("aasx/submodel.json") == b'{"idShort": "Nameplate"}'
+        assert reader.read_range(0, 4) == b"PK\x03\x04"
+
+
+def test_chunked_tamper_detection() -> None:
+    data = bytes(range(256)) * 10
+    encrypted, shares = chunked.encrypt_and_split_chunked(
+        data, threshold=1, total=1, chunk_size=256
+    )
+
+    body = bytearray(encrypted)
+    body[-1] ^= 0x01
+    with pytest.raises(shamir.CryptoError):
+        shamir.reconstruct_and_decrypt(bytes(body), shares)
+    # Untouched chunks stay readable.
+    assert chunked.decrypt_range(bytes(body), shares, 0, 256) == data[:256]
+
+    swapped = bytearray(encrypted)
+    tags = chunked.HEADER_SIZE
+    swapped[tags : tags + 16], swapped[tags + 16 : tags + 32] = (
+        encrypted[tags + 16 : tags + 32],
+        encrypted[tags : tags + 16],
+    )
+    with pytest.raises(shamir.CryptoError):
+        chunked.decrypt_range(bytes(swapped), shares, 0, 10)
+
+    with pytest.raises(shamir.CryptoError):
+        chunked.open_chunked(encrypted[:-1], shares)
+
+
+def test_chunked_header_errors() -> None:
+    key = b"k" * 32
+    with pytest.raises(shamir.CryptoError):
+        chunked.encrypt_chunked(b"data", b"short")
+    with pytest.raises(shamir.CryptoError):
+        chunked.encrypt_chunked(b"data", key, chunk_size=0)
+    with pytest.raises(shamir.CryptoError):
+        chunked.ChunkedHeader.parse(b"AHS2")
+    encrypted = bytearray(chunked.encrypt_chunked(b"data", key))
+    encrypted[4] = 0x80
+    with pytest.raises(shamir.CryptoError):
+        chunked.decrypt_chunked(bytes(encrypted), key)
+    with pytest.raises(shamir.CryptoError):
+        chunked.decrypt_chunked(b"AHS1" + bytes(64), key)
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+def test_decrypt_into_writes_chunks_in_place(workers) -> None:
+    data = bytes(range(256)) * 50
+    encrypted, shares = chunked.encrypt_and_split_chunked(
+        data, threshold=2, total=3, chunk_size=1000
+    )
+    key = shamir._combine_key(shares[:2])
+    out = bytearray(len(data))
+    reader = chunked.ChunkedReader(memoryview(encrypted), key, workers=workers)
+    assert reader.read_all_into(out) == len(data)
+    assert out == data
+
+    tampered = bytearray(encrypted)
+    tampered[-1] ^= 1
+    with pytest.raises(shamir.CryptoError, match="chunk 12"):
+        shamir.decrypt_into(tampered, out, shares[1:])
+    assert out == bytes(len(data))
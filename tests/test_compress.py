@@ -0,0 +1,167 @@
+import asyncio
+import io
+import json
+import sys
+import types
+import zlib
+
+import pytest
+
+from aas_holo_shard.core import compress, service, shamir, stream
+
+
+def _aas(serial: int) -> bytes:
+    elements = [
+        {
+            "idShort": f"Property{i}",
+            "modelType": "Property",
+            "valueType": "xs:string",
+            "value": f"value-{serial}-{i}",
+        }
+        for i in range(4)
+    ]
+    return json.dumps({"submodels": [{"idShort": "Nameplate", "submodelElements": elements}]})
+
+
+@pytest.mark.parametrize("codec", ["zlib", "lzma"])
+@pytest.mark.parametrize("level", [None, 1, 9])
+def test_compressed_roundtrip_is_detected(codec, level) -> None:
+    data = _aas(0).encode() * 200
+    encrypted, shares = shamir.encrypt_and_split(
+        data, threshold=2, total=3, compression=codec, level=level
+    )
+    assert encrypted.startswith(compress.MAGIC)
+    assert len(encrypted) < len(data) // 10
+    assert shamir.reconstruct_and_decrypt(encrypted, shares[1:]) == data
+
+    out = bytearray(len(data))
+    assert shamir.decrypt_into(encrypted, out, shares[:2]) == len(data)
+    assert out == data
+
+
+def test_incompressible_payload_stays_ahs1() -> None:
+    data = zlib.compress(b"already compressed AASX" * 100, 9)
+    encrypted, shares = shamir.encrypt_and_split(data, threshold=1, total=1, compression="zlib")
+    assert encrypted.startswith(shamir.MAGIC)
+    assert shamir.reconstruct_and_decrypt(encrypted, shares) == data
+
+
+def test_header_and_body_are_authenticated() -> None:
+    encrypted, shares = shamir.encrypt_and_split(
+        b"a" * 1000, threshold=1, total=1, compression="zlib"
+    )
+    for position in (4, len(encrypted) - 1):  # codec id, ciphertext
+        tampered = bytearray(encrypted)
+        tampered[position] ^= 2
+        with pytest.raises(shamir.CryptoError, match="MAC"):
+            shamir.reconstruct_and_decrypt(bytes(tampered), shares)
+        with pytest.raises(shamir.CryptoError, match="MAC"):
+            stream.decrypt_stream(io.BytesIO(bytes(tampered)), io.BytesIO(), shares)
+
+
+def test_streaming_compression(tmp_path) -> None:
+    data = _aas(1).encode() * 500
+    dst = io.BytesIO()
+    shares = stream.encrypt_stream(
+        io.BytesIO(data), dst, threshold=2, total=2, chunk_size=1000, compression="lzma", level=3
+    )
+    blob = dst.getvalue()
+    assert blob.startswith(compress.MAGIC) and len(blob) < len(data) // 10
+    assert shamir.reconstruct_and_decrypt(blob, shares) == data
+    out = io.BytesIO()
+    assert stream.decrypt_stream(io.BytesIO(blob), out, shares, chunk_size=7) == len(data)
+    assert out.getvalue() == data
+
+    source, target, restored = tmp_path / "a.json", tmp_path / "a.ahz", tmp_path / "b.json"
+    source.write_bytes(data)
+    shares = stream.encrypt_file_and_split(source, target, threshold=1, total=1, compression="zlib")
+    assert stream.reconstruct_and_decrypt_file(target, restored, shares) == len(data)
+    assert restored.read_bytes() == data
+
+    with pytest.raises(shamir.CryptoError, match="require a compression codec"):
+        stream.encrypt_stream(io.BytesIO(data), io.BytesIO(), threshold=1, total=1, level=3)
+    with pytest.raises(shamir.CryptoError, match="level must be"):
+        shamir.encrypt_and_split(data, threshold=1, total=1, compression="zlib", level=12)
+
+
+def test_trained_dictionary_helps_small_documents(tmp_path) -> None:
+    dictionary = compress.train_dictionary([_aas(i).encode() for i in range(20)])
+    assert 0 < len(dictionary) <= compress.DEFAULT_DICTIONARY_SIZE
+    document = _aas(99).encode()
+
+    plain, _ = shamir.encrypt_and_split(document, threshold=1, total=1, compression="zlib")
+    encrypted, shares = shamir.encrypt_and_split(
+        document, threshold=1, total=1, compression="zlib", dictionary=dictionary
+    )
+    assert len(encrypted) < len(plain) * 0.7
+    with pytest.raises(shamir.CryptoError, match="dictionary"):
+        shamir.reconstruct_and_decrypt(encrypted, shares)
+    recovered = shamir.reconstruct_and_decrypt(encrypted, shares, dictionaries=[b"x", dictionary])
+    assert recovered == document
+
+    path = tmp_path / "small.ahz"
+    path.write_bytes(encrypted)
+
+    async def scenario():
+        svc = service.ReconstructionService(workers=1, dictionaries=[dictionary])
+        try:
+            await svc.load(path, shares)
+            return await svc.read(path, 2, 10)
+        finally:
+            await svc.aclose()
+
+    assert asyncio.run(scenario()).data == document[2:12]
+
+    with pytest.raises(shamir.CryptoError, match="does not support"):
+        shamir.encrypt_and_split(
+            document, threshold=1, total=1, compression="lzma", dictionary=dictionary
+        )
+
+
+def test_zstd_adapter(monkeypatch) -> None:
+    class ZstdCompressionDict:
+        def __init__(self, data):
+            self.data = data
+
+    class ZstdCompressor:
+        def __init__(self, level, dict_data=None):
+            self.args = (level, dict_data.data if dict_data else b"")
+
+        def compressobj(self):
+            level, zdict = self.args
+            return zlib.compressobj(level % 10, zlib.DEFLATED, zlib.MAX_WBITS, zdict=zdict)
+
+    class ZstdDecompressor:
+        def __init__(self, dict_data=None):
+            self.zdict = dict_data.data if dict_data else b""
+
+        def decompressobj(self):
+            return zlib.decompressobj(zlib.MAX_WBITS, zdict=self.zdict)
+
+    fake = types.SimpleNamespace(
+        ZstdCompressionDict=ZstdCompressionDict,
+        ZstdCompressor=ZstdCompressor,
+        ZstdDecompressor=ZstdDecompressor,
+        train_dictionary=lambda size, samples: types.SimpleNamespace(
+            as_bytes=lambda: b"".join(samples)[:size]
+        ),
+    )
+    monkeypatch.setitem(sys.modules, "compression", None)
+    monkeypatch.setitem(sys.modules, "zstandard", fake)
+    monkeypatch.setattr(compress, "_loaded", {})
+
+    assert compress.default_codec() == "zstd"
+    dictionary = compress.train_dictionary([b'{"idShort": "A"}'] * 3, 32, codec="zstd")
+    assert dictionary == b'{"idShort": "A"}{"idShort": "A"}'
+    data = _aas(2).encode() * 10
+    encrypted, shares = shamir.encrypt_and_split(
+        data, threshold=1, total=1, compression="zstd", level=19, dictionary=dictionary
+    )
+    assert encrypted[4] == 3
+    assert shamir.reconstruct_and_decrypt(encrypted, shares, dictionaries=[dictionary]) == data
+
+    monkeypatch.setitem(sys.modules, "zstandard", None)
+    monkeypatch.setattr(compress, "_loaded", {})
+    assert compress.available_codecs() == ("zlib", "lzma")
+    with pytest.raises(shamir.CryptoError, match="zstandard"):
+        shamir.encrypt_and_split(data, threshold=1, total=1, compression="zstd")
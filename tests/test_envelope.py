@@ -0,0 +1,47 @@
+import pytest
+
+from aas_holo_shard.core import envelope, shamir
+
+PAYLOAD = b"AASX package body " * 1000
+
+
+@pytest.mark.parametrize("chunk_size", [None, 4096])
+def test_envelope_roundtrip(chunk_size) -> None:
+    bundle = envelope.encrypt_envelope(PAYLOAD, threshold=2, total=3, chunk_size=chunk_size)
+    assert bundle.wrapped_key is not None
+    assert bundle.to_dict()["wrapped_key"] == bundle.wrapped_key
+    assert envelope.decrypt_envelope(bundle, bundle.shares[1:]) == PAYLOAD
+
+
+def test_rotation_changes_threshold_and_keeps_body() -> None:
+    bundle = envelope.encrypt_envelope(PAYLOAD, threshold=2, total=3)
+    rotated = envelope.rotate_envelope(
+        bundle, bundle.shares[:2], threshold=3, total=5, new_backend="gf256"
+    )
+
+    assert rotated.encrypted is bundle.encrypted
+    assert rotated.wrapped_key != bundle.wrapped_key
+    assert len(rotated.shares) == 5
+    assert envelope.decrypt_envelope(rotated, rotated.shares[2:], backend="gf256") == PAYLOAD
+    with pytest.raises(shamir.CryptoError, match="wrapped data key"):
+        envelope.decrypt_envelope(rotated, bundle.shares[:2])
+
+
+@pytest.mark.parametrize("backend", shamir.BACKENDS)
+def test_refresh_keeps_key_but_breaks_old_shares(backend) -> None:
+    bundle = envelope.encrypt_envelope(PAYLOAD, threshold=2, total=4, backend=backend)
+    fresh = envelope.refresh_shares(bundle.shares, threshold=2, backend=backend)
+
+    assert [idx for idx, _ in fresh] == [idx for idx, _ in bundle.shares]
+    assert all(new != old for (_, new), (_, old) in zip(fresh, bundle.shares))
+    assert envelope.decrypt_envelope(bundle, [fresh[0], fresh[3]], backend=backend) == PAYLOAD
+    with pytest.raises(shamir.CryptoError):
+        envelope.decrypt_envelope(bundle, [bundle.shares[0], fresh[3]], backend=backend)
+
+
+def test_plain_bundle_is_rejected() -> None:
+    encrypted, shares = shamir.encrypt_and_split(b"data", threshold=1, total=1)
+    with pytest.raises(shamir.CryptoError, match="not an envelope"):
+        envelope.decrypt_envelope(shamir.EncryptedBundle(encrypted, shares), shares)
+    with pytest.raises(shamir.CryptoError):
+        envelope.refresh_shares([(1, b"x" * 32), (1, b"y" * 32)], threshold=1)
@@ -0,0 +1,49 @@
+import pytest
+from hypothesis import given, strategies as st
+
+from aas_holo_shard.core import gf256
+
+
+def test_field_tables() -> None:
+    assert sorted(gf256.EXP[:255]) == list(range(1, 256))
+    assert gf256.gf_mul(0x53, 0xCA) == 0x01
+    assert gf256.gf_div(gf256.gf_mul(7, 9), 9) == 7
+    with pytest.raises(ZeroDivisionError):
+        gf256.gf_div(1, 0)
+
+
+@given(
+    st.binary(max_size=300),
+    st.integers(min_value=1, max_value=6),
+    st.integers(min_value=0, max_value=4),
+)
+def test_split_combine_roundtrip(secret: bytes, threshold: int, extra: int) -> None:
+    shares = gf256.split_secret(secret, threshold, threshold + extra)
+    assert all(len(payload) == len(secret) for _, payload in shares)
+    assert gf256.combine_shares(shares[extra:]) == secret
+
+
+def test_numpy_path_is_interchangeable() -> None:
+    pytest.importorskip("numpy")
+    secret = bytes(range(256)) * 4
+    shares = gf256.split_secret(secret, 3, 5, use_numpy=True)
+    assert gf256.combine_shares(shares[:3]) == secret
+    shares = gf256.split_secret(secret, 3, 5)
+    assert gf256.combine_shares(shares[2:], use_numpy=True) == secret
+
+
+def test_invalid_inputs() -> None:
+    with pytest.raises(ValueError):
+        gf256.split_secret(b"x", 0, 2)
+    with pytest.raises(ValueError):
+        gf256.split_secret(b"x", 3, 2)
+    with pytest.raises(ValueError):
+        gf256.split_secret(b"x", 2, 256)
+    with pytest.raises(ValueError):
+        gf256.combine_shares([])
+    with pytest.raises(ValueError):
+        gf256.combine_shares([(1, b"ab"), (2, b"a")])
+    with pytest.raises(ValueError):
+        gf256.combine_shares([(1, b"a"), (1, b"a")])
+    with pytest.raises(ValueError):
+        gf256.combine_shares([(0, b"a")])
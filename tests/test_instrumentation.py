@@ -0,0 +1,118 @@
+import asyncio
+import logging
+
+import pytest
+
+from aas_holo_shard import instrumentation
+from aas_holo_shard.aas import shard
+from aas_holo_shard.core import shamir
+from aas_holo_shard.storage import async_ipfs, ipfs
+
+
+@pytest.fixture
+def recorder():
+    with instrumentation.Recorder() as rec:
+        yield rec
+    assert not instrumentation.enabled()
+
+
+def test_disabled_instrumentation_is_a_noop() -> None:
+    assert not instrumentation.enabled()
+    assert instrumentation.span("x", a=1) is instrumentation.span("y")
+    instrumentation.count("x")
+
+
+def test_split_and_combine_emit_spans(tmp_path, recorder) -> None:
+    source = tmp_path / "factory.json"
+    source.write_text(
+        '{"submodels": [{"idShort": "S", "submodelElements": '
+        '[{"idShort": "MasterKey", "modelType": "Property", "value": "secret"}]}]}'
+    )
+    files = shard.split_aas(source, "MasterKey", 3, 2)
+    shard.combine_aas(files[:2], "MasterKey", tmp_path / "out.json")
+
+    assert recorder.span_calls["aas.split"] == 1
+    assert recorder.span_calls["aas.combine"] == 1
+    assert recorder.span_calls["aas.parse"] == 3
+    for name in ("aas.search", "aas.shard", "aas.recover", "aas.write", "shard.recover_secret"):
+        assert name in recorder.span_calls
+    assert recorder.counters["shares.created"] == 3
+    assert recorder.counters["shares.processed"] == 2
+
+
+def test_crypto_spans_and_errors(recorder) -> None:
+    encrypted, shares = shamir.encrypt_and_split(b"x" * 1000, threshold=2, total=3)
+    shamir.reconstruct_and_decrypt(encrypted, shares[:2])
+    assert recorder.counters["crypto.bytes"] == 2000
+    assert recorder.span_calls["crypto.aes_gcm"] == 2
+
+    with pytest.raises(ValueError):
+        shamir.reconstruct_and_decrypt(encrypted[:-1] + b"\0", shares[:2])
+    failed = [e for e in recorder.events if e.name == "crypto.reconstruct_and_decrypt"][-1]
+    assert failed.error == "ValueError"
+
+
+def test_storage_counters(fake_ipfs, recorder) -> None:
+    async def scenario():
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url) as client:
+            cids = await client.store_shares([(1, b"abc")])
+            return await client.fetch_shares(cids)
+
+    asyncio.run(scenario())
+    assert recorder.span_calls["ipfs.request"] == 2
+    assert recorder.counters["ipfs.bytes_sent"] == recorder.counters["ipfs.bytes_received"]
+
+    class Client:
+        def add_bytes(self, payload):
+            return "cid"
+
+        def cat(self, cid):
+            return ipfs.serialize_share((2, b"def"))
+
+    ipfs.fetch_shares(ipfs.store_shares([(2, b"def")], client=Client()), client=Client())
+    assert recorder.span_calls["ipfs.fetch_shares"] == 2
+
+
+def test_logging_and_opentelemetry_sinks(caplog) -> None:
+    class Recorded:
+        def __init__(self):
+            self.calls = []
+
+        def start_span(self, name, start_time, attributes):
+            self.calls.append(("span", name, attributes))
+            return self
+
+        def end(self, end_time):
+            self.calls.append(("end", end_time))
+
+        def create_counter(self, name):
+            self.calls.append(("counter", name))
+            return self
+
+        def add(self, value, attributes):
+            self.calls.append(("add", value, attributes))
+
+    otel = Recorded()
+    sinks = [instrumentation.LoggingSink(), instrumentation.OpenTelemetrySink(otel, otel)]
+    for sink in sinks:
+        instrumentation.add_sink(sink)
+    try:
+        with caplog.at_level(logging.DEBUG, logger="aas_holo_shard.metrics"):
+            with instrumentation.span("demo", path=_opaque_path()):
+                instrumentation.count("demo.items", 2, kind="x")
+    finally:
+        instrumentation.clear_sinks()
+
+    assert "count demo.items +2 kind=x" in caplog.text
+    assert "span demo" in caplog.text
+    assert ("counter", "demo.items") in otel.calls
+    assert ("add", 2, {"kind": "x"}) in otel.calls
+    assert ("span", "demo", {"path": "p/q"}) in otel.calls
+
+
+def _opaque_path():
+    class Unserializable:
+        def __str__(self):
+            return "p/q"
+
+    return Unserializable()
@@ -0,0 +1,65 @@
+import secrets
+
+import pytest
+from hypothesis import given, settings, strategies as st
+
+from aas_holo_shard.aas import shard
+from aas_holo_shard.core import gf256, robust
+
+
+def _corrupt(points, positions, delta=1):
+    return [(x, y ^ delta) if i in positions else (x, y) for i, (x, y) in enumerate(points)]
+
+
+@settings(max_examples=40, deadline=None)
+@given(
+    st.integers(min_value=1, max_value=4),
+    st.integers(min_value=0, max_value=3),
+    st.data(),
+)
+def test_prime_field_corrects_up_to_half_the_redundancy(k: int, errors: int, data) -> None:
+    n = k + 2 * errors
+    secret = data.draw(st.integers(min_value=0, max_value=2**64))
+    points = shard.make_shards(secret, n, k)
+    bad = data.draw(st.lists(st.integers(0, n - 1), max_size=errors, unique=True))
+    corrupted = _corrupt(points, bad)
+    poly, faulty = robust.decode(robust.PrimeField(shard.PRIME), corrupted, k)
+    assert poly[0] == secret
+    assert faulty == sorted(points[i][0] for i in bad)
+
+
+def test_gf2_128_matches_pycryptodome() -> None:
+    pytest.importorskip("Crypto")
+    from Crypto.Protocol.SecretSharing import Shamir
+
+    field = robust.GF2_128
+    value = secrets.randbits(128) | 1
+    assert field.mul(value, field.inv(value)) == 1
+
+    secret = secrets.token_bytes(16)
+    points = [(idx, int.from_bytes(share, "big")) for idx, share in Shamir.split(3, 7, secret)]
+    poly, faulty = robust.decode(field, _corrupt(points, {1, 5}, delta=2**100), 3)
+    assert poly[0].to_bytes(16, "big") == secret
+    assert faulty == [2, 6]
+
+
+def test_gf256_corrects_bytes_across_shares() -> None:
+    secret = secrets.token_bytes(64)
+    shares = gf256.split_secret(secret, 3, 7)
+    shares[0] = (1, bytes(64))
+    shares[4] = (5, bytes([shares[4][1][0] ^ 0xFF]) + shares[4][1][1:])
+    assert robust.combine_gf256(shares, 3) == (secret, [1, 5])
+    assert robust.combine_gf256(shares[1:4] + shares[5:], 3) == (secret, [])
+
+
+def test_too_many_errors_are_reported() -> None:
+    points = shard.make_shards(42, 5, 3)
+    field = robust.PrimeField(shard.PRIME)
+    with pytest.raises(robust.DecodingError, match="more than 1 of 5"):
+        robust.decode(field, _corrupt(points, {0, 3}, delta=secrets.randbits(256) | 1), 3)
+    with pytest.raises(robust.DecodingError, match="5 shares are needed"):
+        robust.decode(field, _corrupt(points[:4], {2}), 3)
+    with pytest.raises(robust.DecodingError, match="unique"):
+        robust.decode(field, points[:2] + points[:1], 2)
+    with pytest.raises(robust.DecodingError, match="3 shares are required"):
+        robust.decode(field, points[:2], 3)
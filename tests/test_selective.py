@@ -0,0 +1,103 @@
+import zipfile
+
+import pytest
+
+from aas_holo_shard.aas import selective
+from aas_holo_shard.core.shamir import CryptoError
+
+SUBMODEL = b'{"idShort": "Nameplate", "value": "secret"}' * 50
+THUMBNAIL = bytes(range(256)) * 400
+
+
+def _package(path):
+    with zipfile.ZipFile(path, "w") as archive:
+        archive.writestr("[Content_Types].xml", b"<Types/>", zipfile.ZIP_DEFLATED)
+        archive.writestr("aasx/thumbnail.png", THUMBNAIL, zipfile.ZIP_DEFLATED)
+        archive.writestr("aasx/submodels/nameplate.json", SUBMODEL, zipfile.ZIP_DEFLATED)
+        archive.writestr("aasx/submodels/bom.json", b'{"idShort": "BOM"}', zipfile.ZIP_STORED)
+    return path
+
+
+def test_selected_parts_are_encrypted_and_others_copied_raw(tmp_path) -> None:
+    source = _package(tmp_path / "in.aasx")
+    sealed = tmp_path / "sealed.aasx"
+    shares = selective.encrypt_aasx_parts(
+        source, sealed, "aasx/submodels/*.json", threshold=2, total=3
+    )
+
+    with zipfile.ZipFile(source) as original, zipfile.ZipFile(sealed) as archive:
+        names = archive.namelist()
+        assert names == [
+            "[Content_Types].xml",
+            "aasx/thumbnail.png",
+            "aasx/submodels/nameplate.json.ahs",
+            "aasx/submodels/bom.json.ahs",
+            selective.MANIFEST_NAME,
+        ]
+        thumb, copied = original.getinfo("aasx/thumbnail.png"), archive.getinfo(
+            "aasx/thumbnail.png"
+        )
+        assert (copied.compress_type, copied.compress_size, copied.CRC) == (
+            thumb.compress_type,
+            thumb.compress_size,
+            thumb.CRC,
+        )
+        assert archive.read("aasx/thumbnail.png") == THUMBNAIL
+        assert b"secret" not in archive.read("aasx/submodels/nameplate.json.ahs")
+        assert archive.testzip() is None
+
+    manifest = selective.read_parts_manifest(sealed)
+    assert manifest["aasx/submodels/nameplate.json"]["size"] == len(SUBMODEL)
+    assert selective.decrypt_aasx_part(sealed, "aasx/submodels/nameplate.json", shares[1:]) == (
+        SUBMODEL
+    )
+    with pytest.raises(KeyError):
+        selective.decrypt_aasx_part(sealed, "aasx/thumbnail.png", shares)
+
+    restored = tmp_path / "restored.aasx"
+    selective.decrypt_aasx_parts(sealed, restored, shares[:2])
+    with zipfile.ZipFile(source) as original, zipfile.ZipFile(restored) as archive:
+        assert archive.namelist() == original.namelist()
+        for info in original.infolist():
+            assert archive.read(info.filename) == original.read(info.filename)
+            assert archive.getinfo(info.filename).compress_type == info.compress_type
+
+
+def test_swapped_parts_fail_verification(tmp_path) -> None:
+    source = _package(tmp_path / "in.aasx")
+    sealed = tmp_path / "sealed.aasx"
+    shares = selective.encrypt_aasx_parts(
+        source, sealed, lambda name: name.endswith(".json"), threshold=1, total=1, backend="gf256"
+    )
+
+    tampered = tmp_path / "tampered.aasx"
+    with zipfile.ZipFile(sealed) as archive, zipfile.ZipFile(tampered, "w") as out:
+        for info in archive.infolist():
+            data = archive.read(info)
+            if info.filename == "aasx/submodels/bom.json.ahs":
+                data = archive.read("aasx/submodels/nameplate.json.ahs")
+            out.writestr(info, data)
+
+    with pytest.raises(CryptoError, match="MAC check failed"):
+        selective.decrypt_aasx_part(tampered, "aasx/submodels/bom.json", shares)
+    with pytest.raises(CryptoError):
+        selective.decrypt_aasx_parts(tampered, tmp_path / "out.aasx", shares)
+    assert not (tmp_path / "out.aasx").exists()
+
+
+def test_recompressing_fallback_without_zipfile_internals(tmp_path, monkeypatch) -> None:
+    monkeypatch.setattr(selective, "_RAW_COPY", False)
+    source = _package(tmp_path / "in.aasx")
+    with zipfile.ZipFile(source, "a") as archive:
+        archive.writestr(zipfile.ZipInfo("aasx/empty/"), b"")
+    sealed, restored = tmp_path / "sealed.aasx", tmp_path / "restored.aasx"
+    shares = selective.encrypt_aasx_parts(source, sealed, "*.json", threshold=1, total=1)
+    selective.decrypt_aasx_parts(sealed, restored, shares)
+
+    with zipfile.ZipFile(source) as original, zipfile.ZipFile(restored) as archive:
+        assert archive.testzip() is None
+        assert archive.namelist() == original.namelist()
+        for info in original.infolist():
+            copied = archive.getinfo(info.filename)
+            assert archive.read(copied) == original.read(info)
+            assert (copied.compress_type, copied.is_dir()) == (info.compress_type, info.is_dir())
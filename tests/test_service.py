@@ -0,0 +1,275 @@
+import asyncio
+import http.client
+import os
+import threading
+import tracemalloc
+from contextlib import contextmanager
+
+import pytest
+
+from aas_holo_shard.core import chunked, service, shamir, stream
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def containers(tmp_path):
+    data = bytes(range(256)) * 40
+    single, single_shares = shamir.encrypt_and_split(data, threshold=2, total=3)
+    multi, multi_shares = chunked.encrypt_and_split_chunked(
+        data, threshold=2, total=3, chunk_size=1000
+    )
+    (tmp_path / "single.enc").write_bytes(single)
+    (tmp_path / "multi.enc").write_bytes(multi)
+    return data, {
+        tmp_path / "single.enc": single_shares[:2],
+        tmp_path / "multi.enc": multi_shares[1:],
+    }
+
+
+def test_key_cache_expires_bounds_and_zeroizes() -> None:
+    clock = FakeClock()
+    cache = service.KeyCache(2, ttl=10, clock=clock)
+    cache.put(b"a", b"\x01" * 32)
+    cache.put(b"b", b"\x02" * 32)
+    with cache.lease(b"a") as key_a:
+        assert key_a == b"\x01" * 32
+        cache.put(b"c", b"\x03" * 32)  # evicts "b", the least recently used
+        with cache.lease(b"b") as missing:
+            assert missing is None
+        assert cache.discard(b"a")
+        assert key_a == b"\x01" * 32  # still leased
+    assert key_a == bytes(32)
+
+    with cache.lease(b"c") as key_c:
+        pass
+    clock.now = 11
+    assert cache.purge_expired() == 1
+    assert key_c == bytes(32)
+    assert len(cache) == 0
+    assert (cache.stats.hits, cache.stats.evictions, cache.stats.expired) == (2, 1, 1)
+
+
+def test_service_reconstructs_once_and_serves_concurrently(containers, monkeypatch) -> None:
+    data, shares = containers
+    combines = []
+
+    def counting_recover(*args):
+        combines.append(args)
+        return shamir._recover_key(*args)
+
+    monkeypatch.setattr(service, "_recover_key", counting_recover)
+
+    async def scenario():
+        svc = service.ReconstructionService(workers=4)
+        try:
+            for path, path_shares in shares.items():
+                await svc.load(path, path_shares)
+            jobs = []
+            for path in shares:
+                jobs += [svc.decrypt(path), svc.read(path, 2500, 1200), svc.read(path, -10)]
+            results = await asyncio.gather(*jobs)
+            first = next(iter(shares))
+            assert await svc.forget(first)
+            with pytest.raises(service.KeyNotLoaded):
+                await svc.decrypt(first)
+            return results, svc.stats()
+        finally:
+            await svc.aclose()
+
+    results, stats = asyncio.run(scenario())
+    for whole, ranged, tail in zip(results[::3], results[1::3], results[2::3]):
+        assert whole == data
+        assert ranged == service.Plaintext(data[2500:3700], 2500, len(data))
+        assert tail.data == data[-10:]
+    assert len(combines) == 2
+    assert stats["hits"] == 6 and stats["keys"] == 1
+
+
+def test_load_rejects_shares_of_another_container(containers, tmp_path) -> None:
+    _, shares = containers
+    _, other_shares = shamir.encrypt_and_split(b"other", threshold=1, total=1)
+
+    async def scenario():
+        svc = service.ReconstructionService(workers=1)
+        try:
+            for path in shares:
+                with pytest.raises(shamir.CryptoError, match="do not open"):
+                    await svc.load(path, other_shares)
+            (tmp_path / "plain.txt").write_bytes(b"not encrypted at all")
+            with pytest.raises(shamir.CryptoError, match="not an AHS1"):
+                await svc.load(tmp_path / "plain.txt", other_shares)
+            return svc.stats()
+        finally:
+            await svc.aclose()
+
+    assert asyncio.run(scenario())["loads"] == 0
+
+
+@contextmanager
+def _serving(**options):
+    loop = asyncio.new_event_loop()
+    svc = service.ReconstructionService(workers=2)
+    server = loop.run_until_complete(service.serve(svc, **options))
+    thread = threading.Thread(target=loop.run_forever, daemon=True)
+    thread.start()
+    try:
+        yield server
+    finally:
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join()
+        server.close()
+        loop.run_until_complete(server.wait_closed())
+        loop.run_until_complete(svc.aclose())
+        loop.close()
+
+
+@pytest.fixture
+def running_service(tmp_path):
+    socket_path = tmp_path / "service.sock"
+    with _serving(socket_path=socket_path) as server:
+        yield socket_path, server
+
+
+def test_http_service_over_unix_socket(containers, running_service) -> None:
+    data, shares = containers
+    socket_path, _ = running_service
+    assert socket_path.stat().st_mode & 0o777 == 0o600
+
+    with service.ServiceClient(socket_path) as client:
+        path, path_shares = next(iter(shares.items()))
+        with pytest.raises(service.ServiceError) as excinfo:
+            client.decrypt(path)
+        assert excinfo.value.status == 404
+
+        key_id = client.load(path, path_shares)
+        assert bytes.fromhex(key_id) == service.container_id(path.read_bytes()[:64])
+        assert client.decrypt(path) == data
+        assert client.decrypt(path, 100, 50) == data[100:150]
+        assert client.decrypt(path, -7) == data[-7:]
+        assert client.decrypt(path, len(data) + 5, 10) == b""
+        assert client.stats()["hits"] == 4
+        assert client.forget(path) and not client.forget(path)
+
+        with pytest.raises(service.ServiceError, match="expected JSON"):
+            client._request("POST", "/keys", b"[]")
+        with pytest.raises(service.ServiceError) as excinfo:
+            client._request("PUT", "/decrypt")
+        assert excinfo.value.status == 405
+
+
+def test_tcp_requires_token_local_host_and_no_origin(containers) -> None:
+    data, shares = containers
+    path, path_shares = next(iter(shares.items()))
+    with pytest.raises(ValueError, match="token"):
+        asyncio.run(service.serve(service.ReconstructionService(workers=1)))
+
+    token = service.new_token()
+    with _serving(port=0, token=token) as server:
+        port = server.sockets[0].getsockname()[1]
+        with service.ServiceClient(port=port, token=token) as client:
+            client.load(path, path_shares)
+            assert client.decrypt(path, 0, 10) == data[:10]
+        for bad_token in (None, "wrong"):
+            with service.ServiceClient(port=port, token=bad_token) as client:
+                with pytest.raises(service.ServiceError) as excinfo:
+                    client.decrypt(path)
+                assert excinfo.value.status == 401
+
+        auth = {"Authorization": f"Bearer {token}"}
+        for extra, status in [
+            ({"Host": f"localhost:{port}"}, 200),
+            ({"Host": f"attacker.example:{port}"}, 403),
+            ({"Host": "127.0.0.1"}, 403),
+            ({"Origin": "http://attacker.example"}, 403),
+        ]:
+            conn = http.client.HTTPConnection("127.0.0.1", port, timeout=5)
+            conn.request("GET", "/stats", headers=dict(auth, **extra))
+            assert conn.getresponse().status == status
+            conn.close()
+
+
+def test_unix_socket_is_bound_under_private_umask(tmp_path, monkeypatch) -> None:
+    seen = []
+    start_unix_server = asyncio.start_unix_server
+
+    async def spy(*args, **kwargs):
+        umask = os.umask(0o022)
+        os.umask(umask)
+        seen.append(umask)
+        return await start_unix_server(*args, **kwargs)
+
+    monkeypatch.setattr(asyncio, "start_unix_server", spy)
+    before = os.umask(0o022)
+    os.umask(before)
+    with _serving(socket_path=tmp_path / "service.sock"):
+        assert seen == [0o077]
+        assert os.umask(before) == before  # restored after binding
+
+
+def test_range_header_parsing() -> None:
+    assert service._parse_range("bytes=10-19") == (10, 10)
+    assert service._parse_range("bytes=10-") == (10, None)
+    assert service._parse_range("bytes=-5") == (-5, None)
+    assert service._parse_range("bytes=-0") == (0, 0)
+    for ignored in (None, "bytes=5-1", "bytes=0-1,4-5", "items=1-2", "bytes=a-b"):
+        assert service._parse_range(ignored) is None
+
+
+@pytest.mark.parametrize("compression", [None, "lzma"])
+def test_single_tag_containers_are_read_in_chunks(tmp_path, monkeypatch, compression) -> None:
+    monkeypatch.setattr(service, "DEFAULT_CHUNK_SIZE", 1000)
+    data = b"".join(b"%06d," % i for i in range(2000))
+    encrypted, shares = shamir.encrypt_and_split(
+        data, threshold=1, total=1, compression=compression
+    )
+    path = tmp_path / "single.enc"
+    path.write_bytes(encrypted)
+    key = bytearray(shamir._recover_key(shares, shamir.BACKEND_PYCRYPTODOME, None))
+
+    size = len(data)
+    ranges = [(0, None), (5, 10), (999, 2), (2500, 1200), (-7, None), (-1500, 3)]
+    ranges += [(-size - 10, None), (size + 5, 10), (0, 0), (10, -1)]
+    for offset, length in ranges:
+        start, end = service._clamp(offset, length, size)
+        assert service._read_plaintext(path, key, offset, length) == (data[start:end], start, size)
+
+    path.write_bytes(encrypted[:-1] + bytes([encrypted[-1] ^ 1]))
+    with pytest.raises(shamir.CryptoError, match="MAC check failed"):
+        service._read_plaintext(path, key, 0, 1)
+
+
+@pytest.mark.parametrize("compression", [None, "zlib"])
+def test_range_read_memory_is_bounded(tmp_path, compression) -> None:
+    size = 24 * stream.DEFAULT_CHUNK_SIZE
+    source, path = tmp_path / "plain", tmp_path / "big.enc"
+    with source.open("wb") as handle:
+        for i in range(size // 64):
+            handle.write(b"%063d\n" % i)
+    shares = stream.encrypt_file_and_split(
+        source, path, threshold=1, total=1, compression=compression
+    )
+
+    async def scenario():
+        svc = service.ReconstructionService(workers=1)
+        try:
+            await svc.load(path, shares)
+            tracemalloc.start()
+            try:
+                result = await svc.read(path, size // 2, 1000)
+                _, peak = tracemalloc.get_traced_memory()
+            finally:
+                tracemalloc.stop()
+            return result, peak
+        finally:
+            await svc.aclose()
+
+    result, peak = asyncio.run(scenario())
+    assert result.data == source.read_bytes()[size // 2 : size // 2 + 1000]
+    assert peak < size / 4
@@ -69,3 +69,58 @@ def test_pack_and_unpack_errors() -> None:
 def test_encrypted_bundle_to_dict() -> None:
     bundle = shamir.EncryptedBundle(b"payload", [(1, b"x" * 32)])
     assert bundle.to_dict()["encrypted"] == b"payload"
+
+
+@given(st.binary(min_size=1, max_size=512))
+def test_gf256_backend_roundtrip(data: bytes) -> None:
+    encrypted, shares = shamir.encrypt_and_split(data, threshold=3, total=5, backend="gf256")
+    assert all(len(payload) == shamir.KEY_SIZE for _, payload in shares)
+    recovered = shamir.reconstruct_and_decrypt(encrypted, shares[2:], backend="gf256")
+    assert recovered == data
+
+
+def test_unknown_backend() -> None:
+    with pytest.raises(shamir.CryptoError):
+        shamir.encrypt_and_split(b"data", threshold=1, total=1, backend="nope")
+    with pytest.raises(shamir.CryptoError):
+        shamir._combine_key([(1, b"x" * 32), (1, b"y" * 32)], backend="gf256")
+
+
+@pytest.mark.parametrize("backend", shamir.BACKENDS)
+def test_robust_reconstruction_names_faulty_shares(backend) -> None:
+    encrypted, shares = shamir.encrypt_and_split(b"payload", threshold=2, total=6, backend=backend)
+    tampered = list(shares)
+    tampered[1] = (2, bytes(32))
+    tampered[3] = (4, shares[3][1][:16] + bytes(16))
+    key, faulty = shamir.robust_combine_key(tampered, 2, backend)
+    assert key == shamir._combine_key(shares[:2], backend)
+    assert faulty == [2, 4]
+    assert (
+        shamir.reconstruct_and_decrypt(encrypted, tampered, backend=backend, threshold=2)
+        == b"payload"
+    )
+    with pytest.raises(shamir.CryptoError, match="faulty"):
+        shamir.robust_combine_key(tampered[:5], 2, backend)
+
+
+def test_buffer_apis_work_in_place_and_on_mmap() -> None:
+    import mmap
+
+    data = bytes(range(256)) * 64
+    mapped = mmap.mmap(-1, shamir.encrypted_size(len(data)))
+    shares = shamir.encrypt_into(memoryview(data), mapped, threshold=2, total=3)
+    assert shamir.reconstruct_and_decrypt(mapped, shares[:2]) == data
+
+    out = bytearray(len(data) + 10)
+    assert shamir.decrypt_into(mapped, out, shares[1:]) == len(data)
+    assert out[: len(data)] == data
+
+    mapped[-1] ^= 1
+    with pytest.raises(shamir.CryptoError, match="MAC"):
+        shamir.decrypt_into(mapped, out, shares[1:])
+    assert out == bytes(len(out))
+
+    with pytest.raises(shamir.CryptoError, match="must hold"):
+        shamir.decrypt_into(mapped, bytearray(10), shares[1:])
+    with pytest.raises(shamir.CryptoError, match="read-only"):
+        shamir.encrypt_into(data, bytes(len(mapped)), threshold=1, total=1)
@@ -0,0 +1,97 @@
+import io
+
+import pytest
+from hypothesis import given, strategies as st
+
+from aas_holo_shard.aas import parser
+from aas_holo_shard.core import shamir, stream
+
+
+@given(st.binary(max_size=4096), st.integers(min_value=1, max_value=700))
+def test_stream_matches_in_memory_format(data: bytes, chunk_size: int) -> None:
+    dst = io.BytesIO()
+    shares = stream.encrypt_stream(
+        io.BytesIO(data), dst, threshold=2, total=3, chunk_size=chunk_size
+    )
+    blob = dst.getvalue()
+    assert shamir.reconstruct_and_decrypt(blob, shares[1:]) == data
+
+    out = io.BytesIO()
+    assert stream.decrypt_stream(io.BytesIO(blob), out, shares[:2], chunk_size=chunk_size) == len(
+        data
+    )
+    assert out.getvalue() == data
+
+
+def test_stream_reads_in_memory_blob() -> None:
+    encrypted, shares = shamir.encrypt_and_split(b"payload" * 100, threshold=2, total=2)
+    out = io.BytesIO()
+    stream.decrypt_stream(io.BytesIO(encrypted), out, shares, chunk_size=64)
+    assert out.getvalue() == b"payload" * 100
+
+
+def test_file_roundtrip_and_tamper(tmp_path) -> None:
+    source = tmp_path / "big.aasx"
+    source.write_bytes(bytes(range(256)) * 1000)
+    encrypted = tmp_path / "big.aasx.ahs"
+    restored = tmp_path / "restored.aasx"
+
+    shares = parser.encrypt_aasx_file(source, encrypted, threshold=2, total=3, chunk_size=4096)
+    parser.decrypt_aasx_file(encrypted, restored, shares[:2], chunk_size=4096)
+    assert restored.read_bytes() == source.read_bytes()
+
+    restored.unlink()
+    blob = bytearray(encrypted.read_bytes())
+    blob[-1] ^= 0x01
+    encrypted.write_bytes(bytes(blob))
+    with pytest.raises(shamir.CryptoError):
+        parser.decrypt_aasx_file(encrypted, restored, shares[:2])
+    assert not restored.exists()
+    assert [path.name for path in tmp_path.iterdir() if path.suffix == ".tmp"] == []
+
+
+def test_stream_errors() -> None:
+    class Unseekable(io.BytesIO):
+        def seekable(self) -> bool:
+            return False
+
+    with pytest.raises(shamir.CryptoError):
+        stream.encrypt_stream(io.BytesIO(b"x"), Unseekable(), threshold=1, total=1)
+    with pytest.raises(shamir.CryptoError):
+        stream.encrypt_stream(io.BytesIO(b"x"), io.BytesIO(), threshold=1, total=1, chunk_size=0)
+
+    _, shares = shamir.encrypt_and_split(b"x", threshold=1, total=1)
+    with pytest.raises(shamir.CryptoError):
+        stream.decrypt_stream(io.BytesIO(b"AHS1"), io.BytesIO(), shares)
+    with pytest.raises(shamir.CryptoError):
+        stream.decrypt_stream(io.BytesIO(b"NOPE" + bytes(32)), io.BytesIO(), shares)
+
+
+def test_buffer_written_with_vectored_io(tmp_path, monkeypatch) -> None:
+    import os
+
+    data = bytearray(b"payload" * 5000)
+    calls = []
+    writev = os.writev
+
+    def short_writev(fd, buffers):
+        calls.append(len(buffers))
+        return writev(fd, [bytes(buffers[0][:1000])] if len(buffers[0]) > 1000 else buffers[:1])
+
+    monkeypatch.setattr(os, "writev", short_writev)
+    path = tmp_path / "out.ahs"
+    shares = stream.encrypt_buffer_and_split(data, path, threshold=2, total=3)
+    assert calls[0] == 4
+    assert shamir.reconstruct_and_decrypt(path.read_bytes(), shares[:2]) == data
+
+    with open(tmp_path / "appended.ahs", "wb") as handle:
+        handle.write(b"prefix")
+        shares = stream.encrypt_buffer_and_split(memoryview(data), handle, threshold=1, total=1)
+        handle.write(b"suffix")
+    blob = (tmp_path / "appended.ahs").read_bytes()
+    assert blob.startswith(b"prefix") and blob.endswith(b"suffix")
+    assert shamir.reconstruct_and_decrypt(blob[6:-6], shares) == data
+
+    memory = io.BytesIO()
+    shares = stream.encrypt_buffer_and_split(data, memory, threshold=1, total=1)
+    assert shamir.reconstruct_and_decrypt(memory.getvalue(), shares) == data
@@ -0,0 +1,84 @@
+import asyncio
+
+import pytest
+
+from aas_holo_shard.storage import async_ipfs, ipfs, wire
+
+
+class DictClient:
+    def __init__(self):
+        self.store = {}
+
+    def add_bytes(self, payload: bytes) -> str:
+        cid = f"cid-{len(self.store)}"
+        self.store[cid] = payload
+        return cid
+
+    def cat(self, cid: str) -> bytes:
+        return self.store[cid]
+
+
+def test_binary_share_is_compact_and_roundtrips() -> None:
+    share = (5, bytes(range(32)))
+    binary = ipfs.serialize_share(share, wire_format="binary")
+    assert len(binary) == 32 + 12
+    assert len(binary) < len(ipfs.serialize_share(share))
+    assert ipfs.deserialize_share(binary) == share
+    # JSON payloads written before the binary format keep decoding.
+    assert ipfs.deserialize_share(b'{"index":5,"payload":"YWJj"}') == (5, b"abc")
+
+
+def test_binary_share_metadata_and_corruption() -> None:
+    record = wire.encode_share((2, b"secret"), {"asset": "urn:x", "k": 2})
+    assert wire.decode_share_with_metadata(record) == ((2, b"secret"), {"asset": "urn:x", "k": 2})
+
+    flipped = bytearray(record)
+    flipped[8] ^= 0x01
+    with pytest.raises(wire.ShareFormatError, match="checksum"):
+        wire.decode_share(bytes(flipped))
+    with pytest.raises(wire.ShareFormatError):
+        wire.decode_share(record[:-3])
+    with pytest.raises(wire.ShareFormatError):
+        wire.encode_share((256, b"x"))
+    with pytest.raises(ValueError):
+        ipfs.serialize_share((1, b"x"), wire_format="xml")
+
+
+def test_pack_lookup_by_asset_id() -> None:
+    entries = {f"urn:asset:{i}": (3, bytes([i]) * 32) for i in range(200)}
+    blob = wire.build_pack(entries, {"urn:asset:7": {"k": 2}})
+    pack = wire.SharePack(blob)
+
+    assert len(pack) == 200
+    assert "urn:asset:7" in pack and "urn:asset:x" not in pack
+    assert pack.get("urn:asset:42") == entries["urn:asset:42"]
+    assert pack.get_with_metadata("urn:asset:7") == (entries["urn:asset:7"], {"k": 2})
+    with pytest.raises(KeyError):
+        pack.get("urn:asset:x")
+
+    corrupt = bytearray(blob)
+    corrupt[10] ^= 0xFF
+    with pytest.raises(wire.ShareFormatError):
+        wire.SharePack(bytes(corrupt))
+
+
+def test_pack_store_and_fetch_via_clients(fake_ipfs) -> None:
+    entries = {"a": (1, b"one"), "b": (1, b"two"), "c": (1, b"three")}
+    client = DictClient()
+    cid = ipfs.store_pack(entries, client=client)
+    assert len(client.store) == 1
+    assert ipfs.fetch_from_pack(cid, ["c", "a"], client=client) == {
+        "c": entries["c"],
+        "a": entries["a"],
+    }
+
+    async def scenario():
+        async with async_ipfs.AsyncIPFSClient(fake_ipfs.url) as remote:
+            pack_cid = await remote.store_pack(entries)
+            pack = await remote.fetch_pack(pack_cid)
+            cids = await remote.store_shares(entries.values(), wire_format="binary")
+            return pack, await remote.fetch_shares(cids)
+
+    pack, fetched = asyncio.run(scenario())
+    assert pack.get("b") == entries["b"]
+    assert fetched == list(entries.values())